@@ -6,6 +6,8 @@ a = Analysis(
     binaries=[],
     datas=[
         ('src/assets', 'assets'),
+        # Generado por tools/build_resources.py antes de empaquetar
+        ('src/resources.rcc', '.'),
         ('src/config', 'config'),
         ('src/core', 'core'),
         ('src/ui', 'ui'),
@@ -2,166 +2,266 @@ import sys
 import os
 import subprocess
 import requests
-import hashlib
-import shutil
-import zipfile
-import winreg # Biblioteca para interactuar con el registro de Windows
-from PySide6.QtWidgets import QApplication, QMessageBox, QWidget, QLabel, QProgressBar, QVBoxLayout, QHBoxLayout
-from PySide6.QtGui import QPixmap, QIcon
-from PySide6.QtCore import Qt, QTimer, QCoreApplication, Signal
+import tempfile
+import threading
+from PySide6.QtWidgets import (QApplication, QMessageBox, QWidget, QLabel, QProgressBar, QPushButton,
+                               QVBoxLayout, QHBoxLayout)
+from PySide6.QtGui import QIcon
+from PySide6.QtCore import Qt, QTimer, QObject, QThread, Signal
 import ctypes
 from datetime import datetime
 from src.core.utils import resource_path 
-# NUEVO: Importamos la función de arranque de nuestra aplicación principal
-import app_main
+from src.core.resources import register_resources, load_pixmap
+from src.core.updater import (get_install_path, get_current_version, check_for_update, fetch_update_manifest,
+                              stage_differential_update, apply_staged_update, get_staged_update, stage_full_package,
+                              rollback_version, is_version_skipped, active_version_dir, download_file,
+                              TransferProgress, UpdateCancelled)
 
 # --- Configuración del Lanzador ---
-APP_DIR_NAME = 'Modula POS'
-# NOTA: APP_EXE ya no se usa para lanzar, pero puede ser útil para otras cosas (ej. icono del acceso directo)
+# Ejecutable de la app dentro de cada carpeta de versión (versions/<versión>/Modula.exe)
 APP_EXE = 'Modula.exe' 
-VERSION_FILE = 'version.txt'
-API_URL = "https://modula-backend.onrender.com/api/v1/update/check"
 UNINSTALLER_EXE = 'uninstaller.exe'
+# Pasado este plazo se abre la versión instalada aunque la actualización no haya terminado.
+UPDATE_DEADLINE_MS = 90 * 1000
 
 # --- Funciones de Utilidad ---
-def get_install_path():
-    """Busca la ruta de instalación de Modula en el registro de Windows."""
-    try:
-        reg_key_path = fr"SOFTWARE\Microsoft\Windows\CurrentVersion\Uninstall\{APP_DIR_NAME}"
-        with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, reg_key_path) as key:
-            install_path = winreg.QueryValueEx(key, "InstallLocation")[0]
-            return os.path.normpath(install_path)
-    except Exception:
-        return None
-
-def get_current_version(install_path):
-    """Lee la versión del archivo version.txt desde una ruta dada."""
-    try:
-        with open(os.path.join(install_path, VERSION_FILE), 'r') as f:
-            return f.read().strip()
-    except FileNotFoundError:
-        return "0.0.0"
-
-# MODIFICADO: La función run_modula ahora inicia la app en el mismo proceso
-def run_modula(launcher_window):
-    """Oculta la ventana del launcher e inicia la aplicación principal de Modula."""
-    # Ocultamos la ventana del launcher en lugar de cerrarla
-    launcher_window.hide()
-    
-    # Obtenemos la instancia de QApplication que ya está en ejecución
-    app_instance = QApplication.instance()
-    
-    # Llamamos a la función que arranca la lógica de Modula
-    app_main.start_modula_app(app_instance)
-
-def download_update(url, save_path, progress_callback):
-    """Descarga un archivo desde una URL y reporta el progreso."""
-    try:
-        response = requests.get(url, stream=True)
-        response.raise_for_status()
-        total_size = int(response.headers.get('content-length', 0))
-        bytes_downloaded = 0
-        with open(save_path, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                bytes_downloaded += len(chunk)
-                f.write(chunk)
-                progress_callback(bytes_downloaded, total_size)
+def run_modula(launcher_window, install_path) -> bool:
+    """
+    Inicia Modula desde la carpeta de la versión activa (versions/<versión>/Modula.exe).
+    El launcher de la raíz solo actualiza y elige la versión: el código de la app
+    siempre se ejecuta desde la versión que marca el puntero.
+    Devuelve True si Modula se abrió en otro proceso (el launcher debe cerrarse).
+    """
+    app_exe = active_version_dir(install_path) / APP_EXE
+    if app_exe.is_file():
+        subprocess.Popen([str(app_exe)], cwd=str(app_exe.parent))
         return True
-    except requests.exceptions.RequestException:
-        return False
-
-def verify_hash(filepath, expected_hash):
-    """Verifica el hash SHA-256 de un archivo."""
-    sha256_hash = hashlib.sha256()
-    with open(filepath, "rb") as f:
-        for byte_block in iter(lambda: f.read(4096), b""):
-            sha256_hash.update(byte_block)
-    file_hash = sha256_hash.hexdigest()
-    return file_hash.lower() == expected_hash.lower()
-
-def update_app(zip_filepath, install_path):
-    """Actualiza la aplicación de forma segura con el método de backup y rollback."""
-    backup_dir = f"{install_path}_backup"
-    
-    try:
-        if os.path.exists(install_path):
-            shutil.move(install_path, backup_dir)
-        
-        os.makedirs(install_path)
-        with zipfile.ZipFile(zip_filepath, 'r') as zip_ref:
-            zip_ref.extractall(install_path)
-        
-        if os.path.exists(backup_dir):
-            shutil.rmtree(backup_dir)
-            
-        return True
-    except Exception as e:
-        QMessageBox.critical(None, "Error de Actualización", f"No se pudo actualizar la aplicación. Se restauró la versión anterior. Error: {e}")
-        if os.path.exists(install_path):
-            shutil.rmtree(install_path)
-        if os.path.exists(backup_dir):
-            shutil.move(backup_dir, install_path)
-        return False
+
+    # Sin ejecutable en la versión activa (p. ej. en desarrollo) se inicia en este mismo proceso.
+    print(f"⚠️  No se encontró {app_exe}. Iniciando Modula en el proceso del launcher.")
+    launcher_window.hide()
+    import app_main
+    app_main.start_modula_app(QApplication.instance())
+    return False
 
 # --- Lógica principal del lanzador ---
-def check_for_updates_logic(window, install_path):
-    current_version = get_current_version(install_path)
-    try:
-        response = requests.get(f"{API_URL}?version={current_version}", timeout=10)
-        response.raise_for_status()
-        if response.status_code == 204:
-            window.set_status(f"Abriendo Modula v{current_version}")
-            # CORREGIDO: Pasamos 'window' a run_modula
-            QTimer.singleShot(1500, lambda: run_modula(window))
-            return
-            
-        update_info = response.json()
+class UpdateWorker(QObject):
+    """
+    Revisa, descarga e instala la actualización en un QThread. No toca la ventana:
+    solo emite señales, así la interfaz sigue respondiendo durante la descarga,
+    la verificación del hash y la extracción.
+    """
+    status = Signal(str)
+    progress = Signal(int)      # 0-100, o -1 para progreso indeterminado
+    finished = Signal(str, int) # mensaje final, ms antes de abrir Modula
+
+    def __init__(self, install_path):
+        super().__init__()
+        self.install_path = install_path
+        self._cancelado = threading.Event()
+
+    def cancel(self):
+        """Pide detener la actualización; la descarga se corta en el siguiente bloque."""
+        self._cancelado.set()
+
+    def _revisar_cancelacion(self, _n_bytes=0):
+        if self._cancelado.is_set():
+            raise UpdateCancelled()
+
+    def run(self):
+        try:
+            mensaje, espera_ms = self._actualizar()
+        except UpdateCancelled:
+            mensaje, espera_ms = "Actualización omitida. Iniciando versión actual.", 0
+        except requests.exceptions.RequestException:
+            mensaje, espera_ms = "Error de red. Iniciando versión actual.", 2000
+        except Exception as e:
+            print(f"❌ Error inesperado al actualizar: {e}")
+            mensaje, espera_ms = "No se pudo actualizar. Iniciando versión actual.", 2000
+        self.finished.emit(mensaje, espera_ms)
+
+    def _actualizar(self):
+        install_path = self.install_path
+        # 0. Si la app ya descargó y verificó una versión en segundo plano, aplicarla es
+        #    solo mover archivos locales: no hay descarga al arrancar.
+        staged = get_staged_update(install_path)
+        if staged:
+            self.status.emit(f"Aplicando actualización {staged['version']}...")
+            apply_staged_update(install_path)
+
+        current_version = get_current_version(install_path)
+        update_info = check_for_update(current_version)
+        self._revisar_cancelacion()
+        if update_info is None:
+            return f"Abriendo Modula v{current_version}", 1500
+
         new_version = update_info.get("version")
+        # Una versión de la que se hizo rollback no se vuelve a instalar sola.
+        if is_version_skipped(install_path, new_version):
+            print(f"⏭️  La versión {new_version} se omitió con --rollback; no se reinstala.")
+            return f"Abriendo Modula v{current_version}", 1500
+
         download_url = update_info.get("url")
         expected_hash = update_info.get("hash")
-        window.set_status(f"Descargando versión {new_version}...")
-        window.progress_bar.setRange(0, 100)
-        zip_save_path = "update_package.zip"
-        
-        def update_progress(bytes_downloaded, total_size):
+        zip_save_path = os.path.join(tempfile.gettempdir(), "modula_update_package.zip")
+
+        def update_progress(bytes_downloaded, total_size, bytes_per_second):
+            # TransferProgress ya limita la frecuencia de estas llamadas.
             if total_size > 0:
-                percent = int((bytes_downloaded / total_size) * 100)
-                window.progress_bar.setValue(percent)
-                
-        if not download_update(download_url, zip_save_path, update_progress):
-            window.set_status("Error de descarga. Iniciando versión actual.")
-            # CORREGIDO: Pasamos 'window' a run_modula
-            QTimer.singleShot(2000, lambda: run_modula(window))
-            return
-            
-        window.set_status("Verificando integridad del archivo...")
-        window.progress_bar.setRange(0, 0)
-        
-        if not verify_hash(zip_save_path, expected_hash):
-            window.set_status("Error de verificación. Archivo corrupto.")
+                self.progress.emit(int((bytes_downloaded / total_size) * 100))
+            self.status.emit(f"Descargando versión {new_version}... "
+                             f"{bytes_downloaded / 1_048_576:.1f} MB ({bytes_per_second / 1_048_576:.1f} MB/s)")
+
+        # 1. Actualización diferencial: si el servidor publica el manifiesto de archivos
+        #    de la versión, descargamos solo los archivos que cambiaron.
+        manifest = None
+        manifest_url = update_info.get("manifest_url")
+        if manifest_url:
+            self.status.emit(f"Revisando archivos de la versión {new_version}...")
+            manifest = fetch_update_manifest(manifest_url)
+        if manifest:
+            files_base_url = update_info.get("files_url") or manifest_url.rsplit("/", 1)[0]
+            self.status.emit(f"Descargando cambios de la versión {new_version}...")
+            self.progress.emit(0)
+            if stage_differential_update(install_path, manifest, files_base_url, update_progress,
+                                         on_chunk=self._revisar_cancelacion):
+                self._revisar_cancelacion()
+                if apply_staged_update(install_path):
+                    return f"Abriendo Modula v{new_version}", 1500
+            self.status.emit("No se pudo aplicar la actualización parcial. Descargando paquete completo...")
+
+        # 2. Respaldo: paquete completo. El hash se calcula mientras se descarga,
+        #    así que al terminar la descarga el paquete ya está verificado.
+        self.status.emit(f"Descargando versión {new_version}...")
+        self.progress.emit(0)
+        # El total sale del Content-Length de la descarga; 'size' del servidor es solo respaldo.
+        progreso = TransferProgress(update_info.get("size", 0), update_progress)
+
+        def on_start(total_bytes):
+            if total_bytes > 0:
+                progreso.total = total_bytes
+
+        def on_chunk(n_bytes):
+            self._revisar_cancelacion()
+            progreso(n_bytes)
+
+        if not download_file(download_url, zip_save_path, expected_hash, on_chunk, on_start):
+            return "Error de descarga o de verificación. Iniciando versión actual.", 2000
+        progreso.finish()
+
+        try:
+            self._revisar_cancelacion()
+            self.status.emit("Instalando actualización...")
+            self.progress.emit(-1)
+            # La versión se extrae en su propia carpeta y se activa cambiando el puntero.
+            # La extracción revisa la cancelación entre archivos y, si se cancela,
+            # borra la carpeta a medias.
+            if not stage_full_package(install_path, new_version, zip_save_path,
+                                      on_member=self._revisar_cancelacion):
+                return "No se pudo instalar la actualización. Iniciando versión actual.", 2000
+        finally:
             os.remove(zip_save_path)
-            # CORREGIDO: Pasamos 'window' a run_modula
-            QTimer.singleShot(2000, lambda: run_modula(window))
+        # Si se canceló justo después de extraer, la versión queda preparada y se
+        # aplica en el próximo arranque (paso 0), sin volver a descargarla.
+        self._revisar_cancelacion()
+        if not apply_staged_update(install_path):
+            return "No se pudo instalar la actualización. Iniciando versión actual.", 2000
+        return f"Abriendo Modula v{new_version}", 1500
+
+class LauncherController(QObject):
+    """
+    Conecta el UpdateWorker con la ventana y garantiza que Modula se abra una sola
+    vez: al terminar la actualización, al omitirla (botón o Esc) o al vencer el
+    plazo máximo, lo que ocurra primero.
+    """
+    def __init__(self, window, install_path, deadline_ms: int = UPDATE_DEADLINE_MS):
+        super().__init__(window)
+        self.window = window
+        self.install_path = install_path
+        self.deadline_ms = deadline_ms
+        self.update_thread = None
+        self.update_worker = None
+        self._modula_iniciado = False
+
+        self.deadline_timer = QTimer(self)
+        self.deadline_timer.setSingleShot(True)
+        self.deadline_timer.timeout.connect(self._on_deadline)
+        self.window.skip_requested.connect(self.skip_update)
+
+    def start(self):
+        self.update_thread = QThread()
+        self.update_worker = UpdateWorker(self.install_path)
+        self.update_worker.moveToThread(self.update_thread)
+
+        self.update_thread.started.connect(self.update_worker.run)
+        self.update_worker.status.connect(self.window.set_status)
+        self.update_worker.progress.connect(self.window.set_progress)
+        self.update_worker.finished.connect(self._on_update_finished)
+        self.update_worker.finished.connect(self.update_thread.quit)
+        self.update_worker.finished.connect(self.update_worker.deleteLater)
+        self.update_thread.finished.connect(self._on_thread_finished)
+        self.update_thread.finished.connect(self.update_thread.deleteLater)
+
+        self.deadline_timer.start(self.deadline_ms)
+        self.update_thread.start()
+
+    def skip_update(self):
+        if self._modula_iniciado:
             return
-            
-        window.set_status("Instalando actualización...")
-        if not update_app(zip_save_path, install_path):
-            # CORREGIDO: Pasamos 'window' a run_modula
-            QTimer.singleShot(2000, lambda: run_modula(window))
+        self.window.set_status("Omitiendo actualización. Iniciando versión actual.")
+        self._cancelar_y_abrir()
+
+    def _on_deadline(self):
+        if self._modula_iniciado:
             return
-            
-        os.remove(zip_save_path)
-        window.set_status(f"Abriendo Modula v{new_version}")
-        # CORREGIDO: Pasamos 'window' a run_modula
-        QTimer.singleShot(1500, lambda: run_modula(window))
-        
-    except requests.exceptions.RequestException as e:
-        window.set_status("Error de red. Iniciando versión actual.")
-        # CORREGIDO: Pasamos 'window' a run_modula
-        QTimer.singleShot(2000, lambda: run_modula(window))
-        
+        self.window.set_status("La actualización está tardando demasiado. Iniciando versión actual.")
+        self._cancelar_y_abrir()
+
+    def _cancelar_y_abrir(self):
+        # No esperamos al hilo: corta la descarga en el siguiente bloque y nunca
+        # cambia la versión activa después de cancelado.
+        if self.update_worker is not None:
+            self.update_worker.cancel()
+        self._abrir_modula()
+
+    def _on_update_finished(self, mensaje, espera_ms):
+        self.update_worker = None
+        self.deadline_timer.stop()
+        if self._modula_iniciado:
+            return
+        self.window.set_status(mensaje)
+        QTimer.singleShot(espera_ms, self._abrir_modula)
+
+    def _on_thread_finished(self):
+        self.update_thread = None
+
+    def _abrir_modula(self):
+        if self._modula_iniciado:
+            return
+        self._modula_iniciado = True
+        self.deadline_timer.stop()
+        if run_modula(self.window, self.install_path):
+            self._cerrar_launcher()
+
+    def _cerrar_launcher(self):
+        """
+        Cierra el launcher cuando su hilo ya terminó: Qt aborta el proceso si se
+        destruye un QThread en marcha, y el worker cancelado todavía tiene que
+        borrar la descarga y la carpeta a medias.
+        """
+        app = QApplication.instance()
+        if self.update_thread is None:
+            app.quit()
+            return
+        self.window.skip_button.hide()
+        self.window.set_progress(-1)
+        self.window.set_status("Cerrando el actualizador...")
+        self.update_thread.finished.connect(app.quit)
+
 class LauncherWindow(QWidget):
     """La ventana de la interfaz gráfica del lanzador, ahora con el estilo de Modula."""
+    skip_requested = Signal()  # el usuario quiere abrir la versión actual sin esperar
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Modula POS Launcher")
@@ -190,9 +290,8 @@ class LauncherWindow(QWidget):
         """)
         
         logo_label = QLabel()
-        # NOTA: Asegúrate de tener los recursos del launcher compilados
-        pixmap_modula = QPixmap(":/launcher_assets/logo_modula.png") 
-        logo_label.setPixmap(pixmap_modula.scaled(80, 80, Qt.KeepAspectRatio, Qt.SmoothTransformation))
+        # Las imágenes vienen pre-escaladas en resources.rcc (tools/build_resources.py)
+        logo_label.setPixmap(load_pixmap("logo_modula", 80))
         logo_label.setAlignment(Qt.AlignCenter)
         
         title_label = QLabel("MODULA POS")
@@ -206,6 +305,12 @@ class LauncherWindow(QWidget):
         self.progress_bar = QProgressBar(self)
         self.progress_bar.setRange(0, 0)
         self.progress_bar.setTextVisible(False)
+
+        self.skip_button = QPushButton("Omitir actualización (Esc)", self)
+        self.skip_button.setFlat(True)
+        self.skip_button.setCursor(Qt.PointingHandCursor)
+        self.skip_button.setStyleSheet("font-size: 12px; color: #6B7280; border: none;")
+        self.skip_button.clicked.connect(self.skip_requested.emit)
         
         footer_container = QWidget()
         footer_layout = QHBoxLayout(footer_container)
@@ -216,8 +321,7 @@ class LauncherWindow(QWidget):
         footer_text.setStyleSheet("font-size: 12px; color: #6B7280;")
         
         footer_logo = QLabel()
-        pixmap_addsy = QPixmap(":/launcher_assets/logo_addsy_powered.png")
-        footer_logo.setPixmap(pixmap_addsy.scaledToHeight(16, Qt.SmoothTransformation))
+        footer_logo.setPixmap(load_pixmap("logo_addsy_powered", 16))
         
         footer_layout.addStretch()
         footer_layout.addWidget(footer_text)
@@ -231,6 +335,7 @@ class LauncherWindow(QWidget):
         container_layout.addSpacing(20)
         container_layout.addWidget(self.status_label)
         container_layout.addWidget(self.progress_bar)
+        container_layout.addWidget(self.skip_button, alignment=Qt.AlignCenter)
         container_layout.addStretch(2)
         container_layout.addWidget(footer_container)
         container_layout.setContentsMargins(40, 20, 40, 20)
@@ -241,12 +346,26 @@ class LauncherWindow(QWidget):
 
     def set_status(self, text):
         self.status_label.setText(text)
-        QCoreApplication.processEvents()
         print(text)
 
+    def set_progress(self, value):
+        """value entre 0 y 100, o -1 para mostrar la barra en modo indeterminado."""
+        if value < 0:
+            self.progress_bar.setRange(0, 0)
+        else:
+            self.progress_bar.setRange(0, 100)
+            self.progress_bar.setValue(value)
+
+    def keyPressEvent(self, event):
+        if event.key() == Qt.Key_Escape:
+            self.skip_requested.emit()
+            return
+        super().keyPressEvent(event)
+
 if __name__ == '__main__':
     # 1. Crea la aplicación PRIMERO
     app = QApplication(sys.argv)
+    register_resources()
 
     # NUEVO: Establecer el ícono global de la aplicación
     # Esto asegura que todas las ventanas y la barra de tareas tengan el ícono correcto.
@@ -263,12 +382,17 @@ if __name__ == '__main__':
         QMessageBox.critical(None, "Error", "Modula no está instalado. Ejecute el instalador.")
         sys.exit(1)
     
+    # Volver a la versión anterior es solo cambiar el puntero de versión activa.
+    if "--rollback" in sys.argv:
+        rollback_version(install_path)
+
     # 3. Si todo está bien, crea y muestra la ventana principal
     window = LauncherWindow()
     window.show()
     window.activateWindow()
     window.raise_()
     
-    # 4. Inicia la lógica de actualización y el bucle de eventos
-    QTimer.singleShot(500, lambda: check_for_updates_logic(window, install_path))
+    # 4. Inicia la actualización en su propio hilo y el bucle de eventos
+    controller = LauncherController(window, install_path)
+    QTimer.singleShot(500, controller.start)
     sys.exit(app.exec())
\ No newline at end of file
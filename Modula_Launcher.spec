@@ -5,7 +5,8 @@ a = Analysis(
     ['Modula_Launcher.py'],
     pathex=[],
     binaries=[],
-    datas=[('src/assets', 'assets')],
+    # src/resources.rcc se genera con tools/build_resources.py antes de empaquetar
+    datas=[('src/assets', 'assets'), ('src/resources.rcc', '.')],
     hiddenimports=[],
     hookspath=[],
     hooksconfig={},
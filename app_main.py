@@ -1,9 +1,13 @@
 # app_main.py (Modificado)
 import sys
-from PySide6.QtWidgets import QApplication
-from dotenv import load_dotenv
-from src.core.utils import resource_path
-from src.core.app_controller import AppController
+# Se importa primero: su carga marca el origen de la línea de tiempo del arranque.
+from src.core.startup_timeline import span
+with span("importaciones"):
+    from PySide6.QtWidgets import QApplication
+    from dotenv import load_dotenv
+    from src.core.utils import resource_path
+    from src.core.resources import register_resources
+    from src.core.app_controller import AppController
 
 # --- Función de arranque de la aplicación principal ---
 def start_modula_app(app_instance):
@@ -14,18 +18,24 @@ def start_modula_app(app_instance):
     # Cargar las variables de entorno
     load_dotenv()
 
+    # Registrar los recursos compilados (resources.rcc) antes de construir cualquier vista
+    with span("recursos"):
+        register_resources()
+
     # Cargar la hoja de estilos
-    try:
-        stylesheet_path = resource_path("assets/qss/style.qss")
-        with open(stylesheet_path, "r", encoding="utf-8") as f:
-            app_instance.setStyleSheet(f.read())
-    except FileNotFoundError:
-        print("Advertencia: No se encontró el archivo de estilos 'style.qss'.")
+    with span("hoja_de_estilos"):
+        try:
+            stylesheet_path = resource_path("assets/qss/style.qss")
+            with open(stylesheet_path, "r", encoding="utf-8") as f:
+                app_instance.setStyleSheet(f.read())
+        except FileNotFoundError:
+            print("Advertencia: No se encontró el archivo de estilos 'style.qss'.")
 
     # Iniciar el controlador principal de la aplicación
     # NOTA: El controlador necesitará ser un objeto persistente para que no sea eliminado por el recolector de basura.
     # Lo asignaremos a una propiedad de la instancia de la app.
-    app_instance.controller = AppController(app_instance)
+    with span("crear_controlador"):
+        app_instance.controller = AppController(app_instance)
     app_instance.controller.run()
 
 # --- Bloque de prueba (Opcional) ---
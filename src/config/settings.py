@@ -1,4 +1,13 @@
 # src/config/settings.py
+import os
 
 # URL base del backend alojado en Render.
-API_BASE_URL = 'https://modula-backend.onrender.com'
\ No newline at end of file
+API_BASE_URL = 'https://modula-backend.onrender.com'
+
+def get_api_base_url() -> str:
+    """URL del backend, que puede sobrescribirse con la variable MODULA_API_BASE_URL."""
+    return os.getenv("MODULA_API_BASE_URL", API_BASE_URL)
+
+def get_update_check_url() -> str:
+    """Endpoint que informa si hay una versión más nueva de la aplicación."""
+    return f"{get_api_base_url()}/api/v1/update/check"
@@ -5,16 +5,32 @@ from pathlib import Path
 import hashlib
 from src.core.local_storage import calcular_hash_md5
 from src.core.utils import get_network_identifiers
+from src.config.settings import get_api_base_url
 from datetime import datetime
 import uuid
 
 class ApiClient:
     """Gestiona toda la comunicación con el backend de Modula."""
     def __init__(self):
-        self.base_url = os.getenv("MODULA_API_BASE_URL", "https://modula-backend.onrender.com")
+        self.base_url = get_api_base_url()
         if not self.base_url:
             raise ValueError("La URL del API no está configurada. Revisa tu archivo .env")
         self.auth_token = None
+        # Monitor de conectividad opcional (ver src/core/connectivity.py).
+        self.connectivity = None
+
+    def set_connectivity_monitor(self, monitor):
+        """Conecta un ConnectivityMonitor para fallar al instante mientras no hay conexión."""
+        self.connectivity = monitor
+
+    def _ensure_online(self):
+        """
+        Lanza httpx.ConnectError de inmediato si el monitor indica que estamos offline.
+        Al ser un httpx.RequestError, los manejadores existentes lo tratan igual que
+        un fallo de red real, pero sin esperar el timeout de la petición.
+        """
+        if self.connectivity is not None and self.connectivity.is_offline():
+            raise httpx.ConnectError("Sin conexión con el servidor (modo offline).")
     
     def _get_auth_headers(self):
         """Crea el diccionario de cabeceras para una petición autenticada."""
@@ -34,6 +50,7 @@ class ApiClient:
         headers = self._get_auth_headers()
 
         try:
+            self._ensure_online()
             # Usamos un bloque 'with' para asegurar que el cliente se cierre
             with httpx.Client() as client:
                 response = client.request(
@@ -82,6 +99,7 @@ class ApiClient:
         """
         url = f"{self.base_url}/api/v1/auth/registrar-cuenta"
         try:
+            self._ensure_online()
             with httpx.Client() as client:
                 response = client.post(url, json=datos_registro, timeout=15.0)
             response.raise_for_status()
@@ -109,6 +127,7 @@ class ApiClient:
         payload = {"correo": correo, "contrasena": contrasena}
         
         try:
+            self._ensure_online()
             with httpx.Client() as client:
                 response = client.post(url, json=payload, timeout=10.0)
 
@@ -137,6 +156,7 @@ class ApiClient:
         url = f"{self.base_url}/api/v1/terminales/buscar-por-hardware"
         payload = {"id_terminal": hardware_id}
         try:
+            self._ensure_online()
             with httpx.Client() as client:
                 response = client.post(url, json=payload, timeout=15.0)
             # Levanta una excepción para errores 4xx o 5xx
@@ -159,21 +179,31 @@ class ApiClient:
         payload = {"id_terminal": terminal_id, **network_ids}
         
         try:
+            self._ensure_online()
             with httpx.Client() as client:
                 response = client.post(url, json=payload, timeout=15.0)
             response.raise_for_status()
             return response.json()
         except httpx.HTTPStatusError as e:
+            # Un 5xx es un fallo del servidor, no un rechazo de la terminal.
+            if e.response.status_code >= 500:
+                return {"status": "error", "message": f"Error del servidor (código {e.response.status_code})", "transitorio": True}
             # --- 👇 APLICAMOS LA MISMA LÓGICA ROBUSTA AQUÍ ---
             try:
                 # Intenta leer el JSON de la respuesta de error (ej. {"detail": "Not Found"})
-                return e.response.json()
+                respuesta = e.response.json()
             except Exception:
-                # Si la respuesta no es JSON (ej. un 500), creamos un diccionario de error
-                return {"status": "error", "message": f"Error del servidor (código {e.response.status_code})"}
+                # Una respuesta que no es JSON (p. ej. de un proxy) no es un veredicto del backend.
+                return {"status": "error", "message": f"Error del servidor (código {e.response.status_code})",
+                        "transitorio": True}
+            # El código HTTP permite distinguir un rechazo real (403/404) de un 401, 408 o 429.
+            if isinstance(respuesta, dict):
+                respuesta.setdefault("http_status", e.response.status_code)
+            return respuesta
                 
         except httpx.RequestError:
-            return {"status": "error", "message": "No se pudo conectar con el servidor."}
+            # 'transitorio': la nube no dio un veredicto; no implica que la terminal esté revocada.
+            return {"status": "error", "message": "No se pudo conectar con el servidor.", "transitorio": True}
 
     def anclar_red_a_sucursal(self, id_sucursal: int, network_ids: dict):
         """
@@ -190,6 +220,7 @@ class ApiClient:
         payload = network_ids
         
         try:
+            self._ensure_online()
             with httpx.Client() as client:
                 response = client.post(url, headers=headers, json=payload, timeout=15.0)
             response.raise_for_status()
@@ -209,6 +240,7 @@ class ApiClient:
         headers = {"Authorization": f"Bearer {self.auth_token}"}
         payload = {"nombre": nombre_sucursal}
         try:
+            self._ensure_online()
             with httpx.Client() as client:
                 response = client.post(url, headers=headers, json=payload, timeout=10.0)
             response.raise_for_status()
@@ -229,6 +261,7 @@ class ApiClient:
         payload = {"id_terminal_origen": id_terminal, "id_sucursal_destino": id_sucursal}
         
         try:
+            self._ensure_online()
             with httpx.Client() as client:
                 response = client.post(url, headers=headers, json=payload, timeout=15.0)
             response.raise_for_status()
@@ -249,6 +282,7 @@ class ApiClient:
         payload = {"id_terminal_origen": id_terminal, "nombre_nueva_sucursal": nombre_sucursal}
         
         try:
+            self._ensure_online()
             with httpx.Client() as client:
                 response = client.post(url, headers=headers, json=payload, timeout=20.0) # Mayor timeout
             response.raise_for_status()
@@ -266,6 +300,7 @@ class ApiClient:
         url = f"{self.base_url}/api/v1/sucursales/mi-cuenta"
         headers = {"Authorization": f"Bearer {self.auth_token}"}
         try:
+            self._ensure_online()
             with httpx.Client() as client:
                 response = client.get(url, headers=headers, timeout=10.0)
             response.raise_for_status()
@@ -282,6 +317,7 @@ class ApiClient:
         headers = {"Authorization": f"Bearer {self.auth_token}"}
         
         try:
+            self._ensure_online()
             # Reutilizamos el cliente httpx si ya existe, o creamos uno nuevo
             with httpx.Client() as client:
                 response = client.get(url, headers=headers, timeout=15.0)
@@ -303,6 +339,7 @@ class ApiClient:
         headers = {"Authorization": f"Bearer {self.auth_token}"}
         
         try:
+            self._ensure_online()
             with httpx.Client() as client:
                 # El backend espera un JSON con los datos de la nueva terminal
                 response = client.post(url, headers=headers, json=datos_terminal, timeout=15.0)
@@ -317,6 +354,7 @@ class ApiClient:
     def check_activation_status(self, claim_token: str) -> dict:
         url = f"{self.base_url}/api/v1/auth/check-activation-status/{claim_token}"
         try:
+            self._ensure_online()
             with httpx.Client() as client:
                 response = client.get(url, timeout=10.0)
             response.raise_for_status()
@@ -332,6 +370,7 @@ class ApiClient:
         url = f"{self.base_url}/api/v1/auth/solicitar-reseteo"
         payload = {"email": email}
         try:
+            self._ensure_online()
             with httpx.Client() as client:
                 response = client.post(url, json=payload, timeout=15.0)
             response.raise_for_status()
@@ -362,6 +401,7 @@ class ApiClient:
         }
         
         try:
+            self._ensure_online()
             with httpx.Client() as client:
                 response = client.post(url, headers=headers, json=payload, timeout=30.0)
             response.raise_for_status()
@@ -381,6 +421,7 @@ class ApiClient:
         ruta_local_destino.parent.mkdir(parents=True, exist_ok=True)
         
         try:
+            self._ensure_online()
             with httpx.stream("GET", url, headers=headers, timeout=120.0) as response:
                 response.raise_for_status()
                 with open(ruta_local_destino, "wb") as f:
@@ -404,6 +445,7 @@ class ApiClient:
         url = f"{self.base_url}/api/v1/sync/upload/{key_cloud}"
         headers = {'Authorization': f'Bearer {self.auth_token}', 'X-Base-Version-Hash': hash_base}
         try:
+            self._ensure_online()
             with open(ruta_local, 'rb') as f:
                 with httpx.Client() as client:
                     response = client.post(url, files={'file': f}, headers=headers)
@@ -432,6 +474,7 @@ class ApiClient:
         headers = {"Authorization": f"Bearer {self.auth_token}"}
         
         try:
+            self._ensure_online()
             with httpx.Client() as client:
                 response = client.post(url, headers=headers, timeout=120.0)
             
@@ -449,6 +492,7 @@ class ApiClient:
         # ✅ LÍNEA CRÍTICA: Llama a la función de limpieza antes de enviar.
         sanitized_data = self._sanitize_data_for_json(push_data)
         
+        self._ensure_online()
         with httpx.Client() as client:
             response = client.post(url, headers=headers, json=sanitized_data, timeout=120.0)
         
@@ -466,6 +510,7 @@ class ApiClient:
         local_destination.parent.mkdir(parents=True, exist_ok=True)
         
         try:
+            self._ensure_online()
             with httpx.stream("GET", url, headers=headers, timeout=120.0) as response:
                 response.raise_for_status()
                 with open(local_destination, "wb") as f:
@@ -486,6 +531,7 @@ class ApiClient:
         url = f"{self.base_url}/api/v1/sync/get-deltas"
         headers = {"Authorization": f"Bearer {self.auth_token}"}
         try:
+            self._ensure_online()
             with httpx.Client() as client:
                 response = client.post(url, headers=headers, json=sync_timestamps, timeout=30.0)
             response.raise_for_status()
@@ -493,6 +539,42 @@ class ApiClient:
         except Exception as e:
             raise Exception(f"Error al obtener deltas: {e}")
         
+    def check_for_changes(self, sync_timestamps: dict, etag: str = None) -> dict:
+        """
+        Sonda barata antes del pull completo: pregunta al backend si algo cambió
+        desde los cursores dados, como GET condicional (If-None-Match).
+
+        Devuelve un diccionario con:
+            changed: False si el servidor respondió 304 (no hay nada nuevo).
+            tables:  lista de tablas que cambiaron (si el servidor la informa).
+            etag:    el ETag a guardar una vez aplicado el pull completo.
+            supported: False si el backend no implementa la sonda; en ese caso
+                       el llamador debe hacer el pull completo como antes.
+        """
+        if not self.auth_token: raise Exception("Autenticación requerida.")
+        url = f"{self.base_url}/api/v1/sync/changes"
+        headers = {"Authorization": f"Bearer {self.auth_token}"}
+        if etag:
+            headers["If-None-Match"] = etag
+        try:
+            self._ensure_online()
+            with httpx.Client() as client:
+                response = client.get(url, headers=headers, params={"since": sync_timestamps.get("global")}, timeout=10.0)
+            if response.status_code == 304:
+                return {"changed": False, "tables": [], "etag": etag, "supported": True}
+            if response.status_code in (404, 405, 501):
+                return {"changed": True, "tables": None, "etag": None, "supported": False}
+            response.raise_for_status()
+            data = response.json()
+            return {
+                "changed": bool(data.get("changed_tables", True)),
+                "tables": data.get("changed_tables"),
+                "etag": response.headers.get("ETag"),
+                "supported": True,
+            }
+        except Exception as e:
+            raise Exception(f"Error al consultar cambios: {e}")
+
     def get_modules_manifest(self):
         """
         Obtiene el manifiesto de módulos desde el backend.
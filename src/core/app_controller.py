@@ -2,133 +2,240 @@
 import webbrowser
 import os
 import uuid
-import psutil
 import sqlite3
 from pathlib import Path
-import bcrypt
 from PySide6.QtWidgets import QMessageBox, QInputDialog, QApplication
 from PySide6.QtCore import QTimer, QObject, Signal, QThread
 from src.ui.main_window import MainWindow
-from src.core.api_client import ApiClient
-from src.core.local_storage import get_id_terminal, save_terminal_id, DB_DIR, get_local_db_file_info, get_pending_sync_records, mark_records_as_synced, ejecutar_migracion_sql, limpiar_datos_sucursal_anterior, get_last_sync_timestamps, apply_deltas, _get_local_max_timestamps,save_last_server_sync_timestamp
-from src.ui.dialogs import mostrar_dialogo_migracion, ResolverUbicacionDialog, SeleccionarSucursalDialog, RecuperarContrasenaDialog, NewTerminalDialog
-from src.ui.windows_dialogs.cambiar_contrasena_dialog import CambiarContrasenaDialog
+from src.core.local_storage import get_id_terminal, save_terminal_id, DB_DIR, get_local_db_file_info, get_pending_sync_records, mark_records_as_synced, ejecutar_migracion_sql, limpiar_datos_sucursal_anterior, get_last_sync_timestamps, apply_deltas, _get_local_max_timestamps,save_last_server_sync_timestamp, get_sync_probe_etag, save_sync_probe_etag, get_local_change_marker, hay_cambios_locales, save_local_scan_marker, save_verified_session, get_verified_session, delete_verified_session
 import src.core.local_storage as local_storage
-from src.ui.views.login_view import LoginView
-from src.ui.views.dashboard_view import DashboardView
-from src.core.utils import get_network_identifiers
+from src.core.utils import get_network_identifiers, get_hardware_mac
+from src.core.network_identity import NetworkIdentityService
+from src.core.connectivity import ConnectivityMonitor
+from src.core.background_updater import BackgroundUpdater
+from src.core.startup_pipeline import StartupPipeline, DetenerArranque
+from src.core.startup_timeline import span, marcar, guardar_perfil_arranque
 from src.config.schema_config import TABLE_PRIMARY_KEYS
+from src.config.settings import get_api_base_url
 import time
 import shutil
-from PySide6.QtCore import QTimer
-from .module_manager import ModuleManager
-from .module_manager import MODULES_DIR 
+# NOTA: ApiClient (httpx), ModuleManager, bcrypt y los diálogos se importan en su
+# primer uso para que el arranque solo cargue lo necesario para pintar la LoadingView.
+# tools/check_import_time.py vigila este presupuesto.
+
+# Reintentos de la verificación tras un arranque rápido: 20 s, 40 s, 80 s... hasta 10 min.
+VERIFICACION_REINTENTO_INICIAL_MS = 20 * 1000
+VERIFICACION_REINTENTO_MAX_MS = 10 * 60 * 1000
+
+# Únicas respuestas de verificar_terminal que bloquean una sesión abierta desde la
+# caché: veredictos explícitos del backend. Cualquier otra cosa (401 por token
+# vencido, 408, 429, un 4xx de un proxy, un JSON inesperado...) se reintenta.
+ESTADOS_DE_RECHAZO = {"location_mismatch", "subscription_expired"}
+CODIGOS_DE_RECHAZO = {403, 404}
+
+def es_rechazo_de_terminal(respuesta) -> bool:
+    """True si la nube rechazó explícitamente la terminal (revocada, no encontrada...)."""
+    if not isinstance(respuesta, dict) or respuesta.get("transitorio") or respuesta.get("status") == "ok":
+        return False
+    return respuesta.get("status") in ESTADOS_DE_RECHAZO or respuesta.get("http_status") in CODIGOS_DE_RECHAZO
+
+def confirmar_terminal(controller, hardware_id: str) -> dict:
+    """
+    Verifica la terminal con la nube y, si la aprueba, deja listos el token, la
+    empresa y la sucursal, y guarda la sesión verificada para el próximo arranque.
+    Devuelve la respuesta de verificar_terminal.
+    """
+    api_client = controller.api_client
+    local_id = get_id_terminal()
+    respuesta = api_client.verificar_terminal(hardware_id)
+    if respuesta.get("status") != "ok":
+        return respuesta
+    if local_id != hardware_id:
+        save_terminal_id(hardware_id)
+
+    api_client.set_auth_token(respuesta["access_token"])
+    controller.id_empresa_addsy = respuesta['id_empresa']
+    controller.id_sucursal_actual = respuesta.get('id_sucursal')
+    # Recordamos la verificación para que el próximo arranque no tenga que esperarla.
+    save_verified_session(hardware_id, respuesta)
+    return respuesta
 
 class StartupWorker(QObject):
     """
     Orquesta un arranque inteligente y completo: autentica, prepara el entorno local
     y ejecuta el primer ciclo de sincronización delta antes de mostrar el login.
+
+    Con 'en_segundo_plano' el login local ya se mostró a partir de una sesión
+    verificada en caché: el worker solo confirma la terminal y sincroniza, sin
+    reemplazar las bases de datos que el cajero ya está usando.
     """
     progress = Signal(str, int)
     finished = Signal(object, list, list)
 
-    def __init__(self, controller_ref):
+    def __init__(self, controller_ref, en_segundo_plano: bool = False):
         super().__init__()
         self.controller = controller_ref
         self.api_client = controller_ref.api_client
+        self.en_segundo_plano = en_segundo_plano
         self.response = None
         
     def run(self):
-        """El trabajo pesado que se ejecuta en el hilo secundario."""
-        try:
-            # === FASE 1: VERIFICACIÓN Y AUTENTICACIÓN (Intacto) ===
-            self.progress.emit("Verificando terminal...", 10)
-            hardware_id = self.controller._generar_id_estable()
-            local_id = get_id_terminal()
-            
-            self.progress.emit("Verificando credenciales con el servidor...", 20)
-            if local_id and local_id == hardware_id:
-                self.response = self.api_client.verificar_terminal(hardware_id)
-            else:
-                self.response = self.api_client.verificar_terminal(hardware_id)
-                if self.response.get("status") == "ok":
-                    save_terminal_id(hardware_id)
-            
-            if self.response.get("status") != "ok":
-                self.finished.emit(self.response, [], []) 
-                return
-            
-            self.api_client.set_auth_token(self.response["access_token"])
-            id_sucursal = self.response['id_sucursal']
-            id_empresa = self.response['id_empresa']
-            self.controller.id_empresa_addsy = self.response['id_empresa']
-            
-            # === FASE 2: PREPARACIÓN INTELIGENTE DEL ENTORNO LOCAL (Intacto) ===
-            self.progress.emit("Revisando datos locales...", 30)
-            hay_datos_pendientes = bool(get_pending_sync_records(id_empresa))
+        """
+        El trabajo pesado que se ejecuta en el hilo secundario.
 
-            self.progress.emit("Preparando la nube para la sincronización...", 40)
-            cloud_plan = self.api_client.initialize_sync()
-            files_to_pull = cloud_plan.get("files_to_pull", [])
-            
-            if hay_datos_pendientes:
-                self.progress.emit("Datos locales pendientes detectados. Omitiendo descarga.", 50)
-            elif files_to_pull:
-                self.progress.emit("Descargando la versión más reciente de la nube...", 50)
-                ruta_empresa_local = DB_DIR / id_empresa
-                if ruta_empresa_local.exists():
-                    shutil.rmtree(ruta_empresa_local)
-                for i, key_path in enumerate(files_to_pull):
-                    progreso = 50 + int((i / len(files_to_pull)) * 20)
-                    nombre_archivo = Path(key_path).name
-                    self.progress.emit(f"Descargando {nombre_archivo}...", progreso)
-                    ruta_destino_local = DB_DIR / key_path
-                    ruta_destino_local.parent.mkdir(parents=True, exist_ok=True)
-                    self.api_client.pull_db_file(key_path, ruta_destino_local)
-            else:
-                self.progress.emit("Primera ejecución. Creando bases de datos locales...", 50)
-                # ... (Tu lógica para crear DBs desde plantillas va aquí) ...
-
-            # === FASE 3: PRIMERA SINCRONIZACIÓN DELTA COMPLETA (Lógica Añadida) ===
-            # PUSH: Enviamos cualquier cambio local que haya sobrevivido.
-            self.progress.emit("Enviando cambios locales...", 75)
-            pending_pushes = get_pending_sync_records(id_empresa)
-            if pending_pushes:
-                for push_data in pending_pushes:
-                    self.api_client.push_records(push_data)
+        El arranque se expresa como un grafo de etapas (ver StartupPipeline): las
+        que no dependen entre sí, como la revisión de módulos y la sincronización
+        de datos, corren en paralelo y el progreso mostrado es el combinado.
+        """
+        pipeline = StartupPipeline(on_progress=self.progress.emit)
 
-            # PULL: Pedimos los últimos cambios al servidor usando el marcador.
-            self.progress.emit("Recibiendo últimos cambios...", 85)
-            timestamps_para_pull = get_last_sync_timestamps(id_empresa)
-            response_package = self.api_client.get_deltas(timestamps_para_pull)
-            
-            delta_package = response_package.get("deltas")
-            server_timestamp = response_package.get("server_sync_timestamp")
+        # --- Etapas sin dependencias ---
+        pipeline.add("red", self._etapa_red, mensaje="Identificando la red local...")
+        pipeline.add("hardware", self._etapa_hardware, mensaje="Verificando terminal...")
 
-            if delta_package:
-                apply_deltas(id_empresa, delta_package)
-            
-            if server_timestamp:
-                save_last_server_sync_timestamp(id_empresa, server_timestamp)
+        # --- Verificación y autenticación ---
+        pipeline.add("verificacion", self._etapa_verificacion, depende_de=("red", "hardware"), peso=2,
+                     mensaje="Verificando credenciales con el servidor...")
 
-            # CLEANUP: Marcamos los registros que se subieron como sincronizados.
-            mark_records_as_synced(id_empresa)
-            
-                    # === NUEVA FASE: ACTUALIZACIÓN DE MÓDULOS ===
-            self.progress.emit("Revisando módulos...", 90)
-            self.controller.module_manager.check_for_updates()
-            installed_modules = self.controller.module_manager.get_installed_modules()
-            self.progress.emit("Módulos actualizados.", 95)
+        # --- Rama de datos (ruta crítica) ---
+        pipeline.add("pendientes", self._etapa_pendientes, depende_de=("verificacion",),
+                     mensaje="Revisando datos locales...")
+        pipeline.add("plan_nube", self._etapa_plan_nube, depende_de=("verificacion",), peso=2,
+                     mensaje="Preparando la nube para la sincronización...")
+        pipeline.add("descargas", self._etapa_descargas, depende_de=("pendientes", "plan_nube"), peso=3,
+                     mensaje="Descargando la versión más reciente de la nube...")
+        pipeline.add("push", self._etapa_push, depende_de=("descargas",), peso=2,
+                     mensaje="Enviando cambios locales...")
+        pipeline.add("pull", self._etapa_pull, depende_de=("push",), peso=2,
+                     mensaje="Recibiendo últimos cambios...")
+
+        # --- Rama de módulos (independiente de los datos) ---
+        pipeline.add("manifiesto_modulos", self._etapa_manifiesto_modulos, depende_de=("verificacion",),
+                     mensaje="Revisando módulos...")
+        pipeline.add("actualizar_modulos", self._etapa_actualizar_modulos, depende_de=("manifiesto_modulos",), peso=2,
+                     mensaje="Actualizando módulos...")
+        pipeline.add("modulos_instalados", self._etapa_modulos_instalados, depende_de=("actualizar_modulos",),
+                     mensaje="Cargando módulos...")
 
-            # === FASE FINAL: FINALIZACIÓN ===
+        try:
+            with span("arranque.total"):
+                resultados = pipeline.run()
             self.progress.emit("¡Arranque completado!", 100)
             # Emitimos el resultado, los logs Y la lista de módulos
-            self.finished.emit(self.response, ["Arranque y sincronización inicial completados."], installed_modules)
-
+            self.finished.emit(self.response, ["Arranque y sincronización inicial completados."],
+                               resultados["modulos_instalados"])
+        except DetenerArranque as detencion:
+            self.finished.emit(detencion.resultado, [], [])
         except Exception as e:
             import traceback
             traceback.print_exc()
-            self.finished.emit({"status": "error", "message": f"Error crítico en el arranque: {e}"}, [], [])
+            # 'transitorio': el fallo no es un rechazo de la terminal por parte de la nube.
+            self.finished.emit({"status": "error", "message": f"Error crítico en el arranque: {e}", "transitorio": True}, [], [])
+
+    # --- ETAPAS DEL ARRANQUE ---
+    # Cada etapa recibe el diccionario con los resultados de las etapas ya completadas.
+
+    def _etapa_red(self, _):
+        # Precalienta la caché de identificadores de red que usa verificar_terminal.
+        return get_network_identifiers()
+
+    def _etapa_hardware(self, _):
+        return self.controller._generar_id_estable()
+
+    def _etapa_verificacion(self, resultados):
+        self.response = confirmar_terminal(self.controller, resultados["hardware"])
+        if self.response.get("status") != "ok":
+            raise DetenerArranque(self.response)
+        return self.response['id_empresa']
+
+    def _etapa_pendientes(self, resultados):
+        return bool(get_pending_sync_records(resultados["verificacion"]))
+
+    def _etapa_plan_nube(self, _):
+        cloud_plan = self.api_client.initialize_sync()
+        return cloud_plan.get("files_to_pull", [])
+
+    def _etapa_descargas(self, resultados):
+        id_empresa = resultados["verificacion"]
+        files_to_pull = resultados["plan_nube"]
+
+        ruta_empresa_local = DB_DIR / id_empresa
+
+        if resultados["pendientes"]:
+            self.progress.emit("Datos locales pendientes detectados. Omitiendo descarga.", 50)
+        elif self.en_segundo_plano and ruta_empresa_local.exists():
+            # El cajero ya trabaja sobre estas bases: las ponemos al día solo con deltas.
+            self.progress.emit("Datos locales en uso. Omitiendo descarga completa.", 50)
+        elif files_to_pull:
+            if ruta_empresa_local.exists():
+                shutil.rmtree(ruta_empresa_local)
+            for i, key_path in enumerate(files_to_pull):
+                progreso = 50 + int((i / len(files_to_pull)) * 20)
+                nombre_archivo = Path(key_path).name
+                self.progress.emit(f"Descargando {nombre_archivo}...", progreso)
+                ruta_destino_local = DB_DIR / key_path
+                ruta_destino_local.parent.mkdir(parents=True, exist_ok=True)
+                self.api_client.pull_db_file(key_path, ruta_destino_local)
+        else:
+            self.progress.emit("Primera ejecución. Creando bases de datos locales...", 50)
+            # ... (Tu lógica para crear DBs desde plantillas va aquí) ...
+
+    def _etapa_push(self, resultados):
+        # PUSH: Enviamos cualquier cambio local que haya sobrevivido.
+        pending_pushes = get_pending_sync_records(resultados["verificacion"])
+        for push_data in pending_pushes:
+            self.api_client.push_records(push_data)
+
+    def _etapa_pull(self, resultados):
+        # PULL: Pedimos los últimos cambios al servidor usando el marcador.
+        id_empresa = resultados["verificacion"]
+        timestamps_para_pull = get_last_sync_timestamps(id_empresa)
+        response_package = self.api_client.get_deltas(timestamps_para_pull)
+
+        delta_package = response_package.get("deltas")
+        server_timestamp = response_package.get("server_sync_timestamp")
+
+        if delta_package:
+            apply_deltas(id_empresa, delta_package)
+
+        if server_timestamp:
+            save_last_server_sync_timestamp(id_empresa, server_timestamp)
+
+        # CLEANUP: Marcamos los registros que se subieron como sincronizados.
+        mark_records_as_synced(id_empresa)
+
+    def _etapa_manifiesto_modulos(self, _):
+        # Un fallo al pedir el manifiesto no debe impedir el arranque.
+        try:
+            return self.controller.module_manager.fetch_server_manifest()
+        except Exception as e:
+            print(f"⚠️  No se pudo obtener el manifiesto de módulos: {e}")
+            return None
+
+    def _etapa_actualizar_modulos(self, resultados):
+        if resultados["manifiesto_modulos"] is not None:
+            self.controller.module_manager.check_for_updates(resultados["manifiesto_modulos"])
+
+    def _etapa_modulos_instalados(self, _):
+        return self.controller.module_manager.get_installed_modules()
+
+class VerificacionWorker(QObject):
+    """
+    Tras un arranque rápido cuya verificación quedó pendiente, reintenta solo la
+    verificación de la terminal (sin sincronizar datos ni revisar módulos).
+    """
+    finished = Signal(object)
+
+    def __init__(self, controller_ref):
+        super().__init__()
+        self.controller = controller_ref
+
+    def run(self):
+        try:
+            respuesta = confirmar_terminal(self.controller, self.controller._generar_id_estable())
+        except Exception as e:
+            respuesta = {"status": "error", "message": f"Error al verificar la terminal: {e}", "transitorio": True}
+        self.finished.emit(respuesta)
             
 class RegisterWorker(QObject):
     """Ejecuta el proceso de registro en un hilo secundario."""
@@ -207,38 +314,48 @@ class SyncWorker(QObject):
     def run(self):
         try:
             # FASE 1: PUSH (Enviar cambios locales)
-            print("🔄 [SYNC] Buscando y enviando cambios locales...")
-            pending_pushes = get_pending_sync_records(self.id_empresa)
-            if pending_pushes:
+            # Solo escaneamos las DBs si algún archivo cambió desde el último escaneo.
+            marcador_local = get_local_change_marker(self.id_empresa)
+            hubo_push = False
+            if hay_cambios_locales(self.id_empresa, marcador_local):
+                print("🔄 [SYNC] Buscando y enviando cambios locales...")
+                pending_pushes = get_pending_sync_records(self.id_empresa)
                 for push_data in pending_pushes:
                     pk_column = TABLE_PRIMARY_KEYS.get(push_data['table_name'], 'uuid')
                     push_data['primary_key_column'] = pk_column
                     for record in push_data['records']:
                         if 'id' in record: del record['id']
                     self.api_client.push_records(push_data)
-            
+                hubo_push = bool(pending_pushes)
+
             # FASE 2: PULL (Recibir cambios de la nube)
-            print("🔄 [SYNC] Solicitando cambios de otras terminales...")
-            
-            # --- ▼▼▼ LA CORRECCIÓN FINAL Y DEFINITIVA ▼▼▼ ---
-            # Antes aquí llamábamos a la función incorrecta.
-            # Ahora llamamos a la que lee el marcador del servidor de sync_state.json
+            # Usamos el marcador del servidor guardado en sync_state.json.
             timestamps_para_pull = get_last_sync_timestamps(self.id_empresa)
-            # --- ▲▲▲ FIN DE LA CORRECCIÓN ▲▲▲ ---
 
-            response_package = self.api_client.get_deltas(timestamps_para_pull)
-            
-            delta_package = response_package.get("deltas")
-            server_timestamp = response_package.get("server_sync_timestamp")
+            # Sonda barata: si nada cambió en la nube (304) nos ahorramos el pull completo.
+            sonda = self.api_client.check_for_changes(timestamps_para_pull, get_sync_probe_etag(self.id_empresa))
+            if not sonda["changed"] and not hubo_push:
+                print("✅ [SYNC] Sin cambios en la nube ni locales. Ciclo omitido.")
+                if sonda["etag"]:
+                    save_sync_probe_etag(self.id_empresa, sonda["etag"])
+            else:
+                print(f"🔄 [SYNC] Solicitando cambios de otras terminales... (tablas: {sonda['tables'] or 'todas'})")
+                response_package = self.api_client.get_deltas(timestamps_para_pull)
 
-            if delta_package:
-                apply_deltas(self.id_empresa, delta_package)
-            
-            if server_timestamp:
-                save_last_server_sync_timestamp(self.id_empresa, server_timestamp)
+                delta_package = response_package.get("deltas")
+                server_timestamp = response_package.get("server_sync_timestamp")
+
+                if delta_package:
+                    apply_deltas(self.id_empresa, delta_package)
+
+                if server_timestamp:
+                    save_last_server_sync_timestamp(self.id_empresa, server_timestamp)
+                save_sync_probe_etag(self.id_empresa, sonda["etag"])
 
             # FASE 3: LIMPIEZA
-            mark_records_as_synced(self.id_empresa)
+            if hubo_push:
+                mark_records_as_synced(self.id_empresa)
+            save_local_scan_marker(self.id_empresa, marcador_local)
             self.finished.emit("success")
         except Exception as e:
             import traceback
@@ -251,8 +368,19 @@ class AppController(QObject):
         super().__init__()
         self.main_window = MainWindow(self) 
         self.app = app
-        self.api_client = ApiClient()
-        self.module_manager = ModuleManager(self.api_client, self)
+        self._api_client = None
+        self._module_manager = None
+        self.network_service = NetworkIdentityService(self)
+        self.network_service.red_cambiada.connect(self._on_red_cambiada)
+
+        # Monitor de conectividad: permite que ApiClient falle al instante sin conexión.
+        self.connectivity_monitor = ConnectivityMonitor(get_api_base_url(), self)
+        self.connectivity_monitor.estado_cambiado.connect(self.main_window.set_estado_conexion)
+        self.connectivity_monitor.conexion_restablecida.connect(self._on_conexion_restablecida)
+
+        # Descarga de la siguiente versión en segundo plano; el launcher la aplica al reiniciar.
+        self.background_updater = BackgroundUpdater(self.connectivity_monitor, self)
+        self.background_updater.actualizacion_preparada.connect(self._on_actualizacion_preparada)
         
         # Atributos únicos para CADA tarea asíncrona
         self.startup_thread = None
@@ -263,6 +391,8 @@ class AppController(QObject):
         self.sync_worker = None
         self.module_update_thread = None
         self.module_update_worker = None
+        self.verificacion_thread = None
+        self.verificacion_worker = None
         
         self.respuesta_conflicto = None
         self.claim_token = None
@@ -270,32 +400,132 @@ class AppController(QObject):
         self.polling_timer.timeout.connect(self._poll_for_activation)
         
         self.id_empresa_addsy = None
+        self.id_sucursal_actual = None
+        self._data_access = None
+        # True mientras se trabaja con una sesión en caché que la nube aún no confirmó.
+        self.verificacion_pendiente = False
+        self.arranque_en_segundo_plano = False
         
         self.sync_timer = QTimer(self)
         self.sync_timer.timeout.connect(self.sincronizar_ahora)
+
+        # Reintento de la verificación pendiente, con espera creciente entre intentos.
+        self.verificacion_timer = QTimer(self)
+        self.verificacion_timer.setSingleShot(True)
+        self.verificacion_timer.timeout.connect(self.reintentar_verificacion)
+        self._espera_verificacion_ms = VERIFICACION_REINTENTO_INICIAL_MS
+
+        # Módulos permitidos en esta terminal y su precarga tras el login (ver _entrar_al_dashboard)
+        self.modulos_instalados = []
+        self.module_preloader = None
         
         self._connect_signals()
 
+    @property
+    def data_access(self):
+        """Acceso a datos compartido por los módulos (ModulaModuleBase.db)."""
+        if self._data_access is None:
+            from src.core.data_access import DataAccess
+            self._data_access = DataAccess(self)
+        return self._data_access
+
+    @property
+    def api_client(self):
+        """ApiClient compartido; se crea (e importa httpx) en el primer uso."""
+        if self._api_client is None:
+            from src.core.api_client import ApiClient
+            self._api_client = ApiClient()
+            self._api_client.set_connectivity_monitor(self.connectivity_monitor)
+        return self._api_client
+
+    @property
+    def module_manager(self):
+        """ModuleManager compartido; se crea en el primer uso."""
+        if self._module_manager is None:
+            from src.core.module_manager import ModuleManager
+            self._module_manager = ModuleManager(self.api_client, self)
+        return self._module_manager
+
     def _connect_signals(self):
-        self.main_window.auth_view.login_solicitado.connect(self.handle_account_login_and_activate)
-        self.main_window.auth_view.registro_solicitado.connect(self.handle_register)
-        self.main_window.auth_view.recuperacion_solicitada.connect(self.handle_recovery_request)
-        
+        # Las vistas se construyen bajo demanda: conectamos sus señales al crearse.
+        self.main_window.vista_creada.connect(self._on_vista_creada)
+
+    def _on_vista_creada(self, nombre: str, vista):
+        if nombre == "auth":
+            vista.login_solicitado.connect(self.handle_account_login_and_activate)
+            vista.registro_solicitado.connect(self.handle_register)
+            vista.recuperacion_solicitada.connect(self.handle_recovery_request)
 
     def run(self):
         self.main_window.show()
-        self._iniciar_arranque_inteligente()
+        marcar("ventana_visible")
+        # La huella de red se calcula en segundo plano mientras arranca la verificación.
+        self.network_service.start()
+        self.connectivity_monitor.start()
+        self.background_updater.start()
+        # Diferimos el arranque al bucle de eventos para que la LoadingView se pinte
+        # antes de importar httpx y crear los workers.
+        QTimer.singleShot(0, self._iniciar_arranque_inteligente)
+
+    def _on_red_cambiada(self, identificadores: dict):
+        """Se ejecuta solo cuando el gateway o el SSID cambian realmente."""
+        print(f"🌐 La terminal cambió de red: {identificadores}")
+        # Un cambio de red suele ir acompañado de un corte: comprobamos la conexión ya.
+        self.connectivity_monitor.sondear_ahora()
+
+    def _on_conexion_restablecida(self):
+        """Al volver la conexión, sincronizamos de inmediato lo acumulado offline."""
+        # Si la terminal aún no se verificó, primero se reintenta la verificación.
+        if self.verificacion_pendiente:
+            print("📡 Conexión restablecida. Reintentando la verificación de la terminal...")
+            self._espera_verificacion_ms = VERIFICACION_REINTENTO_INICIAL_MS
+            self.reintentar_verificacion()
+        elif self.sync_timer.isActive():
+            print("📡 Conexión restablecida. Lanzando sincronización de puesta al día...")
+            self.sincronizar_ahora()
+
+    def _on_actualizacion_preparada(self, version: str):
+        self.main_window.statusBar().showMessage(
+            f"Actualización {version} descargada. Se aplicará la próxima vez que abras Modula.")
 
     def _iniciar_arranque_inteligente(self):
-        """Inicia la lógica de arranque en un hilo secundario."""
+        """
+        Si hay una verificación previa vigente para esta terminal, muestra el login
+        local de inmediato y verifica en segundo plano. Si no, hace el arranque
+        completo detrás de la LoadingView.
+        """
+        sesion = get_verified_session(get_id_terminal())
+        if sesion:
+            self._arranque_rapido(sesion)
+            return
+
         self.main_window.mostrar_vista_carga()
-        
+        self._lanzar_startup_worker(en_segundo_plano=False)
+
+    def _arranque_rapido(self, sesion: dict):
+        """Abre la tienda con los datos locales mientras la nube confirma la terminal."""
+        print(f"⚡ Sesión verificada en caché ({sesion['verified_at']}). Mostrando login local sin esperar al servidor.")
+        self.id_empresa_addsy = sesion["id_empresa"]
+        self.id_sucursal_actual = sesion.get("id_sucursal")
+        self.verificacion_pendiente = True
+
+        installed_modules = self.module_manager.get_installed_modules()
+        self._mostrar_login_local(installed_modules)
+        self._lanzar_startup_worker(en_segundo_plano=True)
+
+    def _lanzar_startup_worker(self, en_segundo_plano: bool):
+        """Inicia el StartupWorker en un hilo secundario."""
+        self.arranque_en_segundo_plano = en_segundo_plano
+
         self.startup_thread = QThread()
-        self.startup_worker = StartupWorker(self)
+        self.startup_worker = StartupWorker(self, en_segundo_plano)
         self.startup_worker.moveToThread(self.startup_thread)
 
         self.startup_thread.started.connect(self.startup_worker.run)
-        self.startup_worker.progress.connect(self.main_window.loading_view.update_status)
+        if en_segundo_plano:
+            self.startup_worker.progress.connect(lambda mensaje, _: print(f"🔄 [ARRANQUE] {mensaje}"))
+        else:
+            self.startup_worker.progress.connect(self.main_window.loading_view.update_status)
         self.startup_worker.finished.connect(self.handle_startup_result)
         
         self.startup_worker.finished.connect(self.startup_thread.quit)
@@ -333,46 +563,148 @@ class AppController(QObject):
         """
         Manejador central para el resultado del worker de arranque.
         """
+        guardar_perfil_arranque(result.get("status") if isinstance(result, dict) else str(result))
+
+        if self.arranque_en_segundo_plano:
+            self._manejar_verificacion_en_segundo_plano(result, installed_modules)
+            return
+
         # Este bloque se ejecuta si el arranque NO FUE EXITOSO (status no es "ok").
         if not isinstance(result, dict) or result.get("status") != "ok":
-            
-            # 1. NUEVO: Manejamos específicamente el conflicto de ubicación.
-            if result.get("status") == "location_mismatch":
-                print("Conflicto de ubicación detectado. Se requiere login para resolver.")
-                QMessageBox.warning(self.main_window, "Conflicto de Ubicación", 
-                                    "Hemos detectado que estás en una nueva red o ubicación.\n\n"
-                                    "Por favor, inicia sesión con tu cuenta para autorizar este cambio.")
-                
-                self.respuesta_conflicto = result # Guardamos la respuesta para usarla después del login
-                
-                # Preparamos la vista de login para que llame al manejador de conflictos.
-                try:
-                    self.main_window.auth_view.login_solicitado.disconnect()
-                except RuntimeError:
-                    pass # Ignorar si no estaba conectada
-                
-                self.main_window.auth_view.login_solicitado.connect(self.handle_login_para_resolver_conflicto)
-                self.main_window.mostrar_vista_auth()
-
-            # 2. Mantenemos la lógica para otros tipos de error.
-            elif result == "activacion_requerida" or "Terminal no encontrada" in result.get("message", ""):
-                self.solicitar_login_activacion()
-            else:
-                self.show_error(result.get("message", "Error desconocido en el arranque."))
-                self.main_window.mostrar_vista_auth()
-                
-            # 3. El return es clave: detiene la ejecución aquí si hubo cualquier error.
+            self._manejar_fallo_arranque(result)
+            # El return es clave: detiene la ejecución aquí si hubo cualquier error.
             return
 
         # --- Este código solo se ejecuta SI EL ARRANQUE FUE EXITOSO (status es "ok") ---
+        self._mostrar_login_local(installed_modules)
+
+    def _manejar_verificacion_en_segundo_plano(self, result, installed_modules):
+        """
+        Resultado del arranque tras un arranque rápido. El login local ya está en
+        pantalla, así que solo se bloquea la terminal si la nube la rechaza; un
+        fallo de red o del servidor deja seguir trabajando con los datos locales.
+        """
+        if isinstance(result, dict) and result.get("status") == "ok":
+            print("✅ Terminal confirmada por la nube en segundo plano.")
+            self.verificacion_pendiente = False
+            self.modulos_instalados = installed_modules
+            self.main_window.dashboard_view.nav_sidebar.populate_modules(installed_modules, self.module_manager.module_icon)
+            return
+
+        if not es_rechazo_de_terminal(result):
+            print(f"ℹ️  Verificación pospuesta ({self._motivo(result)}).")
+            self._programar_reintento_verificacion()
+            return
+
+        self._bloquear_terminal_rechazada(result)
+
+    @staticmethod
+    def _motivo(result) -> str:
+        if isinstance(result, dict):
+            return result.get("message") or result.get("detail") or str(result.get("status"))
+        return str(result)
+
+    def _bloquear_terminal_rechazada(self, result):
+        print("⛔ La nube rechazó esta terminal. Bloqueando la sesión local.")
+        delete_verified_session()
+        self.verificacion_pendiente = False
+        self.verificacion_timer.stop()
+        self.sync_timer.stop()
+        self._manejar_fallo_arranque(result)
+
+    def _programar_reintento_verificacion(self):
+        """Agenda el siguiente intento y duplica la espera para el que le siga."""
+        if self.verificacion_timer.isActive():
+            return
+        print(f"⏳ Reintentando la verificación en {self._espera_verificacion_ms // 1000} s.")
+        self.verificacion_timer.start(self._espera_verificacion_ms)
+        self._espera_verificacion_ms = min(self._espera_verificacion_ms * 2, VERIFICACION_REINTENTO_MAX_MS)
+
+    def reintentar_verificacion(self):
+        """Reintenta solo la verificación de la terminal en un hilo secundario."""
+        if not self.verificacion_pendiente or self.verificacion_thread is not None:
+            return
+        if self.startup_thread is not None:
+            # El arranque en segundo plano sigue verificando; si falla, agenda el reintento.
+            return
+        self.verificacion_timer.stop()
+        if self.connectivity_monitor.is_offline():
+            # Se reintentará al volver la conexión (_on_conexion_restablecida).
+            return
+
+        self.verificacion_thread = QThread()
+        self.verificacion_worker = VerificacionWorker(self)
+        self.verificacion_worker.moveToThread(self.verificacion_thread)
 
+        self.verificacion_thread.started.connect(self.verificacion_worker.run)
+        self.verificacion_worker.finished.connect(self._on_verificacion_finished)
+        self.verificacion_worker.finished.connect(self.verificacion_thread.quit)
+        self.verificacion_worker.finished.connect(self.verificacion_worker.deleteLater)
+        self.verificacion_thread.finished.connect(self.verificacion_thread.deleteLater)
+
+        print("🔄 [VERIFICACIÓN] Reintentando la verificación de la terminal en segundo plano...")
+        self.verificacion_thread.start()
+
+    def _on_verificacion_finished(self, result):
+        self.verificacion_thread = None
+        self.verificacion_worker = None
+        if not self.verificacion_pendiente:
+            return
+
+        if isinstance(result, dict) and result.get("status") == "ok":
+            print("✅ Terminal confirmada por la nube en segundo plano.")
+            self.verificacion_pendiente = False
+            self._espera_verificacion_ms = VERIFICACION_REINTENTO_INICIAL_MS
+            # Con el token listo, los ciclos de sincronización normales se reanudan.
+            if self.sync_timer.isActive():
+                self.sincronizar_ahora()
+            return
+
+        if not es_rechazo_de_terminal(result):
+            print(f"ℹ️  Verificación pospuesta ({self._motivo(result)}).")
+            self._programar_reintento_verificacion()
+            return
+
+        self._bloquear_terminal_rechazada(result)
+
+    def _manejar_fallo_arranque(self, result):
+        """Lleva la UI al flujo adecuado cuando la nube no aprueba la terminal."""
+        # 1. NUEVO: Manejamos específicamente el conflicto de ubicación.
+        if result.get("status") == "location_mismatch":
+            print("Conflicto de ubicación detectado. Se requiere login para resolver.")
+            QMessageBox.warning(self.main_window, "Conflicto de Ubicación", 
+                                "Hemos detectado que estás en una nueva red o ubicación.\n\n"
+                                "Por favor, inicia sesión con tu cuenta para autorizar este cambio.")
+            
+            self.respuesta_conflicto = result # Guardamos la respuesta para usarla después del login
+            
+            # Preparamos la vista de login para que llame al manejador de conflictos.
+            try:
+                self.main_window.auth_view.login_solicitado.disconnect()
+            except RuntimeError:
+                pass # Ignorar si no estaba conectada
+            
+            self.main_window.auth_view.login_solicitado.connect(self.handle_login_para_resolver_conflicto)
+            self.main_window.mostrar_vista_auth()
+
+        # 2. Mantenemos la lógica para otros tipos de error.
+        elif result == "activacion_requerida" or "Terminal no encontrada" in result.get("message", ""):
+            self.solicitar_login_activacion()
+        else:
+            self.show_error(result.get("message", "Error desconocido en el arranque."))
+            self.main_window.mostrar_vista_auth()
+
+    def _mostrar_login_local(self, installed_modules: list):
+        """Carga los módulos en el dashboard y muestra el login local del cajero."""
         # LÓGICA DE MÓDULOS: Se ejecuta sin problemas en un arranque correcto.
         print(f"✅ Carga de módulos completada. {len(installed_modules)} módulos encontrados.")
+        self.modulos_instalados = installed_modules
         sidebar = self.main_window.dashboard_view.nav_sidebar
-        sidebar.populate_modules(installed_modules, MODULES_DIR)
+        sidebar.populate_modules(installed_modules, self.module_manager.module_icon)
 
         # Preparamos la vista de login local.
         self.main_window.mostrar_vista_login_local()
+        marcar("login_local_visible")
         
         # Conectamos las señales de la vista de login local para que los botones funcionen.
         try:
@@ -396,14 +728,8 @@ class AppController(QObject):
 
     def _generar_id_estable(self) -> str:
         try:
-            addrs = psutil.net_if_addrs()
-            mac_address = None
-            for _, interfaces in addrs.items():
-                for interface in interfaces:
-                    if interface.family == psutil.AF_LINK and interface.address and "00:00:00:00:00:00" not in interface.address:
-                        mac_address = interface.address; break
-                if mac_address: break
-            if not mac_address: mac_address = uuid.getnode()
+            # La MAC física se obtiene una sola vez por proceso (ver utils.get_hardware_mac).
+            mac_address = get_hardware_mac()
             hardware_id = str(uuid.uuid5(uuid.NAMESPACE_DNS, str(mac_address)))
             print(f"ID de hardware estable generado: {hardware_id}")
             return hardware_id
@@ -490,6 +816,8 @@ class AppController(QObject):
                 self.handle_nueva_terminal()
 
     def handle_nueva_terminal(self):
+        from src.ui.dialogs import NewTerminalDialog, SeleccionarSucursalDialog
+
         try:
             # <<-- CAMBIO: Instanciamos nuestro nuevo diálogo personalizado.
             dialogo_terminos = NewTerminalDialog(self.main_window)
@@ -540,6 +868,8 @@ class AppController(QObject):
             self.show_error(f"No se pudo registrar la nueva terminal: {e}")
 
     def handle_login_para_resolver_conflicto(self, email: str, password: str):
+        from src.ui.dialogs import ResolverUbicacionDialog
+
         try:
             # 1. Autenticar al administrador
             self.main_window.auth_view.login_solicitado.disconnect(self.handle_login_para_resolver_conflicto)
@@ -638,6 +968,8 @@ class AppController(QObject):
             print(f"Error durante el polling: {e}. Se reintentará...")
 
     def handle_recovery_request(self):
+        from src.ui.dialogs import RecuperarContrasenaDialog
+
         dialogo = RecuperarContrasenaDialog(self.main_window)
         if dialogo.exec():
             email = dialogo.get_email()
@@ -653,7 +985,19 @@ class AppController(QObject):
     def show_error(self, message: str):
         """Muestra un diálogo de error estandarizado."""
         QMessageBox.critical(self.main_window, "Error", message)
-        
+
+    def _entrar_al_dashboard(self):
+        """Muestra el dashboard tras un login correcto y arranca las tareas de la sesión."""
+        self.main_window.mostrar_vista_dashboard()
+        self.sync_timer.start(20000)
+        print("🔄 Sincronización periódica iniciada (cada 20 segundos).")
+
+        # Con la app ociosa, importamos y preparamos los módulos que más se usan.
+        if self.module_preloader is None:
+            from src.core.module_preloader import ModulePreloader
+            self.module_preloader = ModulePreloader(self.module_manager, self)
+        self.module_preloader.start(self.modulos_instalados)
+
     def _handle_local_login(self, empleado_id: str, contrasena: str):
         """
         Verifica las credenciales y orquesta el flujo de cambio de contraseña obligatorio.
@@ -662,6 +1006,9 @@ class AppController(QObject):
             self.show_error("No se pudo obtener el ID de la empresa. Reinicia la aplicación.")
             return
 
+        import bcrypt
+        from src.ui.windows_dialogs.cambiar_contrasena_dialog import CambiarContrasenaDialog
+
         db_path = DB_DIR / self.id_empresa_addsy / "databases_generales" / "usuarios.sqlite"
         
         if not db_path.exists():
@@ -701,9 +1048,7 @@ class AppController(QObject):
                                 on_finished_callback=lambda s: print(f"Sincronización de contraseña finalizada: {s}")
                             )
                             # Después de cambiar la contraseña exitosamente, AHORA SÍ vamos al dashboard.
-                            self.main_window.mostrar_vista_dashboard()
-                            self.sync_timer.start(20000)
-                            print("🔄 Sincronización periódica iniciada (cada 20 segundos).")
+                            self._entrar_al_dashboard()
                             
                         except Exception as e:
                             self.show_error(f"No se pudo actualizar la contraseña: {e}")
@@ -716,9 +1061,7 @@ class AppController(QObject):
                 else:
                     # --- SI NO ES OBLIGATORIO CAMBIAR LA CONTRASEÑA ---
                     # Entonces procedemos directamente al dashboard.
-                    self.main_window.mostrar_vista_dashboard()
-                    self.sync_timer.start(20000)
-                    print("🔄 Sincronización periódica iniciada (cada 20 segundos).")
+                    self._entrar_al_dashboard()
             else:
                 self.show_error("Número de empleado o contraseña incorrectos.")
                 
@@ -746,6 +1089,10 @@ class AppController(QObject):
         self.sync_thread = None
         self.sync_worker = None
 
+        # Si falló, comprobamos la conexión sin esperar al siguiente sondeo programado.
+        if status != "success":
+            self.connectivity_monitor.sondear_ahora()
+
         # 4. Ejecuta el callback que guardamos temporalmente.
         if self.sync_callback:
             self.sync_callback(status)
@@ -762,6 +1109,29 @@ class AppController(QObject):
                 on_finished_callback("skipped")
             return
 
+        if self.connectivity_monitor.is_offline():
+            # Sin conexión no tiene sentido escanear ni esperar timeouts: se reintentará
+            # automáticamente en cuanto el monitor detecte que la conexión volvió.
+            print("ℹ️  [SYNC] Sin conexión. Sincronización pospuesta hasta que vuelva la red.")
+            if on_finished_callback:
+                on_finished_callback("offline")
+            return
+
+        if self.startup_thread is not None:
+            # El arranque en segundo plano ya hace su propio push/pull.
+            print("ℹ️  [SYNC] Intento de sincronización omitido, el arranque sigue en curso.")
+            if on_finished_callback:
+                on_finished_callback("skipped")
+            return
+
+        if self.verificacion_pendiente:
+            # Sin verificación no hay token. La verificación se reintenta por su cuenta
+            # (reintentar_verificacion) y al confirmarse se reanuda la sincronización.
+            print("ℹ️  [SYNC] Terminal aún sin confirmar. Sincronización pospuesta.")
+            if on_finished_callback:
+                on_finished_callback("skipped")
+            return
+
         # Guardamos temporalmente el callback para esta ejecución específica.
         self.sync_callback = on_finished_callback
 
@@ -0,0 +1,421 @@
+# src/core/async_api_client.py
+import asyncio
+import httpx
+import os
+from pathlib import Path
+from datetime import datetime
+import uuid
+from src.core.utils import get_network_identifiers
+from src.config.settings import get_api_base_url
+
+class AsyncApiClient:
+    """
+    Versión asíncrona de ApiClient con la misma superficie de métodos.
+
+    Todas las peticiones comparten un único httpx.AsyncClient (y por lo tanto su
+    pool de conexiones), de modo que varias llamadas independientes pueden
+    esperarse en paralelo desde un mismo hilo con un event loop, por ejemplo:
+
+        terminales, sucursales = await asyncio.gather(
+            client.get_mis_terminales(), client.get_mis_sucursales()
+        )
+    """
+    def __init__(self, max_connections: int = 10):
+        self.base_url = get_api_base_url()
+        if not self.base_url:
+            raise ValueError("La URL del API no está configurada. Revisa tu archivo .env")
+        self.auth_token = None
+        self._limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        self._client = None
+        # Monitor de conectividad opcional (ver src/core/connectivity.py).
+        self.connectivity = None
+
+    def set_connectivity_monitor(self, monitor):
+        """Conecta un ConnectivityMonitor para fallar al instante mientras no hay conexión."""
+        self.connectivity = monitor
+
+    # --- CICLO DE VIDA DEL CLIENTE COMPARTIDO ---
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """
+        Devuelve el httpx.AsyncClient compartido, creándolo en el primer uso.
+        Si el monitor indica que estamos offline lanza httpx.ConnectError al instante,
+        que los manejadores de cada método tratan como un fallo de red normal.
+        """
+        if self.connectivity is not None and self.connectivity.is_offline():
+            raise httpx.ConnectError("Sin conexión con el servidor (modo offline).")
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(limits=self._limits)
+        return self._client
+
+    async def aclose(self):
+        """Cierra el pool de conexiones. Debe llamarse al terminar el event loop."""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+
+    # --- AUXILIARES (mismo comportamiento que ApiClient) ---
+
+    def _get_auth_headers(self):
+        """Crea el diccionario de cabeceras para una petición autenticada."""
+        if not self.auth_token:
+            raise Exception("No se ha establecido un token de autenticación.")
+        return {"Authorization": f"Bearer {self.auth_token}"}
+
+    async def _request(self, method: str, endpoint: str, json_data: dict = None):
+        """
+        Función auxiliar genérica para realizar peticiones a la API.
+        Añade automáticamente la URL base y el token de autorización.
+        """
+        if not self.base_url or not self.auth_token:
+            raise Exception("AsyncApiClient no inicializado o sin token.")
+
+        url = f"{self.base_url}/{endpoint}"
+        headers = self._get_auth_headers()
+
+        try:
+            response = await self.client.request(method.upper(), url, json=json_data, headers=headers, timeout=30.0)
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPStatusError as e:
+            print(f"🔥🔥 Error HTTP: {e.response.status_code} - {e.response.text}")
+            raise e
+        except Exception as e:
+            print(f"🔥🔥 Error de red o conexión: {e}")
+            raise e
+
+    def _sanitize_data_for_json(self, data):
+        """
+        Sanea recursivamente los datos para asegurar que sean serializables a JSON.
+        Convierte UUIDs, datetimes y otros tipos no estándar a cadenas.
+        """
+        if isinstance(data, dict):
+            return {k: self._sanitize_data_for_json(v) for k, v in data.items()}
+        elif isinstance(data, list):
+            return [self._sanitize_data_for_json(item) for item in data]
+        elif isinstance(data, (datetime, uuid.UUID)):
+            return str(data)
+        else:
+            return data
+
+    @staticmethod
+    def _detail(response: httpx.Response, default: str) -> str:
+        """Extrae el campo 'detail' de una respuesta de error, o un texto alternativo."""
+        try:
+            return response.json().get("detail", default)
+        except Exception:
+            return response.text if response.text else default
+
+    def set_auth_token(self, token: str):
+        """Almacena el token de autenticación para futuras peticiones."""
+        self.auth_token = token
+        print("Token de sesión guardado (async).")
+
+    # --- AUTENTICACIÓN ---
+
+    async def registrar_cuenta(self, datos_registro: dict) -> dict:
+        """Pre-registra una cuenta y devuelve la URL de checkout de Stripe."""
+        url = f"{self.base_url}/api/v1/auth/registrar-cuenta"
+        try:
+            response = await self.client.post(url, json=datos_registro, timeout=15.0)
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPStatusError as e:
+            detail = self._detail(e.response, "El servidor devolvió un error inesperado.")
+            raise Exception(f"Error al registrar cuenta: {detail}")
+        except httpx.RequestError:
+            raise Exception("Error de conexión al intentar registrar la cuenta.")
+
+    async def login(self, correo: str, contrasena: str) -> dict:
+        """Envía las credenciales para iniciar sesión y guarda el token si es exitoso."""
+        url = f"{self.base_url}/api/v1/auth/login"
+        payload = {"correo": correo, "contrasena": contrasena}
+        try:
+            response = await self.client.post(url, json=payload, timeout=10.0)
+            response.raise_for_status()
+            data = response.json()
+            if "access_token" in data:
+                self.set_auth_token(data["access_token"])
+            return data
+        except httpx.HTTPStatusError as e:
+            detail = self._detail(e.response, "Correo o contraseña incorrectos.")
+            raise Exception(f"Error de autenticación: {detail}") from e
+        except httpx.RequestError as e:
+            raise Exception("Error de conexión: No se pudo conectar al servidor.") from e
+
+    async def verificar_terminal(self, terminal_id: str) -> dict:
+        """Verifica una terminal enviando su ID de hardware y los de la red local."""
+        url = f"{self.base_url}/api/v1/auth/verificar-terminal"
+        # La detección de red usa subprocesos bloqueantes: la sacamos del event loop.
+        network_ids = await asyncio.to_thread(get_network_identifiers)
+        payload = {"id_terminal": terminal_id, **network_ids}
+        try:
+            response = await self.client.post(url, json=payload, timeout=15.0)
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code >= 500:
+                return {"status": "error", "message": f"Error del servidor (código {e.response.status_code})", "transitorio": True}
+            try:
+                respuesta = e.response.json()
+            except Exception:
+                return {"status": "error", "message": f"Error del servidor (código {e.response.status_code})",
+                        "transitorio": True}
+            if isinstance(respuesta, dict):
+                respuesta.setdefault("http_status", e.response.status_code)
+            return respuesta
+        except httpx.RequestError:
+            # 'transitorio': la nube no dio un veredicto; no implica que la terminal esté revocada.
+            return {"status": "error", "message": "No se pudo conectar con el servidor.", "transitorio": True}
+
+    async def check_activation_status(self, claim_token: str) -> dict:
+        url = f"{self.base_url}/api/v1/auth/check-activation-status/{claim_token}"
+        try:
+            response = await self.client.get(url, timeout=10.0)
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPStatusError as e:
+            raise Exception(f"Error de activación: {self._detail(e.response, 'Error del servidor.')}")
+        except httpx.RequestError:
+            raise Exception("Error de conexión al verificar activación.")
+
+    async def solicitar_reseteo_contrasena(self, email: str) -> dict:
+        """Llama al endpoint para solicitar un reseteo de contraseña."""
+        url = f"{self.base_url}/api/v1/auth/solicitar-reseteo"
+        try:
+            response = await self.client.post(url, json={"email": email}, timeout=15.0)
+            response.raise_for_status()
+            return response.json()
+        except Exception as e:
+            raise Exception(f"Error al solicitar reseteo: {e}")
+
+    # --- TERMINALES ---
+
+    async def buscar_terminal_por_hardware(self, hardware_id: str) -> dict:
+        """Busca si una terminal con un ID de hardware ya existe en el backend."""
+        url = f"{self.base_url}/api/v1/terminales/buscar-por-hardware"
+        try:
+            response = await self.client.post(url, json={"id_terminal": hardware_id}, timeout=15.0)
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 404:
+                raise Exception("Terminal no encontrada en el backend.")
+            raise Exception(f"Error HTTP al buscar terminal: {self._detail(e.response, 'Error del servidor.')}")
+        except httpx.RequestError:
+            raise Exception("Error de conexión al buscar terminal por hardware.")
+
+    async def get_mis_terminales(self) -> list:
+        """Obtiene la lista de terminales asociadas a la cuenta autenticada."""
+        url = f"{self.base_url}/api/v1/terminales/mi-cuenta"
+        try:
+            response = await self.client.get(url, headers=self._get_auth_headers(), timeout=15.0)
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPStatusError as e:
+            raise Exception(f"Error al obtener la lista de terminales: {self._detail(e.response, 'Error del servidor.')}")
+        except httpx.RequestError:
+            raise Exception("Error de conexión al obtener la lista de terminales.")
+
+    async def registrar_nueva_terminal(self, datos_terminal: dict) -> dict:
+        """Llama al endpoint para registrar una nueva terminal para la cuenta."""
+        url = f"{self.base_url}/api/v1/terminales/"
+        try:
+            response = await self.client.post(url, headers=self._get_auth_headers(), json=datos_terminal, timeout=15.0)
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPStatusError as e:
+            raise Exception(f"Error al registrar la terminal: {self._detail(e.response, 'Error del servidor.')}")
+        except httpx.RequestError:
+            raise Exception("Error de conexión al intentar registrar la terminal.")
+
+    async def asignar_terminal_a_sucursal(self, id_terminal: str, id_sucursal: int) -> dict:
+        """Llama al endpoint para migrar/asignar una terminal a otra sucursal."""
+        url = f"{self.base_url}/api/v1/terminales/asignar-a-sucursal"
+        payload = {"id_terminal_origen": id_terminal, "id_sucursal_destino": id_sucursal}
+        try:
+            response = await self.client.post(url, headers=self._get_auth_headers(), json=payload, timeout=15.0)
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPStatusError as e:
+            raise Exception(f"Error al asignar terminal: {self._detail(e.response, 'Error del servidor.')}")
+        except httpx.RequestError:
+            raise Exception("Error de conexión al asignar la terminal.")
+
+    async def crear_sucursal_y_asignar_terminal(self, id_terminal: str, nombre_sucursal: str) -> dict:
+        """Llama al endpoint que crea una sucursal y asigna la terminal."""
+        url = f"{self.base_url}/api/v1/terminales/crear-sucursal-y-asignar"
+        payload = {"id_terminal_origen": id_terminal, "nombre_nueva_sucursal": nombre_sucursal}
+        try:
+            response = await self.client.post(url, headers=self._get_auth_headers(), json=payload, timeout=20.0)
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPStatusError as e:
+            raise Exception(f"Error al crear y asignar: {self._detail(e.response, 'Error del servidor.')}")
+        except httpx.RequestError:
+            raise Exception("Error de conexión al crear la nueva sucursal.")
+
+    # --- SUCURSALES ---
+
+    async def anclar_red_a_sucursal(self, id_sucursal: int, network_ids: dict):
+        """Autoriza (ancla) los identificadores de la red actual para una sucursal."""
+        url = f"{self.base_url}/api/v1/sucursales/{id_sucursal}/anclar-red"
+        try:
+            response = await self.client.post(url, headers=self._get_auth_headers(), json=network_ids, timeout=15.0)
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPStatusError as e:
+            raise Exception(f"Error al anclar la red: {self._detail(e.response, 'Error del servidor.')}")
+        except httpx.RequestError:
+            raise Exception("Error de conexión al intentar anclar la red.")
+
+    async def crear_sucursal(self, nombre_sucursal: str) -> dict:
+        """Llama al endpoint para crear una nueva sucursal."""
+        url = f"{self.base_url}/api/v1/sucursales/"
+        try:
+            response = await self.client.post(url, headers=self._get_auth_headers(), json={"nombre": nombre_sucursal}, timeout=10.0)
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPStatusError as e:
+            raise Exception(f"Error al crear sucursal: {self._detail(e.response, 'Error del servidor.')}")
+        except httpx.RequestError:
+            raise Exception("Error de conexión al crear sucursal.")
+
+    async def get_mis_sucursales(self) -> list:
+        """Obtiene la lista de sucursales del usuario autenticado."""
+        url = f"{self.base_url}/api/v1/sucursales/mi-cuenta"
+        try:
+            response = await self.client.get(url, headers=self._get_auth_headers(), timeout=10.0)
+            response.raise_for_status()
+            return response.json()
+        except Exception as e:
+            raise Exception(f"Error al obtener sucursales: {e}")
+
+    # --- SINCRONIZACIÓN ---
+
+    async def initialize_sync(self) -> dict:
+        """Llama al backend para preparar la nube (Etapas 1 y 2)."""
+        if not self.auth_token:
+            raise Exception("Intento de llamar a 'initialize_sync' sin un token de autenticación.")
+        url = f"{self.base_url}/api/v1/sync/initialize"
+        response = await self.client.post(url, headers=self._get_auth_headers(), timeout=120.0)
+        response.raise_for_status()
+        return response.json()
+
+    async def check_sync_status(self, id_sucursal: int, archivos_locales: list) -> dict:
+        """Envía el estado de los archivos locales y recibe un plan de sincronización."""
+        url = f"{self.base_url}/api/v1/sync/check"
+        payload = {
+            "id_sucursal_actual": id_sucursal,
+            "archivos_locales": [
+                {"key": f["key"], "last_modified": f["last_modified"], "hash": f["hash"]}
+                for f in archivos_locales
+            ],
+        }
+        try:
+            response = await self.client.post(url, headers=self._get_auth_headers(), json=payload, timeout=30.0)
+            response.raise_for_status()
+            return response.json()
+        except Exception as e:
+            raise Exception(f"Error al verificar estado de sincronización: {e}")
+
+    async def push_records(self, push_data: dict) -> dict:
+        """Envía un paquete de registros locales a la nube para fusionarlos."""
+        url = f"{self.base_url}/api/v1/sync/push-records"
+        sanitized_data = self._sanitize_data_for_json(push_data)
+        response = await self.client.post(url, headers=self._get_auth_headers(), json=sanitized_data, timeout=120.0)
+        response.raise_for_status()
+        return response.json()
+
+    async def get_deltas(self, sync_timestamps: dict) -> dict:
+        """Pide al backend los registros que han cambiado desde los timestamps dados."""
+        url = f"{self.base_url}/api/v1/sync/get-deltas"
+        try:
+            response = await self.client.post(url, headers=self._get_auth_headers(), json=sync_timestamps, timeout=30.0)
+            response.raise_for_status()
+            return response.json()
+        except Exception as e:
+            raise Exception(f"Error al obtener deltas: {e}")
+
+    async def check_for_changes(self, sync_timestamps: dict, etag: str = None) -> dict:
+        """
+        Sonda barata antes del pull completo (ver ApiClient.check_for_changes).
+        Devuelve {"changed", "tables", "etag", "supported"}.
+        """
+        if not self.auth_token: raise Exception("Autenticación requerida.")
+        url = f"{self.base_url}/api/v1/sync/changes"
+        headers = self._get_auth_headers()
+        if etag:
+            headers["If-None-Match"] = etag
+        try:
+            response = await self.client.get(url, headers=headers, params={"since": sync_timestamps.get("global")}, timeout=10.0)
+            if response.status_code == 304:
+                return {"changed": False, "tables": [], "etag": etag, "supported": True}
+            if response.status_code in (404, 405, 501):
+                return {"changed": True, "tables": None, "etag": None, "supported": False}
+            response.raise_for_status()
+            data = response.json()
+            return {
+                "changed": bool(data.get("changed_tables", True)),
+                "tables": data.get("changed_tables"),
+                "etag": response.headers.get("ETag"),
+                "supported": True,
+            }
+        except Exception as e:
+            raise Exception(f"Error al consultar cambios: {e}")
+
+    async def pull_db_file(self, key_path: str, local_destination: Path) -> bool:
+        """Descarga un archivo de DB desde el endpoint de pull."""
+        url = f"{self.base_url}/api/v1/sync/pull-db/{key_path}"
+        local_destination.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            async with self.client.stream("GET", url, headers=self._get_auth_headers(), timeout=120.0) as response:
+                response.raise_for_status()
+                with open(local_destination, "wb") as f:
+                    async for chunk in response.aiter_bytes():
+                        f.write(chunk)
+            print(f"✅ Descarga completa: {key_path}")
+            return True
+        except httpx.HTTPStatusError as e:
+            print(f"❌ Error al descargar {key_path}: Error HTTP {e.response.status_code}")
+            return False
+        except Exception as e:
+            print(f"❌ Error al descargar {key_path}: {e}")
+            return False
+
+    async def descargar_archivo(self, key_en_la_nube: str, ruta_local_destino: Path) -> bool:
+        """Descarga un archivo específico desde la nube y lo guarda localmente."""
+        return await self.pull_db_file(key_en_la_nube, ruta_local_destino)
+
+    async def subir_archivo(self, ruta_local, key_cloud, hash_base):
+        """Sube un archivo a la nube, incluyendo el hash de la versión base para detectar conflictos."""
+        url = f"{self.base_url}/api/v1/sync/upload/{key_cloud}"
+        headers = {**self._get_auth_headers(), "X-Base-Version-Hash": hash_base}
+        try:
+            with open(ruta_local, "rb") as f:
+                response = await self.client.post(url, files={"file": f}, headers=headers)
+            if response.status_code == 409:
+                print(f"⚠️  Conflicto detectado para {os.path.basename(ruta_local)}. Se requiere sincronización.")
+                raise ConnectionAbortedError("conflict")
+            response.raise_for_status()
+            print(f"✅ Subida completa: {os.path.basename(ruta_local)}")
+            return True
+        except ConnectionAbortedError:
+            raise
+        except Exception as e:
+            print(f"❌ Error al subir {os.path.basename(ruta_local)}: {e}")
+            return False
+
+    # --- MÓDULOS ---
+
+    async def get_modules_manifest(self):
+        """Obtiene el manifiesto de módulos desde el backend."""
+        print("ℹ️ Solicitando manifiesto de módulos al servidor (async)...")
+        return await self._request("get", "api/v1/modules/manifest")
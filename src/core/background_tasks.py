@@ -0,0 +1,126 @@
+# src/core/background_tasks.py
+"""
+Pool de hilos compartido para el trabajo en segundo plano de los módulos.
+
+Los módulos no crean sus propios QThread: piden trabajo con
+ModulaModuleBase.run_in_background, que lo envía a este pool (de tamaño
+acotado, para que muchos módulos abiertos no saturen la terminal) y entrega
+el resultado en el hilo principal, donde sí se pueden tocar los widgets.
+"""
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from PySide6.QtCore import QCoreApplication, QObject, Signal
+
+MAX_BACKGROUND_WORKERS = 4
+
+_executor = None
+_dispatcher = None
+_lock = threading.Lock()
+
+class _ResultDispatcher(QObject):
+    """Vive en el hilo principal; la señal cruza de hilo y ejecuta ahí el callback."""
+    entregar = Signal(object, object)  # callback, future
+
+    def __init__(self):
+        super().__init__()
+        self.entregar.connect(self._entregar)
+
+    def _entregar(self, callback, future):
+        callback(future)
+
+def _shutdown():
+    global _executor
+    with _lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+def get_executor() -> ThreadPoolExecutor:
+    """Pool compartido, creado en el primer uso y cerrado al salir de la app."""
+    global _executor, _dispatcher
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MAX_BACKGROUND_WORKERS, thread_name_prefix="Modulos")
+            app = QCoreApplication.instance()
+            _dispatcher = _ResultDispatcher()
+            if app is not None:
+                _dispatcher.moveToThread(app.thread())
+                app.aboutToQuit.connect(_shutdown)
+        return _executor
+
+def submit(fn, *args, on_main_thread=None, **kwargs) -> Future:
+    """
+    Ejecuta fn(*args, **kwargs) en el pool. Si se da on_main_thread(future), se
+    llama en el hilo principal cuando la tarea termina (o se cancela).
+    """
+    future = get_executor().submit(fn, *args, **kwargs)
+    if on_main_thread is not None:
+        future.add_done_callback(lambda f: _dispatcher.entregar.emit(on_main_thread, f))
+    return future
+
+class TaskGroup:
+    """
+    Tareas de un mismo dueño (p. ej. un módulo). cancel() cancela las que aún no
+    empiezan y hace que los resultados de las que ya corren se descarten, así
+    nunca se llama a un callback de un widget que ya se cerró. Después de
+    cancel() el grupo se puede seguir usando (p. ej. si el módulo se reabre).
+
+    Cada generación (el periodo entre dos cancel()) tiene su propio
+    threading.Event. Una tarea recibe el de la generación en que se envió:
+    dentro de la tarea, cancel_event devuelve ese evento aunque el grupo ya haya
+    pasado a la siguiente generación, así que revisar cancel_event.is_set() en
+    su bucle siempre ve la cancelación que le corresponde.
+    """
+    # Grupo y evento de la tarea que corre en el hilo actual del pool.
+    _tarea_actual = threading.local()
+
+    def __init__(self):
+        self._futures = set()
+        self._generacion = 0
+        self._evento = threading.Event()
+
+    @property
+    def cancel_event(self) -> threading.Event:
+        """Evento de la tarea en curso si se lee desde ella; si no, el de la generación actual."""
+        actual = TaskGroup._tarea_actual
+        if getattr(actual, "grupo", None) is self:
+            return actual.evento
+        return self._evento
+
+    def submit(self, fn, *args, on_done=None, on_error=None, **kwargs) -> Future:
+        generacion = self._generacion
+        evento = self._evento
+
+        def _ejecutar():
+            actual = TaskGroup._tarea_actual
+            actual.grupo, actual.evento = self, evento
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                actual.grupo = actual.evento = None
+
+        def _terminar(future):
+            self._futures.discard(future)
+            if generacion != self._generacion or future.cancelled():
+                return
+            error = future.exception()
+            if error is not None:
+                if on_error:
+                    on_error(error)
+                else:
+                    print(f"🔥 Error en tarea en segundo plano ({getattr(fn, '__name__', fn)}): {error}")
+            elif on_done:
+                on_done(future.result())
+
+        future = submit(_ejecutar, on_main_thread=_terminar)
+        self._futures.add(future)
+        return future
+
+    def cancel(self):
+        self._generacion += 1
+        # Las tareas ya enviadas conservan el evento anterior, que queda activado.
+        self._evento.set()
+        self._evento = threading.Event()
+        for future in list(self._futures):
+            future.cancel()
+        self._futures.clear()
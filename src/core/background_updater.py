@@ -0,0 +1,137 @@
+# src/core/background_updater.py
+import os
+import tempfile
+import time
+from pathlib import Path
+from PySide6.QtCore import QObject, QThread, QTimer, Signal
+from src.core.updater import (get_install_path, get_current_version, check_for_update, fetch_update_manifest,
+                              download_file, stage_differential_update, stage_full_package, get_staged_update,
+                              is_version_skipped, VERSIONS_DIR)
+
+class BackgroundUpdateWorker(QObject):
+    """
+    Descarga y verifica la siguiente versión en la carpeta de staging de la
+    instalación, sin tocar los archivos en uso. El launcher la aplica en el
+    siguiente arranque (ver updater.apply_staged_update).
+    """
+    finished = Signal(object)  # versión preparada, o None
+
+    def __init__(self, install_path: str, max_bytes_por_segundo: int):
+        super().__init__()
+        self.install_path = install_path
+        self.max_bytes_por_segundo = max_bytes_por_segundo
+        self._inicio = None
+        self._bytes = 0
+
+    def run(self):
+        try:
+            self.finished.emit(self._preparar_siguiente_version())
+        except Exception as e:
+            print(f"⚠️  [UPDATE] Error al preparar la actualización en segundo plano: {e}")
+            self.finished.emit(None)
+
+    def _preparar_siguiente_version(self):
+        update_info = check_for_update(get_current_version(self.install_path))
+        if not update_info:
+            return None
+
+        version = update_info.get("version")
+        if is_version_skipped(self.install_path, version):
+            # Se volvió atrás desde esta versión: prepararla de nuevo desharía el rollback.
+            return None
+        staged = get_staged_update(self.install_path)
+        if staged and staged["version"] == version:
+            return version
+
+        print(f"⬇️  [UPDATE] Preparando la versión {version} en segundo plano...")
+        self._inicio = time.monotonic()
+        manifest_url = update_info.get("manifest_url")
+        manifest = fetch_update_manifest(manifest_url) if manifest_url else None
+        if manifest:
+            files_base_url = update_info.get("files_url") or manifest_url.rsplit("/", 1)[0]
+            if stage_differential_update(self.install_path, manifest, files_base_url, on_chunk=self._limitar_velocidad):
+                return version
+            print("⚠️  [UPDATE] Falló la descarga parcial. Se intentará con el paquete completo.")
+
+        # Archivo propio dentro de versions/: el launcher descarga a su propia ruta
+        # temporal y ninguno puede sobrescribir o borrar la descarga del otro.
+        carpeta = Path(self.install_path) / VERSIONS_DIR
+        carpeta.mkdir(parents=True, exist_ok=True)
+        descriptor, zip_path = tempfile.mkstemp(prefix="update-", suffix=".zip", dir=carpeta)
+        os.close(descriptor)
+        try:
+            if not download_file(update_info["url"], zip_path, update_info["hash"], self._limitar_velocidad):
+                return None
+            return version if stage_full_package(self.install_path, version, zip_path) else None
+        finally:
+            if os.path.exists(zip_path):
+                os.remove(zip_path)
+
+    def _limitar_velocidad(self, n_bytes: int):
+        """Duerme lo necesario para no pasar de max_bytes_por_segundo y no saturar la red de la tienda."""
+        self._bytes += n_bytes
+        esperado = self._bytes / self.max_bytes_por_segundo
+        transcurrido = time.monotonic() - self._inicio
+        if esperado > transcurrido:
+            time.sleep(esperado - transcurrido)
+
+class BackgroundUpdater(QObject):
+    """
+    Revisa periódicamente si hay una versión nueva y, si la hay, la descarga en
+    un QThread de prioridad mínima con el ancho de banda limitado. Así el costo de
+    actualizar en el arranque se reduce a mover archivos ya verificados.
+    """
+    actualizacion_preparada = Signal(str)
+
+    def __init__(self, connectivity_monitor, parent=None,
+                 retraso_inicial_ms: int = 2 * 60 * 1000,
+                 intervalo_ms: int = 6 * 60 * 60 * 1000,
+                 max_bytes_por_segundo: int = 2 * 1024 * 1024):
+        super().__init__(parent)
+        self.connectivity_monitor = connectivity_monitor
+        self.retraso_inicial_ms = retraso_inicial_ms
+        self.max_bytes_por_segundo = max_bytes_por_segundo
+        self.install_path = None
+        self.update_thread = None
+        self.update_worker = None
+
+        self.check_timer = QTimer(self)
+        self.check_timer.setInterval(intervalo_ms)
+        self.check_timer.timeout.connect(self.revisar_ahora)
+
+    def start(self):
+        # Sin instalación registrada (p. ej. en desarrollo) no hay nada que actualizar.
+        self.install_path = get_install_path()
+        if not self.install_path:
+            return
+        QTimer.singleShot(self.retraso_inicial_ms, self.revisar_ahora)
+        self.check_timer.start()
+
+    def stop(self):
+        self.check_timer.stop()
+
+    def revisar_ahora(self):
+        if not self.install_path or self.update_thread is not None:
+            return
+        if self.connectivity_monitor.is_offline():
+            return
+
+        self.update_thread = QThread()
+        self.update_worker = BackgroundUpdateWorker(self.install_path, self.max_bytes_por_segundo)
+        self.update_worker.moveToThread(self.update_thread)
+
+        self.update_thread.started.connect(self.update_worker.run)
+        self.update_worker.finished.connect(self._on_worker_finished)
+        self.update_worker.finished.connect(self.update_thread.quit)
+        self.update_worker.finished.connect(self.update_worker.deleteLater)
+        self.update_thread.finished.connect(self.update_thread.deleteLater)
+
+        # Prioridad mínima: la descarga nunca debe competir con la caja.
+        self.update_thread.start(QThread.LowestPriority)
+
+    def _on_worker_finished(self, version):
+        self.update_thread = None
+        self.update_worker = None
+        if version:
+            print(f"✅ [UPDATE] Versión {version} lista; se aplicará en el próximo arranque.")
+            self.actualizacion_preparada.emit(version)
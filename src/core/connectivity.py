@@ -0,0 +1,109 @@
+# src/core/connectivity.py
+import threading
+import time
+from PySide6.QtCore import QObject, QTimer, Signal
+
+ONLINE = "online"
+DEGRADED = "degraded"
+OFFLINE = "offline"
+
+class ConnectivityMonitor(QObject):
+    """
+    Vigila la conexión con el backend de Modula mediante sondeos baratos.
+
+    Mantiene un estado (online / degraded / offline) que ApiClient consulta antes
+    de cada petición: mientras estamos offline las llamadas fallan al instante en
+    lugar de esperar su timeout completo. Al recuperar la conexión se emite
+    'conexion_restablecida' para lanzar de inmediato una sincronización de puesta al día.
+    """
+    estado_cambiado = Signal(str)
+    conexion_restablecida = Signal()
+
+    def __init__(self, base_url: str, parent=None,
+                 intervalo_online_ms: int = 15000,
+                 intervalo_offline_ms: int = 5000,
+                 timeout_sondeo: float = 3.0,
+                 umbral_degradado: float = 1.5,
+                 fallos_para_offline: int = 2):
+        super().__init__(parent)
+        self.base_url = base_url
+        self.intervalo_online_ms = intervalo_online_ms
+        self.intervalo_offline_ms = intervalo_offline_ms
+        self.timeout_sondeo = timeout_sondeo
+        self.umbral_degradado = umbral_degradado
+        self.fallos_para_offline = fallos_para_offline
+
+        # Empezamos asumiendo conexión: el primer sondeo corrige el estado si no la hay.
+        self._estado = ONLINE
+        self._fallos_consecutivos = 0
+        self.ultima_latencia = None
+        self._hilo_sondeo = None
+        self._lock = threading.Lock()
+
+        self.probe_timer = QTimer(self)
+        self.probe_timer.setInterval(self.intervalo_online_ms)
+        self.probe_timer.timeout.connect(self.sondear_ahora)
+        # El estado cambia en el hilo del sondeo; el ajuste del timer se hace en el hilo principal.
+        self.estado_cambiado.connect(self._ajustar_intervalo)
+
+    @property
+    def estado(self) -> str:
+        return self._estado
+
+    def is_offline(self) -> bool:
+        return self._estado == OFFLINE
+
+    def start(self):
+        self.sondear_ahora()
+        self.probe_timer.start()
+
+    def stop(self):
+        self.probe_timer.stop()
+
+    def sondear_ahora(self):
+        """Lanza un sondeo en segundo plano (si no hay uno en curso)."""
+        with self._lock:
+            if self._hilo_sondeo and self._hilo_sondeo.is_alive():
+                return
+            self._hilo_sondeo = threading.Thread(target=self._sondear, name="ConnectivityProbe", daemon=True)
+            self._hilo_sondeo.start()
+
+    def _sondear(self):
+        # httpx se importa aquí para no cargarlo antes del primer pintado de la UI.
+        import httpx
+
+        inicio = time.monotonic()
+        try:
+            # Cualquier respuesta HTTP (incluso 404/405) demuestra que el servidor es alcanzable.
+            httpx.head(self.base_url, timeout=self.timeout_sondeo)
+        except httpx.RequestError:
+            self._registrar_fallo()
+            return
+        self._registrar_exito(time.monotonic() - inicio)
+
+    def _registrar_exito(self, latencia: float):
+        self.ultima_latencia = latencia
+        self._fallos_consecutivos = 0
+        self._cambiar_estado(DEGRADED if latencia > self.umbral_degradado else ONLINE)
+
+    def _registrar_fallo(self):
+        self._fallos_consecutivos += 1
+        if self._fallos_consecutivos >= self.fallos_para_offline:
+            self._cambiar_estado(OFFLINE)
+        else:
+            # Un fallo aislado no basta para declarar offline; sondeamos otra vez en seguida.
+            self._cambiar_estado(DEGRADED)
+
+    def _cambiar_estado(self, nuevo_estado: str):
+        anterior = self._estado
+        if nuevo_estado == anterior:
+            return
+        self._estado = nuevo_estado
+        print(f"📡 Conectividad: {anterior} -> {nuevo_estado}")
+        self.estado_cambiado.emit(nuevo_estado)
+        if anterior == OFFLINE:
+            self.conexion_restablecida.emit()
+
+    def _ajustar_intervalo(self, estado: str):
+        intervalo = self.intervalo_online_ms if estado == ONLINE else self.intervalo_offline_ms
+        self.probe_timer.setInterval(intervalo)
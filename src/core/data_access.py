@@ -0,0 +1,123 @@
+# src/core/data_access.py
+"""
+Acceso a datos para los módulos (ModulaModuleBase.db).
+
+Resuelve en qué base vive cada tabla según schema_config (las generales de la
+empresa o las de la sucursal actual), reutiliza una conexión de solo lectura
+por base y por hilo (sqlite3 guarda las sentencias ya preparadas de cada
+conexión) y devuelve filas sqlite3.Row, que se leen por nombre o por índice.
+
+Las escrituras no pasan por estas conexiones: van por guardar_nuevo_registro y
+actualizar_registro de local_storage, que agregan uuid, last_modified y
+needs_sync para que la sincronización las envíe a la nube.
+"""
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from src.config.schema_config import TABLAS_GENERALES, TABLE_PRIMARY_KEYS
+from src.core.local_storage import DB_DIR, guardar_nuevo_registro, actualizar_registro
+
+_IDENTIFICADOR = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+def _validar_identificador(nombre: str) -> str:
+    """Las tablas y columnas van dentro del SQL, así que solo se aceptan nombres simples."""
+    if not _IDENTIFICADOR.match(nombre):
+        raise ValueError(f"Nombre de tabla o columna inválido: '{nombre}'")
+    return nombre
+
+class DataAccess:
+    def __init__(self, app_controller):
+        self.app_controller = app_controller
+        self._local = threading.local()
+
+    # --- RUTEO Y CONEXIONES ---
+
+    def _contexto(self) -> tuple[str, int]:
+        id_empresa = self.app_controller.id_empresa_addsy
+        if not id_empresa:
+            raise RuntimeError("Aún no hay una empresa activa en esta terminal.")
+        return id_empresa, self.app_controller.id_sucursal_actual
+
+    def db_path(self, tabla: str) -> Path:
+        """Archivo .sqlite donde vive 'tabla' para la empresa y sucursal actuales."""
+        _validar_identificador(tabla)
+        id_empresa, id_sucursal = self._contexto()
+        if tabla in TABLAS_GENERALES:
+            return DB_DIR / id_empresa / "databases_generales" / f"{tabla}.sqlite"
+        if id_sucursal is None:
+            raise RuntimeError(f"La tabla '{tabla}' es de sucursal y aún no se conoce la sucursal de la terminal.")
+        return DB_DIR / id_empresa / f"suc_{id_sucursal}" / f"{tabla}.sqlite"
+
+    def _conexion(self, tabla: str) -> sqlite3.Connection:
+        ruta = self.db_path(tabla)
+        conexiones = getattr(self._local, "conexiones", None)
+        if conexiones is None:
+            conexiones = self._local.conexiones = {}
+        conn = conexiones.get(ruta)
+        if conn is None:
+            if not ruta.exists():
+                raise FileNotFoundError(f"La base de datos para la tabla '{tabla}' no existe en {ruta}")
+            # Solo lectura: las escrituras deben pasar por las rutas de sincronización.
+            conn = sqlite3.connect(f"{ruta.as_uri()}?mode=ro", uri=True, timeout=5,
+                                   cached_statements=256)
+            conn.row_factory = sqlite3.Row
+            conexiones[ruta] = conn
+        return conn
+
+    def close(self):
+        """Cierra las conexiones del hilo actual (p. ej. antes de reemplazar las bases)."""
+        for conn in getattr(self._local, "conexiones", {}).values():
+            conn.close()
+        self._local.conexiones = {}
+
+    # --- LECTURA ---
+
+    def query(self, tabla: str, sql: str, params=()) -> list[sqlite3.Row]:
+        """Ejecuta una consulta parametrizada (?, o :nombre) sobre la base de 'tabla'."""
+        return self._conexion(tabla).execute(sql, params).fetchall()
+
+    def select(self, tabla: str, where: dict = None, columnas=("*",), orden: str = None,
+               limite: int = None) -> list[sqlite3.Row]:
+        """
+        SELECT simple con igualdades: db.select("productos", {"activo": 1}, orden="nombre").
+        Los valores siempre van como parámetros.
+        """
+        columnas_sql = ", ".join(c if c == "*" else _validar_identificador(c) for c in columnas)
+        sql = f"SELECT {columnas_sql} FROM {_validar_identificador(tabla)}"
+        params = []
+        if where:
+            sql += " WHERE " + " AND ".join(f"{_validar_identificador(c)} = ?" for c in where)
+            params = list(where.values())
+        if orden:
+            columna, _, direccion = orden.partition(" ")
+            direccion = direccion.strip().upper()
+            if direccion not in ("", "ASC", "DESC"):
+                raise ValueError(f"Orden inválido: '{orden}'")
+            sql += f" ORDER BY {_validar_identificador(columna)} {direccion}".rstrip()
+        if limite is not None:
+            sql += " LIMIT ?"
+            params.append(int(limite))
+        return self.query(tabla, sql, params)
+
+    def get(self, tabla: str, id_registro) -> sqlite3.Row | None:
+        """Registro por su clave primaria (la de TABLE_PRIMARY_KEYS, 'uuid' por defecto)."""
+        clave = TABLE_PRIMARY_KEYS.get(tabla, "uuid")
+        filas = self.select(tabla, {clave: id_registro}, limite=1)
+        return filas[0] if filas else None
+
+    # --- ESCRITURA (rutas de sincronización) ---
+
+    def insert(self, tabla: str, datos: dict) -> str:
+        """Crea un registro marcado para sincronizar. Devuelve su UUID."""
+        for columna in datos:
+            _validar_identificador(columna)
+        id_empresa, id_sucursal = self._contexto()
+        return guardar_nuevo_registro(id_empresa, id_sucursal, _validar_identificador(tabla), dict(datos))
+
+    def update(self, tabla: str, uuid_registro: str, cambios: dict):
+        """Actualiza un registro y lo marca para sincronizar."""
+        for columna in cambios:
+            _validar_identificador(columna)
+        id_empresa, id_sucursal = self._contexto()
+        actualizar_registro(id_empresa, id_sucursal, _validar_identificador(tabla), uuid_registro, dict(cambios))
@@ -2,13 +2,13 @@
 import json
 import os
 from pathlib import Path
-from datetime import datetime, timezone
+from datetime import datetime, timezone, timedelta
+import base64
 import shutil 
 import sqlite3
 import hashlib
 import uuid
 from src.config.schema_config import TABLE_PRIMARY_KEYS, TABLAS_GENERALES
-import bcrypt
 
 # --- RUTA DE CONFIGURACIÓN ESTÁNDAR ---
 # Se define una única ubicación para el archivo de configuración.
@@ -19,6 +19,10 @@ CONFIG_DIR = Path(os.getenv('APPDATA')) / "Modula"
 CONFIG_FILE = CONFIG_DIR / "modula_config.json"
 # ✅ NUEVO: Definir el directorio para las bases de datos locales
 DB_DIR = CONFIG_DIR / "Databases"
+# Última verificación exitosa con la nube, para poder arrancar sin esperar al servidor.
+SESSION_CACHE_FILE = CONFIG_DIR / "session_cache.json"
+# Cuánto tiempo se acepta una verificación previa para arrancar sin conexión.
+SESSION_OFFLINE_GRACE = timedelta(days=7)
 
 def _ensure_config_dir_exists():
     """
@@ -73,6 +77,75 @@ def delete_config():
     except OSError as e:
         print(f"❌ Error al borrar el archivo de configuración: {e}")
 
+def _leer_expiracion_token(token: str) -> str | None:
+    """
+    Lee el campo 'exp' del payload de un JWT (sin validar la firma; solo es
+    informativo) y lo devuelve en ISO 8601. Devuelve None si no se puede leer.
+    """
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        exp = json.loads(base64.urlsafe_b64decode(payload)).get("exp")
+        return datetime.fromtimestamp(exp, tz=timezone.utc).isoformat() if exp else None
+    except (IndexError, ValueError, TypeError, AttributeError):
+        return None
+
+def save_verified_session(id_terminal: str, respuesta: dict):
+    """
+    Guarda los datos de la última verificación exitosa de la terminal para que el
+    siguiente arranque pueda mostrar el login local sin esperar al servidor.
+    El token en sí no se guarda; solo su fecha de expiración.
+    """
+    sesion = {
+        "id_terminal": id_terminal,
+        "id_empresa": respuesta.get("id_empresa"),
+        "id_sucursal": respuesta.get("id_sucursal"),
+        "token_exp": _leer_expiracion_token(respuesta.get("access_token", "")),
+        "verified_at": datetime.now(timezone.utc).isoformat(),
+    }
+    try:
+        _ensure_config_dir_exists()
+        tmp_path = SESSION_CACHE_FILE.with_suffix(".tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(sesion, f, indent=4)
+        os.replace(tmp_path, SESSION_CACHE_FILE)
+    except (IOError, OSError) as e:
+        print(f"❌ Error al guardar la sesión verificada: {e}")
+
+def get_verified_session(id_terminal: str) -> dict | None:
+    """
+    Devuelve la última sesión verificada si pertenece a esta terminal y sigue
+    vigente: dentro del periodo de gracia offline desde la verificación, o antes
+    de que expire el token de entonces (lo que sea más tarde). None en otro caso.
+    """
+    if not id_terminal or not SESSION_CACHE_FILE.exists():
+        return None
+    try:
+        with open(SESSION_CACHE_FILE, 'r') as f:
+            sesion = json.load(f)
+        if sesion.get("id_terminal") != id_terminal or not sesion.get("id_empresa"):
+            return None
+
+        vigente_hasta = datetime.fromisoformat(sesion["verified_at"]) + SESSION_OFFLINE_GRACE
+        if sesion.get("token_exp"):
+            vigente_hasta = max(vigente_hasta, datetime.fromisoformat(sesion["token_exp"]))
+        if datetime.now(timezone.utc) >= vigente_hasta:
+            print("ℹ️  La sesión verificada en caché ya expiró.")
+            return None
+        return sesion
+    except (IOError, json.JSONDecodeError, KeyError, ValueError) as e:
+        print(f"❌ Error al leer la sesión verificada: {e}")
+        return None
+
+def delete_verified_session():
+    """Elimina la sesión verificada en caché (p. ej. si la nube revocó la terminal)."""
+    try:
+        if SESSION_CACHE_FILE.exists():
+            os.remove(SESSION_CACHE_FILE)
+            print("🗑️ Sesión verificada en caché eliminada.")
+    except OSError as e:
+        print(f"❌ Error al borrar la sesión verificada: {e}")
+
 def calcular_hash_md5(file_path):
     hash_md5 = hashlib.md5()
     with open(file_path, "rb") as f:
@@ -422,23 +495,79 @@ def apply_deltas(id_empresa: str, delta_package: dict):
             conn.rollback()
             conn.close()
 
-def save_last_server_sync_timestamp(id_empresa: str, timestamp: str):
-    """Guarda el último timestamp exitoso del servidor en un archivo de estado."""
+def _read_sync_state(id_empresa: str) -> dict:
+    """Lee el archivo sync_state.json de la empresa (vacío si no existe o está dañado)."""
+    sync_state_path = DB_DIR / id_empresa / "sync_state.json"
+    if not sync_state_path.exists():
+        return {}
+    try:
+        with open(sync_state_path, "r") as f:
+            return json.load(f)
+    except (IOError, json.JSONDecodeError) as e:
+        print(f"⚠️  No se pudo leer el estado de sincronización: {e}")
+        return {}
+
+def _update_sync_state(id_empresa: str, **valores):
+    """Actualiza claves de sync_state.json conservando las demás."""
     sync_state_path = DB_DIR / id_empresa / "sync_state.json"
     sync_state_path.parent.mkdir(parents=True, exist_ok=True)
+    state = _read_sync_state(id_empresa)
+    state.update(valores)
     with open(sync_state_path, "w") as f:
-        json.dump({"last_server_sync": timestamp}, f)
+        json.dump(state, f)
+
+def save_last_server_sync_timestamp(id_empresa: str, timestamp: str):
+    """Guarda el último timestamp exitoso del servidor en un archivo de estado."""
+    _update_sync_state(id_empresa, last_server_sync=timestamp)
     print(f"✅ Marcador de sincronización guardado: {timestamp}")
 
 def get_last_server_sync_timestamp(id_empresa: str) -> str:
     """Lee el último timestamp guardado del servidor."""
-    sync_state_path = DB_DIR / id_empresa / "sync_state.json"
-    if not sync_state_path.exists():
-        # Si nunca se ha sincronizado, devuelve la fecha mínima.
-        return "1970-01-01T00:00:00+00:00"
-    with open(sync_state_path, "r") as f:
-        data = json.load(f)
-        return data.get("last_server_sync", "1970-01-01T00:00:00+00:00")
+    # Si nunca se ha sincronizado, devuelve la fecha mínima.
+    return _read_sync_state(id_empresa).get("last_server_sync", "1970-01-01T00:00:00+00:00")
+
+def get_sync_probe_etag(id_empresa: str) -> str | None:
+    """Devuelve el ETag de la última sonda de cambios cuyo pull completo tuvo éxito."""
+    return _read_sync_state(id_empresa).get("probe_etag")
+
+def save_sync_probe_etag(id_empresa: str, etag: str | None):
+    """Guarda el ETag de la sonda tras aplicar con éxito el pull completo correspondiente."""
+    _update_sync_state(id_empresa, probe_etag=etag)
+
+def get_local_change_marker(id_empresa: str) -> int:
+    """
+    Devuelve el mtime (en ns) más reciente de las bases locales de la empresa.
+    Cualquier escritura en SQLite (incluido su archivo -wal) lo hace avanzar, así que
+    sirve como indicador barato de "algo cambió localmente" sin abrir las bases.
+    """
+    company_root_path = DB_DIR / id_empresa
+    if not company_root_path.exists():
+        return 0
+    marker = 0
+    for pattern in ("*.sqlite", "*.sqlite-wal"):
+        for db_path in company_root_path.rglob(pattern):
+            try:
+                marker = max(marker, db_path.stat().st_mtime_ns)
+            except OSError:
+                continue
+    return marker
+
+def hay_cambios_locales(id_empresa: str, marker: int | None = None) -> bool:
+    """
+    Indica si alguna base local se modificó desde el último escaneo de pendientes
+    registrado con save_local_scan_marker. Sin marcador previo, asume que sí.
+    """
+    if marker is None:
+        marker = get_local_change_marker(id_empresa)
+    ultimo = _read_sync_state(id_empresa).get("local_scan_marker")
+    return ultimo is None or marker > ultimo
+
+def save_local_scan_marker(id_empresa: str, marker: int):
+    """
+    Registra el marcador tomado ANTES de un escaneo de pendientes exitoso. Las
+    escrituras posteriores al marcador harán que el siguiente ciclo vuelva a escanear.
+    """
+    _update_sync_state(id_empresa, local_scan_marker=marker)
     
 def guardar_nuevo_registro(id_empresa: str, id_sucursal: int, table_name: str, data_dict: dict) -> str:
     """
@@ -499,6 +628,8 @@ def actualizar_contrasena_usuario(id_empresa: str, uuid_usuario: str, nueva_cont
     Hashea una nueva contraseña y actualiza el registro del usuario en la DB local,
     marcando el cambio para sincronización.
     """
+    import bcrypt
+
     # 1. Hashear la nueva contraseña
     bytes_contrasena = nueva_contrasena_plana.encode('utf-8')
     contrasena_hash = bcrypt.hashpw(bytes_contrasena, bcrypt.gensalt()).decode('utf-8')
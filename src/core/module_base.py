@@ -1,4 +1,5 @@
 from PySide6.QtWidgets import QWidget
+from src.core.background_tasks import TaskGroup
 
 class ModulaModuleBase(QWidget):
     """
@@ -7,9 +8,24 @@ class ModulaModuleBase(QWidget):
     Asegura que cada módulo tenga una estructura y una interfaz predecibles
     para que el software principal pueda cargarlo e interactuar con él.
     """
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Si el módulo sobreescribe on_module_closed sin llamar a super(), igual
+        # cancelamos sus tareas en segundo plano al cerrarlo.
+        propio = cls.__dict__.get("on_module_closed")
+        if propio is not None and not getattr(propio, "_cancela_tareas", False):
+            def on_module_closed(self, *args, **kwargs):
+                try:
+                    return propio(self, *args, **kwargs)
+                finally:
+                    self.cancel_background_tasks()
+            on_module_closed._cancela_tareas = True
+            on_module_closed.__doc__ = propio.__doc__
+            cls.on_module_closed = on_module_closed
+
     def __init__(self, app_controller=None, parent=None):
         """
-        El constructor de un módulo siempre recibirá una referencia al 
+        El constructor de un módulo siempre recibirá una referencia al
         controlador principal de la aplicación.
 
         Args:
@@ -18,11 +34,50 @@ class ModulaModuleBase(QWidget):
             parent: El widget padre, gestionado por Qt.
         """
         super().__init__(parent)
-        
+
         # Guardamos una referencia al controlador para que el módulo pueda
         # interactuar con el resto de la aplicación (ej. hacer llamadas a la API).
         self.app_controller = app_controller
 
+        # Tareas en segundo plano del módulo (ver run_in_background). Si el widget
+        # se destruye sin pasar por on_module_closed, también se cancelan.
+        self._tareas = TaskGroup()
+        self.destroyed.connect(self._tareas.cancel)
+
+    @property
+    def db(self):
+        """
+        Acceso a los datos de la empresa y sucursal actuales (ver core/data_access.py):
+        self.db.select("productos", {"activo": 1}), self.db.get("ventas", uuid),
+        self.db.insert("ventas", {...}), self.db.update("clientes", uuid, {...}).
+        """
+        return self.app_controller.data_access if self.app_controller else None
+
+    def run_in_background(self, fn, *args, on_done=None, on_error=None, **kwargs):
+        """
+        Ejecuta fn(*args, **kwargs) en el pool de hilos compartido de Modula, sin
+        bloquear la interfaz. on_done(resultado) u on_error(excepción) se llaman
+        en el hilo principal, así que pueden actualizar widgets directamente.
+        Devuelve el Future de la tarea.
+
+        Al cerrar el módulo las tareas pendientes se cancelan y los resultados de
+        las que ya estaban corriendo se descartan. Una tarea larga puede revisar
+        self.background_cancel_event.is_set() en su bucle para terminar antes.
+        """
+        return self._tareas.submit(fn, *args, on_done=on_done, on_error=on_error, **kwargs)
+
+    @property
+    def background_cancel_event(self):
+        """
+        Leído dentro de una tarea de run_in_background, es el evento de esa
+        tarea: queda activado cuando se cancela, aunque el módulo se reabra.
+        """
+        return self._tareas.cancel_event
+
+    def cancel_background_tasks(self):
+        """Cancela las tareas en segundo plano del módulo (lo hace on_module_closed)."""
+        self._tareas.cancel()
+
     def on_module_loaded(self):
         """
         Este método será llamado por el sistema principal justo después de que
@@ -34,5 +89,22 @@ class ModulaModuleBase(QWidget):
         """
         Este método será llamado por el sistema principal justo antes de que
         la pestaña del módulo se cierre. Útil para guardar estados o limpiar.
+        Las tareas de run_in_background se cancelan automáticamente.
         """
-        pass # Los módulos pueden sobreescribir este método si lo necesitan.
\ No newline at end of file
+        self.cancel_background_tasks()
+
+    on_module_closed._cancela_tareas = True
+
+    def guardar_estado(self) -> dict | None:
+        """
+        Si la pestaña del módulo lleva mucho tiempo en segundo plano, el
+        workspace puede hibernarla: pide aquí un estado serializable (p. ej. el
+        ticket en captura), destruye el widget y al volver a la pestaña crea uno
+        nuevo y le pasa ese estado a restaurar_estado. Devolver None (lo
+        predeterminado) indica que el módulo no se debe hibernar.
+        """
+        return None
+
+    def restaurar_estado(self, estado: dict):
+        """Recibe en un widget nuevo el estado que devolvió guardar_estado."""
+        pass # Los módulos que implementen guardar_estado deben sobreescribir este método.
@@ -0,0 +1,97 @@
+# src/core/module_cache.py
+"""
+Almacén local de paquetes de módulos, direccionado por contenido.
+
+Cada zip se guarda como <sha256>.zip, así que instalar una versión que ya se
+descargó alguna vez (reinstalar, volver a una versión anterior, cambiar de
+versión y regresar) es una extracción local. Los paquetes se verifican al
+guardarlos y otra vez al usarlos; uno corrupto se borra y se vuelve a descargar.
+Cuando el almacén pasa del presupuesto de tamaño se eliminan los paquetes
+usados hace más tiempo (LRU, según la fecha de último uso del archivo).
+"""
+import hashlib
+import os
+import threading
+import uuid
+from pathlib import Path
+from src.core.updater import hash_file, HASH_BLOCK_SIZE
+
+DEFAULT_CACHE_BUDGET = 200 * 1024 * 1024
+DOWNLOAD_TIMEOUT = 30
+
+class PackageIntegrityError(Exception):
+    """El paquete descargado no coincide con el SHA-256 que publica el servidor."""
+
+class ModulePackageCache:
+    def __init__(self, cache_dir: Path, max_bytes: int = DEFAULT_CACHE_BUDGET):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        # Varias descargas de módulos corren en paralelo; la limpieza va de una en una.
+        self._lock = threading.Lock()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def _ruta(self, sha256: str) -> Path:
+        return self.cache_dir / f"{sha256.lower()}.zip"
+
+    def get(self, sha256: str) -> Path | None:
+        """Devuelve el paquete con ese hash si está en el almacén y es íntegro."""
+        if not sha256:
+            return None
+        ruta = self._ruta(sha256)
+        if not ruta.is_file():
+            return None
+        if hash_file(ruta) != sha256.lower():
+            print(f"⚠️ Paquete corrupto en la caché de módulos ({ruta.name}); se descartará.")
+            ruta.unlink(missing_ok=True)
+            return None
+        # Marca de último uso para el desalojo LRU.
+        os.utime(ruta)
+        return ruta
+
+    def download(self, url: str, expected_sha256: str | None = None) -> tuple[Path, str]:
+        """
+        Descarga 'url' al almacén calculando el SHA-256 mientras llega. Si se da
+        'expected_sha256' y no coincide, lanza PackageIntegrityError. Devuelve
+        (ruta del paquete, sha256).
+        """
+        import requests
+
+        temporal = self.cache_dir / f".{uuid.uuid4().hex}.tmp"
+        sha256 = hashlib.sha256()
+        try:
+            with requests.get(url, stream=True, timeout=DOWNLOAD_TIMEOUT) as response:
+                response.raise_for_status()
+                with open(temporal, "wb") as f:
+                    for chunk in response.iter_content(chunk_size=HASH_BLOCK_SIZE):
+                        sha256.update(chunk)
+                        f.write(chunk)
+            digest = sha256.hexdigest()
+            if expected_sha256 and digest != expected_sha256.lower():
+                raise PackageIntegrityError(f"Hash incorrecto para {url}: se esperaba {expected_sha256}, llegó {digest}.")
+            ruta = self._ruta(digest)
+            os.replace(temporal, ruta)
+        finally:
+            temporal.unlink(missing_ok=True)
+
+        self.evict(conservar=ruta)
+        return ruta, digest
+
+    def evict(self, conservar: Path | None = None):
+        """Borra los paquetes menos usados hasta quedar dentro de max_bytes."""
+        with self._lock:
+            paquetes = []
+            for ruta in self.cache_dir.glob("*.zip"):
+                try:
+                    info = ruta.stat()
+                except FileNotFoundError:
+                    continue
+                paquetes.append((info.st_mtime, info.st_size, ruta))
+            total = sum(tamano for _, tamano, _ in paquetes)
+            for _, tamano, ruta in sorted(paquetes):
+                if total <= self.max_bytes:
+                    break
+                if ruta == conservar:
+                    continue
+                ruta.unlink(missing_ok=True)
+                total -= tamano
+                print(f"🧹 Paquete {ruta.name} eliminado de la caché de módulos (LRU).")
@@ -1,13 +1,25 @@
 # src/core/module_manager.py
 
 import os
+import sys
 import json
 import shutil
-import requests
 import zipfile
+import marshal
+import importlib
+import importlib.machinery
 import importlib.util
+import zipimport
+import compileall
+import py_compile
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from PySide6.QtCore import Qt
+from packaging.version import Version, InvalidVersion
+from PySide6.QtCore import Qt, QObject, QCoreApplication, QTimer, Signal
+from src.core.startup_timeline import cronometrado
+from src.core.module_cache import ModulePackageCache
 
 # Usamos la misma base que ya tienes definida para la configuración
 CONFIG_DIR = Path(os.getenv('APPDATA')) / "Modula"
@@ -15,6 +27,110 @@ CONFIG_DIR = Path(os.getenv('APPDATA')) / "Modula"
 # Creamos un directorio hermano a 'Databases' para los módulos
 MODULES_DIR = CONFIG_DIR / "Modules"
 LOCAL_MANIFEST_FILE = MODULES_DIR / "installed.json"
+# Índice de los manifiestos instalados. Vive fuera de MODULES_DIR para que escribirlo
+# no cambie la fecha de modificación de la carpeta que sirve para validarlo.
+MODULES_INDEX_FILE = CONFIG_DIR / "modules_index.json"
+MODULES_INDEX_FORMAT = 1
+# Paquetes ya descargados, por SHA-256 (ver module_cache.py)
+PACKAGE_CACHE_DIR = MODULES_DIR / ".cache"
+
+# Archivos que obligan a extraer el paquete: zipimport no puede cargar extensiones nativas.
+NATIVE_SUFFIXES = (".pyd", ".so", ".dll")
+
+# Entrada de los zips instalados con el cache_tag del intérprete que compiló su bytecode.
+BYTECODE_MARKER = ".modula_bytecode"
+# Fecha fija de las entradas agregadas, para que el mismo paquete produzca el mismo zip.
+ZIP_FIXED_DATE = (1980, 1, 1, 0, 0, 0)
+
+# Paquete bajo el que se importan los módulos: modula_modules.<id>.<entry_point>
+MODULES_PACKAGE = "modula_modules"
+# Widgets cerrados que se conservan por módulo para reabrirlo sin reconstruirlo.
+WIDGET_POOL_SIZE = 1
+# Aperturas de cada módulo, para precargar primero los más usados (ver module_preloader.py).
+# Como el índice, vive fuera de MODULES_DIR, donde las instalaciones reemplazan archivos.
+USAGE_FILE = CONFIG_DIR / "modules_usage.json"
+# Las aperturas se acumulan en memoria y se guardan juntas tras este tiempo (y al salir).
+USAGE_SAVE_DELAY_MS = 10 * 1000
+# Una apertura de hace una semana pesa la mitad que una de hoy.
+USAGE_HALF_LIFE = 7 * 24 * 3600
+
+# Descargas e instalaciones de módulos simultáneas. Acotado para no saturar la red de la sucursal.
+MODULE_DOWNLOAD_WORKERS = 4
+
+
+def parse_version(version: str) -> Version:
+    """
+    Convierte una versión de módulo a un objeto comparable según semver/PEP 440,
+    para que "1.10.0" sea mayor que "1.9.0". Una versión inválida cuenta como 0.
+    """
+    try:
+        return Version(str(version))
+    except InvalidVersion:
+        print(f"⚠️ Versión de módulo inválida: '{version}'. Se tratará como 0.0.0.")
+        return Version("0")
+
+def _bytecode_checked_hash(source: bytes, ruta: str) -> bytes | None:
+    """
+    .pyc basado en hash y verificado (PEP 552): el intérprete comprueba que el
+    hash del código fuente coincida antes de usarlo y descarta el .pyc si su
+    número mágico es de otra versión de Python. Devuelve None si no compila.
+    """
+    try:
+        code = compile(source, ruta, "exec", dont_inherit=True)
+    except SyntaxError as e:
+        print(f"⚠️ {ruta} no compila: {e}. Se importará desde el código fuente.")
+        return None
+    flags = 0b11  # basado en hash | verificar fuente
+    return (importlib.util.MAGIC_NUMBER + flags.to_bytes(4, "little")
+            + importlib.util.source_hash(source) + marshal.dumps(code))
+
+def compile_module_zip(origen: Path, destino: Path):
+    """
+    Copia el paquete 'origen' a 'destino' agregando junto a cada .py su .pyc ya
+    compilado, que zipimport usa en lugar de compilar el módulo al importarlo.
+    Los .pyc que trajera el paquete se reemplazan.
+    """
+    with zipfile.ZipFile(origen, 'r') as entrada, zipfile.ZipFile(destino, 'w', zipfile.ZIP_DEFLATED) as salida:
+        for info in entrada.infolist():
+            if info.filename.endswith(".pyc") or info.filename == BYTECODE_MARKER:
+                continue
+            datos = entrada.read(info)
+            salida.writestr(info, datos)
+            if info.filename.endswith(".py"):
+                pyc = _bytecode_checked_hash(datos, info.filename)
+                if pyc is not None:
+                    salida.writestr(zipfile.ZipInfo(info.filename + "c", date_time=ZIP_FIXED_DATE), pyc)
+        salida.writestr(zipfile.ZipInfo(BYTECODE_MARKER, date_time=ZIP_FIXED_DATE), sys.implementation.cache_tag)
+
+def _olvidar_zip(zip_path: Path):
+    """
+    Olvida lo que zipimport guardó de un zip (su importador y el directorio de
+    entradas), para que el siguiente import lea el zip que lo reemplazó. Sin
+    esto, importar desde el zip nuevo falla con 'bad local file header'.
+    """
+    ruta = str(zip_path)
+    importador = sys.path_importer_cache.pop(ruta, None)
+    if importador is not None and hasattr(importador, "invalidate_caches"):
+        importador.invalidate_caches()
+    zipimport._zip_directory_cache.pop(ruta, None)
+    importlib.invalidate_caches()
+
+class _DescargaEnHiloPrincipal(QObject):
+    """
+    Vive en el hilo principal: la señal, emitida desde el hilo de arranque tras
+    instalar una actualización, ejecuta unload_module donde sí se pueden tocar
+    los widgets en reserva y sys.modules sin competir con la interfaz.
+    """
+    solicitada = Signal(str)
+
+def _guardar_manifiesto_local(local_manifest: dict):
+    """Escribe installed.json de forma atómica: o queda el anterior o el nuevo completo."""
+    temporal = LOCAL_MANIFEST_FILE.with_suffix(".json.tmp")
+    with open(temporal, "w", encoding="utf-8") as f:
+        json.dump(local_manifest, f, indent=4)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporal, LOCAL_MANIFEST_FILE)
 
 
 class ModuleManager:
@@ -25,20 +141,55 @@ class ModuleManager:
         self.api_client = api_client
         self.app_controller = app_controller
         MODULES_DIR.mkdir(exist_ok=True) # Se asegura de que la carpeta de módulos exista
+        self.package_cache = ModulePackageCache(PACKAGE_CACHE_DIR)
+        # Registro de módulos ya importados: {id: (versión, clase principal)}
+        self._module_classes = {}
+        # Widgets listos para reutilizarse: {id: [widget, ...]}
+        self._widget_pool = {}
+        # {id: {"score": aperturas con decaimiento, "last": timestamp}}; se lee en el primer uso
+        self._usage = None
+        self._usage_timer = None
+        # Índice de módulos instalados en memoria y sus permisos como frozenset
+        self._index = None
+        self._index_permisos = {}
+        # Un candado por módulo: el hilo de precarga y el principal nunca importan,
+        # descargan o recompilan el mismo módulo a la vez.
+        self._module_locks = {}
+        self._module_locks_lock = threading.Lock()
+        # El ModuleManager se puede crear en el hilo de arranque; la descarga de
+        # módulos actualizados siempre se ejecuta en el hilo principal.
+        self._descarga = _DescargaEnHiloPrincipal()
+        app = QCoreApplication.instance()
+        if app is not None:
+            self._descarga.moveToThread(app.thread())
+        self._descarga.solicitada.connect(self.unload_module)
+
+    @cronometrado("modulos.fetch_server_manifest")
+    def fetch_server_manifest(self) -> list | None:
+        """
+        Obtiene del servidor la lista de módulos disponibles.
+        Devuelve None si el manifiesto no se pudo obtener.
+        """
+        response = self.api_client.get_modules_manifest()
+        if response.get("status") != "ok":
+            print("❌ No se pudo obtener el manifiesto de módulos del servidor.")
+            return None
+        return response.get("modules", [])
 
-    def check_for_updates(self):
+    @cronometrado("modulos.check_for_updates")
+    def check_for_updates(self, server_modules_list: list = None):
         """
         Orquesta el proceso completo de verificación y actualización de módulos.
+        Si ya se obtuvo el manifiesto del servidor (p. ej. en paralelo durante el
+        arranque), se puede pasar como 'server_modules_list' para no pedirlo otra vez.
         """
         print("▶️ Iniciando revisión de módulos...")
         try:
             # 1. Obtener el manifiesto del servidor
-            response = self.api_client.get_modules_manifest()
-            if response.get("status") != "ok":
-                print("❌ No se pudo obtener el manifiesto de módulos del servidor.")
-                return
-            
-            server_modules_list = response.get("modules", []) 
+            if server_modules_list is None:
+                server_modules_list = self.fetch_server_manifest()
+                if server_modules_list is None:
+                    return
 
             # 2. Cargar el manifiesto local de módulos ya instalados
             local_manifest = {}
@@ -46,32 +197,131 @@ class ModuleManager:
                 with open(LOCAL_MANIFEST_FILE, "r", encoding="utf-8") as f:
                     local_manifest = json.load(f)
 
-            # 3. Comparar y descargar
+            # 3. Comparar versiones y reunir los módulos desactualizados
+            pendientes = []
             for server_data in server_modules_list:
                 module_id = server_data['identificador_unico'] 
 
                 local_version = local_manifest.get(module_id, {}).get("version", "0.0.0")
                 
-                if server_data["version"] > local_version:
+                if parse_version(server_data["version"]) > parse_version(local_version):
                     print(f"🔄 Actualización encontrada para '{server_data['nombre']}' (v{server_data['version']})...")
-                    self._download_and_install_module(module_id, server_data)
-                    local_manifest[module_id] = {"version": server_data["version"]}
+                    pendientes.append(server_data)
 
-            # 4. Guardar el estado actualizado del manifiesto local
-            with open(LOCAL_MANIFEST_FILE, "w", encoding="utf-8") as f:
-                json.dump(local_manifest, f, indent=4)
+            # 4. Descargar e instalar en paralelo; un módulo que falla no detiene a los demás
+            if pendientes:
+                workers = min(MODULE_DOWNLOAD_WORKERS, len(pendientes))
+                with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="modulos") as executor:
+                    futuros = {executor.submit(self._download_and_install_module, data['identificador_unico'], data): data
+                               for data in pendientes}
+                    for futuro in as_completed(futuros):
+                        server_data = futuros[futuro]
+                        try:
+                            sha256 = futuro.result()
+                        except Exception as e:
+                            print(f"🔥 Error al instalar el módulo '{server_data['nombre']}': {e}")
+                            continue
+                        if sha256:
+                            local_manifest[server_data['identificador_unico']] = {"version": server_data["version"],
+                                                                                  "sha256": sha256}
+                            # Este método corre en el hilo de arranque: la descarga se encola al hilo principal.
+                            self._descarga.solicitada.emit(server_data['identificador_unico'])
+
+                # 5. Guardar el manifiesto local una sola vez, al final
+                _guardar_manifiesto_local(local_manifest)
+                self.refresh_index()
             
             print("✅ Revisión de módulos finalizada.")
 
         except Exception as e:
             print(f"🔥🔥 ERROR durante la actualización de módulos: {e}")
             
+    def _read_manifest(self, item: Path) -> dict | None:
+        try:
+            if item.suffix == ".zip":
+                with zipfile.ZipFile(item, 'r') as zip_ref:
+                    if "manifest.json" not in zip_ref.namelist():
+                        return None
+                    return json.loads(zip_ref.read("manifest.json"))
+            manifest_path = item / "manifest.json"
+            if not manifest_path.exists():
+                return None
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except json.JSONDecodeError as e:
+            print(f"⚠️ Error de formato JSON en el manifest del módulo '{item.name}': {e}")
+        except Exception as e:
+            print(f"⚠️ Error genérico al leer el manifest del módulo '{item.name}': {e}")
+        return None
+
+    def refresh_index(self, anterior: dict = None) -> dict:
+        """
+        Reconstruye el índice de módulos instalados y lo guarda en MODULES_INDEX_FILE.
+        Cada módulo es un <id>.zip o, si se tuvo que extraer, una carpeta <id>.
+        Solo se vuelve a leer el manifest.json de los que cambiaron de fecha de
+        modificación respecto a 'anterior' (las instalaciones reemplazan el zip o
+        la carpeta completa, así que su fecha siempre cambia).
+        """
+        anteriores = (anterior or self._index or {}).get("modules", {})
+        modulos = {}
+        for entrada in os.scandir(MODULES_DIR):
+            # Se omiten .cache, las instalaciones a medias y los demás archivos.
+            es_modulo = entrada.is_dir() or (entrada.is_file() and entrada.name.endswith(".zip"))
+            if not es_modulo or entrada.name.startswith(".") or entrada.name.endswith(".partial"):
+                continue
+            mtime_ns = entrada.stat().st_mtime_ns
+            previo = anteriores.get(entrada.name)
+            if previo and previo["mtime_ns"] == mtime_ns:
+                modulos[entrada.name] = previo
+                continue
+            manifest = self._read_manifest(Path(entrada.path))
+            if manifest is not None:
+                modulos[entrada.name] = {"mtime_ns": mtime_ns, "manifest": manifest,
+                                         "permissions": sorted(manifest.get("permissions_required", []))}
+
+        index = {
+            "format": MODULES_INDEX_FORMAT,
+            "dir_mtime_ns": MODULES_DIR.stat().st_mtime_ns,
+            # Orden alfabético por nombre, ya resuelto para el sidebar.
+            "modules": dict(sorted(modulos.items(), key=lambda kv: kv[1]["manifest"].get("nombre", ""))),
+        }
+        temporal = MODULES_INDEX_FILE.with_suffix(".json.tmp")
+        try:
+            with open(temporal, "w", encoding="utf-8") as f:
+                json.dump(index, f)
+            os.replace(temporal, MODULES_INDEX_FILE)
+        except OSError as e:
+            print(f"⚠️ No se pudo guardar el índice de módulos: {e}")
+        self._set_index(index)
+        return index
+
+    def _set_index(self, index: dict):
+        self._index = index
+        self._index_permisos = {nombre: frozenset(info["permissions"]) for nombre, info in index["modules"].items()}
+
+    def _load_index(self) -> dict:
+        """Devuelve el índice vigente: el de memoria o el del disco si MODULES_DIR no cambió."""
+        dir_mtime_ns = MODULES_DIR.stat().st_mtime_ns
+        if self._index is not None and self._index["dir_mtime_ns"] == dir_mtime_ns:
+            return self._index
+        index = None
+        try:
+            with open(MODULES_INDEX_FILE, "r", encoding="utf-8") as f:
+                index = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            pass
+        if index and index.get("format") == MODULES_INDEX_FORMAT and index.get("dir_mtime_ns") == dir_mtime_ns:
+            self._set_index(index)
+            return index
+        return self.refresh_index(index if index and index.get("format") == MODULES_INDEX_FORMAT else None)
+
+    @cronometrado("modulos.get_installed_modules")
     def get_installed_modules(self):
         """
-        Escanea, valida y devuelve una lista con los manifiestos de todos los
-        módulos válidos que el usuario actual tiene permiso para ver.
+        Devuelve los manifiestos de los módulos instalados que el usuario actual
+        tiene permiso para ver, ordenados por nombre. Se leen del índice
+        persistente (ver refresh_index), sin recorrer MODULES_DIR.
         """
-        installed = []
         if not MODULES_DIR.is_dir():
             print("⚠️ El directorio de módulos no existe. No se cargarán módulos.")
             return []
@@ -80,91 +330,338 @@ class ModuleManager:
         # En una implementación real, esta línea vendría de un gestor de sesión.
         # Ejemplo: user_permissions = self.app_controller.get_current_user_permissions()
         # Por ahora, usamos un conjunto fijo para la demostración.
-        user_permissions = {"puede_realizar_ventas", "puede_ver_inventario"}
-        print(f"ℹ️ Permisos del usuario actual: {user_permissions}")
-        
-        # Iteramos sobre todos los directorios dentro de la carpeta de Módulos
-        for item in MODULES_DIR.iterdir():
-            if item.is_dir():
-                manifest_path = item / "manifest.json"
-                if manifest_path.exists():
-                    try:
-                        with open(manifest_path, "r", encoding="utf-8") as f:
-                            manifest = json.load(f)
-
-                        # --- VALIDACIÓN DE PERMISOS ---
-                        # Obtenemos la lista de permisos que el módulo requiere.
-                        required_permissions = set(manifest.get("permissions_required", []))
-                        
-                        # Si el módulo no requiere permisos o si el usuario TIENE TODOS
-                        # los permisos requeridos, entonces se puede cargar.
-                        if not required_permissions or required_permissions.issubset(user_permissions):
-                            installed.append(manifest)
-                        else:
-                            # Si no se cumplen los permisos, lo informamos (útil para depurar)
-                            print(f"🚫 Módulo '{manifest.get('nombre')}' omitido por falta de permisos. "
-                                  f"Requiere: {required_permissions}")
-
-                    except json.JSONDecodeError as e:
-                        print(f"⚠️ Error de formato JSON en el manifest del módulo '{item.name}': {e}")
-                    except Exception as e:
-                        print(f"⚠️ Error genérico al leer el manifest del módulo '{item.name}': {e}")
-                        
-        # Devolvemos la lista de módulos permitidos, ordenada alfabéticamente por nombre.
-        return sorted(installed, key=lambda m: m.get('nombre', ''))
-
-
-    def _download_and_install_module(self, module_id, server_data):
-        """
-        Descarga y descomprime un paquete de módulo con estructura plana.
+        user_permissions = frozenset({"puede_realizar_ventas", "puede_ver_inventario"})
+        print(f"ℹ️ Permisos del usuario actual: {set(user_permissions)}")
+
+        installed = []
+        for nombre, info in self._load_index()["modules"].items():
+            # Si el módulo no requiere permisos o si el usuario TIENE TODOS
+            # los permisos requeridos, entonces se puede cargar.
+            required_permissions = self._index_permisos[nombre]
+            if required_permissions <= user_permissions:
+                installed.append(info["manifest"])
+            else:
+                print(f"🚫 Módulo '{info['manifest'].get('nombre')}' omitido por falta de permisos. "
+                      f"Requiere: {set(required_permissions)}")
+        return installed
+
+    def _download_and_install_module(self, module_id, server_data) -> str | None:
+        """
+        Instala un paquete de módulo con estructura plana. Si el servidor publica
+        su 'sha256' y ese paquete ya está en la caché local, no se descarga.
+        Se ejecuta en un hilo del pool de check_for_updates, así que solo toca
+        archivos propios del módulo. Devuelve el SHA-256 del paquete instalado.
         """
         download_url = server_data.get("download_url")
-        if not download_url:
+        expected_sha256 = server_data.get("sha256")
+
+        paquete = self.package_cache.get(expected_sha256)
+        if paquete:
+            sha256 = expected_sha256.lower()
+            print(f"📦 Módulo '{server_data['nombre']}' v{server_data['version']} tomado de la caché local.")
+        elif download_url:
+            paquete, sha256 = self.package_cache.download(download_url, expected_sha256)
+        else:
             print(f"⚠️  No se proporcionó URL de descarga para {module_id}. Omitiendo.")
-            return
+            return None
+
+        # Normalmente el módulo se instala como su propio zip y se ejecuta desde ahí:
+        # una sola escritura al instalar y un solo borrado al desinstalar. El zip
+        # instalado lleva además el bytecode ya compilado.
+        if self._is_zip_safe(paquete):
+            module_path = self.module_zip_path(module_id)
+            temporal = module_path.with_name(module_path.name + ".partial")
+            try:
+                compile_module_zip(paquete, temporal)
+                os.replace(temporal, module_path)
+            finally:
+                temporal.unlink(missing_ok=True)
+            if (MODULES_DIR / module_id).is_dir():
+                shutil.rmtree(MODULES_DIR / module_id)
+        else:
+            module_path = self._extract_module(module_id, paquete)
+            self.module_zip_path(module_id).unlink(missing_ok=True)
 
-        module_path = MODULES_DIR / module_id
-        zip_path = MODULES_DIR / f"{module_id}.zip"
-
-        # Descargar el archivo (sin cambios)
-        response = requests.get(download_url, stream=True)
-        response.raise_for_status()
-        with open(zip_path, "wb") as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
-        
-        # --- LÓGICA DE EXTRACCIÓN SIMPLIFICADA GRACIAS A TU IDEA ---
-        # 1. Aseguramos una instalación limpia
-        if module_path.exists():
-            shutil.rmtree(module_path)
-        module_path.mkdir() # Creamos la carpeta de destino vacía
-        
-        # 2. Extraemos todo directamente en la carpeta de destino
-        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-            zip_ref.extractall(module_path)
-        
-        os.remove(zip_path) # Limpiamos el archivo .zip
         print(f"✔️ Módulo '{server_data['nombre']}' instalado correctamente en: {module_path}")
+        return sha256
+
+    def _is_zip_safe(self, paquete: Path) -> bool:
+        """Un paquete se ejecuta desde el zip salvo que traiga código nativo o lo pida su manifest."""
+        with zipfile.ZipFile(paquete, 'r') as zip_ref:
+            nombres = zip_ref.namelist()
+            if any(nombre.lower().endswith(NATIVE_SUFFIXES) for nombre in nombres):
+                return False
+            if "manifest.json" in nombres:
+                manifest = json.loads(zip_ref.read("manifest.json"))
+                return manifest.get("zip_safe", True)
+        return True
+
+    def _extract_module(self, module_id: str, paquete: Path) -> Path:
+        """Respaldo: extrae el paquete en MODULES_DIR/<id> para los módulos que no pueden ir en zip."""
+        module_path = MODULES_DIR / module_id
+        staging_path = MODULES_DIR / f"{module_id}.partial"
+        try:
+            # Extraemos a una carpeta aparte y solo al final reemplazamos la instalada,
+            # para no dejar un módulo a medias si la extracción falla.
+            if staging_path.exists():
+                shutil.rmtree(staging_path)
+            staging_path.mkdir()
+            with zipfile.ZipFile(paquete, 'r') as zip_ref:
+                zip_ref.extractall(staging_path)
+            # Bytecode en __pycache__, basado en hash para que no dependa de las fechas de extracción.
+            compileall.compile_dir(staging_path, quiet=1, force=True,
+                                   invalidation_mode=py_compile.PycInvalidationMode.CHECKED_HASH)
+
+            if module_path.exists():
+                shutil.rmtree(module_path)
+            staging_path.rename(module_path)
+        finally:
+            shutil.rmtree(staging_path, ignore_errors=True)
+        return module_path
+
+    def _ensure_bytecode(self, module_id: str):
+        """
+        Si el zip instalado se compiló con otra versión de Python (p. ej. tras
+        actualizar la app), regenera su bytecode una vez en lugar de que cada
+        import vuelva a compilar el código fuente.
+        """
+        zip_path = self.module_zip_path(module_id)
+        if not zip_path.is_file():
+            return
+        try:
+            with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+                cache_tag = zip_ref.read(BYTECODE_MARKER).decode("utf-8")
+        except KeyError:
+            cache_tag = None
+        if cache_tag == sys.implementation.cache_tag:
+            return
+        print(f"⚙️ Compilando el bytecode del módulo '{module_id}' para {sys.implementation.cache_tag}...")
+        temporal = zip_path.with_name(zip_path.name + ".partial")
+        try:
+            compile_module_zip(zip_path, temporal)
+            os.replace(temporal, zip_path)
+        except OSError as e:
+            print(f"⚠️ No se pudo compilar el módulo '{module_id}': {e}")
+        finally:
+            temporal.unlink(missing_ok=True)
+        _olvidar_zip(zip_path)
+
+    def module_zip_path(self, module_id: str) -> Path:
+        return MODULES_DIR / f"{module_id}.zip"
+
+    def module_location(self, module_id: str) -> Path:
+        """Zip del módulo si se instaló así; si no, su carpeta extraída."""
+        zip_path = self.module_zip_path(module_id)
+        return zip_path if zip_path.is_file() else MODULES_DIR / module_id
+
+    def read_module_resource(self, module_manifest: dict, ruta_relativa: str) -> bytes | None:
+        """
+        Lee un archivo del módulo (ícono, imagen, plantilla...) esté en zip o en
+        carpeta. El código de los módulos puede usar importlib.resources, que
+        funciona igual con zipimport.
+        """
+        ubicacion = self.module_location(module_manifest['id'])
+        try:
+            if ubicacion.suffix == ".zip":
+                with zipfile.ZipFile(ubicacion, 'r') as zip_ref:
+                    return zip_ref.read(ruta_relativa)
+            return (ubicacion / ruta_relativa).read_bytes()
+        except (KeyError, OSError, zipfile.BadZipFile):
+            return None
+
+    def module_icon(self, module_manifest: dict):
+        """QIcon del módulo según su manifest, o un ícono vacío si no tiene."""
+        from PySide6.QtGui import QIcon, QPixmap
+        icono = module_manifest.get('icono')
+        datos = self.read_module_resource(module_manifest, icono) if icono else None
+        if not datos:
+            return QIcon()
+        pixmap = QPixmap()
+        pixmap.loadFromData(datos, Path(icono).suffix.lstrip(".").upper() or None)
+        return QIcon(pixmap)
+
+    def _ensure_package(self, nombre: str, rutas: list):
+        """Crea (una vez) un paquete vacío en sys.modules cuyo __path__ es 'rutas'."""
+        paquete = sys.modules.get(nombre)
+        if paquete is None:
+            spec = importlib.machinery.ModuleSpec(nombre, None, is_package=True)
+            paquete = importlib.util.module_from_spec(spec)
+            sys.modules[nombre] = paquete
+        paquete.__path__ = rutas
+        return paquete
+
+    def _module_lock(self, module_id: str) -> threading.RLock:
+        with self._module_locks_lock:
+            return self._module_locks.setdefault(module_id, threading.RLock())
+
+    def prepare_module(self, module_manifest: dict):
+        """
+        Deja el módulo listo para importarse: descarta la versión vieja si cambió,
+        regenera su bytecode si hace falta y crea su paquete en sys.modules.
+        Modifica estado compartido (reserva de widgets, sys.modules, el zip), así
+        que solo se llama desde el hilo principal.
+        """
+        module_id = module_manifest['id']
+        with self._module_lock(module_id):
+            cacheado = self._module_classes.get(module_id)
+            if cacheado and cacheado[0] != module_manifest.get('version'):
+                # El módulo se actualizó desde que se importó: descartamos la versión vieja.
+                self.unload_module(module_id)
+            self._ensure_bytecode(module_id)
+            self._ensure_package(MODULES_PACKAGE, [])
+            # Con un zip en __path__, Python importa los archivos del módulo con zipimport.
+            self._ensure_package(f"{MODULES_PACKAGE}.{module_id}", [str(self.module_location(module_id))])
+
+    def import_module_class(self, module_manifest: dict):
+        """
+        Importa el módulo ya preparado (prepare_module) y guarda su clase
+        principal. Solo importa, así que se puede llamar desde otro hilo (p. ej.
+        la precarga). Lanza RuntimeError si el módulo no está preparado.
+        """
+        module_id = module_manifest['id']
+        version = module_manifest.get('version')
+        paquete = f"{MODULES_PACKAGE}.{module_id}"
+        with self._module_lock(module_id):
+            cacheado = self._module_classes.get(module_id)
+            if cacheado and cacheado[0] == version:
+                return cacheado[1]
+            if cacheado or paquete not in sys.modules:
+                raise RuntimeError(f"El módulo '{module_id}' no está preparado para importarse.")
+            entry_point = Path(module_manifest['entry_point']).stem
+            module = importlib.import_module(f"{paquete}.{entry_point}")
+
+            ModuleWidgetClass = getattr(module, module_manifest['clase_principal'])
+            self._module_classes[module_id] = (version, ModuleWidgetClass)
+            return ModuleWidgetClass
+
+    def get_module_class(self, module_manifest: dict):
+        """
+        Devuelve la clase principal del módulo, importándolo solo la primera vez.
+        El módulo queda en sys.modules como 'modula_modules.<id>.<entry_point>',
+        así que también funcionan los imports relativos entre sus archivos.
+        Se llama desde el hilo principal (ver prepare_module).
+        """
+        cacheado = self._module_classes.get(module_manifest['id'])
+        if cacheado and cacheado[0] == module_manifest.get('version'):
+            return cacheado[1]
+        with self._module_lock(module_manifest['id']):
+            self.prepare_module(module_manifest)
+            return self.import_module_class(module_manifest)
+
+    def unload_module(self, module_id: str):
+        """Olvida las clases, los widgets en reserva y el código importado de un módulo (hilo principal)."""
+        with self._module_lock(module_id):
+            self._module_classes.pop(module_id, None)
+            for widget in self._widget_pool.pop(module_id, []):
+                widget.deleteLater()
+            prefijo = f"{MODULES_PACKAGE}.{module_id}"
+            for nombre in [n for n in sys.modules if n == prefijo or n.startswith(prefijo + ".")]:
+                del sys.modules[nombre]
+            # zipimport guarda el directorio del zip: al reemplazarlo hay que olvidarlo.
+            _olvidar_zip(self.module_zip_path(module_id))
+
+    def release_module_widget(self, widget) -> bool:
+        """
+        Recibe el widget de una pestaña que se cerró. Si es de un módulo y hay
+        lugar en la reserva, lo conserva para la próxima vez y devuelve True;
+        si no, el llamador debe destruirlo.
+        """
+        module_id = getattr(widget, "_modula_module_id", None)
+        cacheado = self._module_classes.get(module_id)
+        if not cacheado or type(widget) is not cacheado[1]:
+            return False
+        reserva = self._widget_pool.setdefault(module_id, [])
+        if len(reserva) >= WIDGET_POOL_SIZE:
+            return False
+        widget.setParent(None)
+        reserva.append(widget)
+        return True
+
+    def _load_usage(self) -> dict:
+        if self._usage is None:
+            try:
+                with open(USAGE_FILE, "r", encoding="utf-8") as f:
+                    self._usage = json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError):
+                self._usage = {}
+        return self._usage
+
+    def _usage_score(self, module_id: str, ahora: float) -> float:
+        uso = self._load_usage().get(module_id)
+        if not uso:
+            return 0.0
+        return uso["score"] * 0.5 ** ((ahora - uso["last"]) / USAGE_HALF_LIFE)
+
+    def record_usage(self, module_id: str):
+        """
+        Suma una apertura del módulo; las anteriores pierden peso con el tiempo.
+        Se llama en el hilo principal y no escribe en disco: el guardado se agenda
+        para USAGE_SAVE_DELAY_MS después, así varias aperturas seguidas son una
+        sola escritura.
+        """
+        ahora = time.time()
+        score = self._usage_score(module_id, ahora) + 1
+        self._load_usage()[module_id] = {"score": score, "last": ahora}
+        if self._usage_timer is None:
+            self._usage_timer = QTimer()
+            self._usage_timer.setSingleShot(True)
+            self._usage_timer.setInterval(USAGE_SAVE_DELAY_MS)
+            self._usage_timer.timeout.connect(self.save_usage)
+            app = QCoreApplication.instance()
+            if app is not None:
+                app.aboutToQuit.connect(self.save_usage)
+        if not self._usage_timer.isActive():
+            self._usage_timer.start()
+
+    def save_usage(self):
+        """Escribe el uso de módulos de forma atómica: o queda el archivo anterior o el nuevo completo."""
+        if self._usage_timer is not None:
+            self._usage_timer.stop()
+        if self._usage is None:
+            return
+        temporal = USAGE_FILE.with_suffix(".json.tmp")
+        try:
+            with open(temporal, "w", encoding="utf-8") as f:
+                json.dump(self._usage, f)
+            os.replace(temporal, USAGE_FILE)
+        except OSError as e:
+            print(f"⚠️ No se pudo guardar el uso de módulos: {e}")
+
+    def rank_by_usage(self, manifests: list) -> list:
+        """Ordena los manifiestos del módulo más usado recientemente al menos usado."""
+        ahora = time.time()
+        return sorted(manifests, key=lambda m: self._usage_score(m['id'], ahora), reverse=True)
+
+    def _new_widget(self, module_manifest: dict):
+        ModuleWidgetClass = self.get_module_class(module_manifest)
+        # Instanciamos la clase del módulo, pasándole el app_controller
+        widget = ModuleWidgetClass(app_controller=self.app_controller)
+        widget._modula_module_id = module_manifest['id']
+        return widget
+
+    def prewarm_widget(self, module_manifest: dict):
+        """Construye un widget del módulo y lo deja en la reserva, si aún no hay uno."""
+        module_id = module_manifest['id']
+        self.get_module_class(module_manifest)
+        if self._widget_pool.get(module_id):
+            return
+        self._widget_pool.setdefault(module_id, []).append(self._new_widget(module_manifest))
 
     def load_module_widget(self, module_manifest: dict):
         """
-        Carga dinámicamente el widget principal de un módulo usando su manifiesto.
+        Devuelve el widget principal de un módulo usando su manifiesto: uno de la
+        reserva si hay, o una instancia nueva de la clase ya importada.
         """
         try:
+            # get_module_class descarta la reserva si el módulo cambió de versión.
+            self.get_module_class(module_manifest)
             module_id = module_manifest['id']
-            entry_point = module_manifest['entry_point']
-            class_name = module_manifest['clase_principal']
-            
-            module_path = MODULES_DIR / module_id / entry_point
-            
-            spec = importlib.util.spec_from_file_location(f"modules.{module_id}", module_path)
-            module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(module)
-            
-            ModuleWidgetClass = getattr(module, class_name)
-            
-            # Instanciamos la clase del módulo, pasándole el app_controller
-            return ModuleWidgetClass(app_controller=self.app_controller)
+            self.record_usage(module_id)
+
+            reserva = self._widget_pool.get(module_id)
+            if reserva:
+                return reserva.pop()
+            return self._new_widget(module_manifest)
             
         except Exception as e:
             print(f"🔥🔥 ERROR al cargar dinámicamente el módulo '{module_manifest.get('nombre')}': {e}")
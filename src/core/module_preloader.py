@@ -0,0 +1,127 @@
+# src/core/module_preloader.py
+from PySide6.QtCore import QObject, QThread, QTimer, Signal
+
+class ModuleImportWorker(QObject):
+    """
+    Importa en un hilo secundario el código de los módulos indicados, para que el
+    primer clic no pague el import. Solo importa (ModuleManager.import_module_class):
+    la preparación que modifica estado compartido ya se hizo en el hilo principal
+    y los widgets también se construyen ahí (Qt no permite crearlos en otro hilo).
+    """
+    module_imported = Signal(object)  # manifiesto del módulo ya importado
+    finished = Signal()
+
+    def __init__(self, module_manager, manifests: list):
+        super().__init__()
+        self.module_manager = module_manager
+        self.manifests = manifests
+        self._cancelado = False
+
+    def cancel(self):
+        self._cancelado = True
+
+    def run(self):
+        for manifest in self.manifests:
+            if self._cancelado:
+                break
+            try:
+                self.module_manager.import_module_class(manifest)
+                self.module_imported.emit(manifest)
+            except Exception as e:
+                print(f"⚠️ [PRECARGA] No se pudo importar '{manifest.get('nombre')}': {e}")
+        self.finished.emit()
+
+class ModulePreloader(QObject):
+    """
+    Precarga, con la app ociosa, los módulos que el usuario probablemente abrirá:
+    los permitidos para él, ordenados por uso reciente (ver
+    ModuleManager.rank_by_usage). El import corre en un QThread de prioridad
+    mínima y, si prebuild es True, los widgets se construyen después en el hilo
+    principal, uno por vuelta del bucle de eventos, para no congelar la entrada.
+    """
+    def __init__(self, module_manager, parent=None, max_modulos: int = 3, prebuild: bool = True,
+                 retraso_ms: int = 1500, pausa_entre_widgets_ms: int = 250):
+        super().__init__(parent)
+        self.module_manager = module_manager
+        self.max_modulos = max_modulos
+        self.prebuild = prebuild
+        self.pausa_entre_widgets_ms = pausa_entre_widgets_ms
+        self.import_thread = None
+        self.import_worker = None
+        self._por_construir = []
+        self._manifests = []
+
+        self.start_timer = QTimer(self)
+        self.start_timer.setSingleShot(True)
+        self.start_timer.setInterval(retraso_ms)
+        self.start_timer.timeout.connect(self._importar)
+
+        self.build_timer = QTimer(self)
+        self.build_timer.setSingleShot(True)
+        self.build_timer.setInterval(pausa_entre_widgets_ms)
+        self.build_timer.timeout.connect(self._construir_siguiente)
+
+    def start(self, manifests: list):
+        """Programa la precarga de los módulos 'manifests' (ya filtrados por permisos)."""
+        self.stop()
+        self._manifests = self.module_manager.rank_by_usage(manifests)[:self.max_modulos]
+        if self._manifests:
+            # Esperamos a que el dashboard termine de pintarse antes de empezar.
+            self.start_timer.start()
+
+    def stop(self):
+        self.start_timer.stop()
+        self.build_timer.stop()
+        self._por_construir = []
+        if self.import_worker is not None:
+            self.import_worker.cancel()
+
+    def _importar(self):
+        if self.import_thread is not None:
+            return
+        # Descartar versiones viejas y recompilar bytecode toca estado compartido:
+        # se hace aquí, en el hilo principal, antes de importar en segundo plano.
+        preparados = []
+        for manifest in self._manifests:
+            try:
+                self.module_manager.prepare_module(manifest)
+                preparados.append(manifest)
+            except Exception as e:
+                print(f"⚠️ [PRECARGA] No se pudo preparar '{manifest.get('nombre')}': {e}")
+        if not preparados:
+            return
+        print(f"⏳ [PRECARGA] Importando {len(preparados)} módulos en segundo plano...")
+        self.import_thread = QThread()
+        self.import_worker = ModuleImportWorker(self.module_manager, preparados)
+        self.import_worker.moveToThread(self.import_thread)
+
+        self.import_thread.started.connect(self.import_worker.run)
+        self.import_worker.module_imported.connect(self._on_module_imported)
+        self.import_worker.finished.connect(self._on_import_finished)
+        self.import_worker.finished.connect(self.import_thread.quit)
+        self.import_worker.finished.connect(self.import_worker.deleteLater)
+        self.import_thread.finished.connect(self.import_thread.deleteLater)
+
+        self.import_thread.start(QThread.LowestPriority)
+
+    def _on_module_imported(self, manifest):
+        if not self.prebuild:
+            return
+        self._por_construir.append(manifest)
+        if not self.build_timer.isActive():
+            self.build_timer.start()
+
+    def _on_import_finished(self):
+        self.import_thread = None
+        self.import_worker = None
+
+    def _construir_siguiente(self):
+        if not self._por_construir:
+            return
+        manifest = self._por_construir.pop(0)
+        try:
+            self.module_manager.prewarm_widget(manifest)
+        except Exception as e:
+            print(f"⚠️ [PRECARGA] No se pudo preparar el widget de '{manifest.get('nombre')}': {e}")
+        if self._por_construir:
+            self.build_timer.start()
@@ -0,0 +1,64 @@
+# src/core/network_identity.py
+import threading
+from PySide6.QtCore import QObject, QTimer, Signal
+from src.core.utils import get_network_identifiers
+
+class NetworkIdentityService(QObject):
+    """
+    Mantiene actualizada en segundo plano la "huella" de la red local
+    (MAC del gateway y SSID) que usa la verificación de la terminal.
+
+    La lectura real lanza subprocesos (getmac, netsh), así que se hace en un hilo
+    aparte y el resultado queda en la caché de utils.get_network_identifiers.
+    Quien necesite los identificadores los obtiene al instante desde la caché.
+    El intervalo de refresco es menor que el TTL de la caché, por lo que en
+    operación normal nadie espera a un subproceso. La señal 'red_cambiada' solo
+    se emite cuando el gateway o el SSID cambian de verdad, no en cada refresco.
+    """
+    red_cambiada = Signal(dict)
+
+    def __init__(self, parent=None, intervalo_refresco_ms: int = 60000):
+        super().__init__(parent)
+        self._ultima_huella = None
+        self._hilo_refresco = None
+        self._lock = threading.Lock()
+
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(intervalo_refresco_ms)
+        self.refresh_timer.timeout.connect(self.refrescar_en_segundo_plano)
+
+    def start(self):
+        """Lanza la primera lectura en segundo plano y activa el refresco periódico."""
+        self.refrescar_en_segundo_plano()
+        self.refresh_timer.start()
+
+    def stop(self):
+        self.refresh_timer.stop()
+
+    def identificadores(self) -> dict:
+        """Devuelve los identificadores en caché (espera a la lectura en curso si aún no hay)."""
+        return get_network_identifiers()
+
+    def refrescar_en_segundo_plano(self):
+        """Inicia una lectura nueva de la red en un hilo, si no hay otra en curso."""
+        with self._lock:
+            if self._hilo_refresco and self._hilo_refresco.is_alive():
+                return
+            self._hilo_refresco = threading.Thread(target=self._refrescar, name="NetworkIdentityRefresh", daemon=True)
+            self._hilo_refresco.start()
+
+    def _refrescar(self):
+        try:
+            identificadores = get_network_identifiers(max_age=0)
+        except Exception as e:
+            print(f"⚠️  No se pudo refrescar la huella de red: {e}")
+            return
+
+        huella = (identificadores.get("gateway_mac"), identificadores.get("ssid"))
+        anterior = self._ultima_huella
+        self._ultima_huella = huella
+
+        if anterior is not None and huella != anterior:
+            print(f"🌐 Cambio de red detectado: {anterior} -> {huella}")
+            # Las señales de Qt son seguras entre hilos: el receptor la procesa en su propio hilo.
+            self.red_cambiada.emit(identificadores)
@@ -0,0 +1,66 @@
+# src/core/resources.py
+"""
+Recursos gráficos compilados de Modula.
+
+tools/build_resources.py genera 'resources.rcc', un archivo binario de recursos de
+Qt con las imágenes ya escaladas a los tamaños en que se muestran (a 1x y 2x).
+Se registra con QResource.registerResource, de modo que Qt lo mapea en memoria en
+lugar de que Python tenga que cargar un módulo enorme de bytes escapados.
+
+Si el .rcc no existe (p. ej. en desarrollo sin compilar), las imágenes se cargan
+desde src/assets y se escalan al vuelo, como antes.
+"""
+from PySide6.QtCore import QResource, Qt
+from PySide6.QtGui import QGuiApplication, QPixmap
+from src.core.utils import resource_path
+
+RESOURCES_RCC = "resources.rcc"
+
+# Alturas lógicas (px) en que la UI muestra cada imagen de assets/images.
+# tools/build_resources.py genera una variante por altura y densidad.
+IMAGE_VARIANTS = {
+    "logo_modula": (16, 80, 96),
+    "logo_addsy_powered": (16, 80),
+    "icon_email": (20,),
+    "icon_lock": (20,),
+}
+DENSITIES = (1, 2)
+
+_registrado = None
+
+def register_resources() -> bool:
+    """
+    Registra resources.rcc (una sola vez por proceso). Devuelve True si los
+    recursos compilados están disponibles en ':/'.
+    """
+    global _registrado
+    if _registrado is None:
+        _registrado = QResource.registerResource(resource_path(RESOURCES_RCC))
+        if not _registrado:
+            print(f"⚠️  No se encontró {RESOURCES_RCC}; se usarán las imágenes de assets/ escaladas al vuelo.")
+    return _registrado
+
+def variant_name(nombre: str, alto: int, densidad: int) -> str:
+    """Nombre del archivo de una variante pre-escalada, p. ej. 'logo_modula_96@2x.png'."""
+    return f"{nombre}_{alto}@{densidad}x.png"
+
+def load_pixmap(nombre: str, alto: int) -> QPixmap:
+    """
+    Devuelve la imagen 'nombre' (sin extensión) con 'alto' píxeles lógicos,
+    usando la variante pre-escalada para la densidad de la pantalla si existe.
+    """
+    ratio = QGuiApplication.primaryScreen().devicePixelRatio() if QGuiApplication.primaryScreen() else 1.0
+    if alto in IMAGE_VARIANTS.get(nombre, ()) and register_resources():
+        densidad = 2 if ratio > 1 else 1
+        pixmap = QPixmap(f":/images/{variant_name(nombre, alto, densidad)}")
+        if not pixmap.isNull():
+            pixmap.setDevicePixelRatio(densidad)
+            return pixmap
+
+    # Respaldo: imagen original escalada en tiempo de ejecución.
+    pixmap = QPixmap(resource_path(f"assets/images/{nombre}.png"))
+    if pixmap.isNull():
+        return pixmap
+    escalada = pixmap.scaledToHeight(round(alto * ratio), Qt.SmoothTransformation)
+    escalada.setDevicePixelRatio(ratio)
+    return escalada
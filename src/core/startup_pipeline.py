@@ -0,0 +1,92 @@
+# src/core/startup_pipeline.py
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from src.core.startup_timeline import span
+
+class DetenerArranque(Exception):
+    """
+    Una etapa la lanza para terminar el arranque de forma controlada (por ejemplo,
+    cuando la verificación de la terminal no es 'ok'). 'resultado' es lo que el
+    StartupWorker debe emitir en lugar de seguir con el resto de etapas.
+    """
+    def __init__(self, resultado):
+        super().__init__(str(resultado))
+        self.resultado = resultado
+
+class StartupStage:
+    """Una etapa del arranque: una función y las etapas de las que depende."""
+    def __init__(self, nombre: str, funcion, depende_de=(), peso: int = 1, mensaje: str = ""):
+        self.nombre = nombre
+        self.funcion = funcion
+        self.depende_de = tuple(depende_de)
+        self.peso = peso
+        self.mensaje = mensaje or nombre
+
+class StartupPipeline:
+    """
+    Ejecuta las etapas del arranque como un pequeño grafo de dependencias.
+
+    Las etapas cuyas dependencias ya terminaron se lanzan en paralelo en un pool
+    de hilos, de modo que el tiempo total se acerca a la ruta crítica en vez de a
+    la suma de todas las etapas. Cada función recibe el diccionario de resultados
+    de las etapas ya completadas. El progreso se reporta como el porcentaje del
+    peso total ya completado, junto al mensaje de la etapa que acaba de empezar.
+    """
+    def __init__(self, on_progress=None, max_workers: int = 4):
+        self.on_progress = on_progress
+        self.max_workers = max_workers
+        self.etapas = {}
+
+    def add(self, nombre: str, funcion, depende_de=(), peso: int = 1, mensaje: str = ""):
+        for dependencia in depende_de:
+            if dependencia not in self.etapas:
+                raise ValueError(f"La etapa '{nombre}' depende de '{dependencia}', que no está definida antes.")
+        self.etapas[nombre] = StartupStage(nombre, funcion, depende_de, peso, mensaje)
+        return self
+
+    def _ejecutar(self, etapa: StartupStage, resultados: dict):
+        # Cada etapa queda registrada en la línea de tiempo del arranque.
+        with span(f"arranque.{etapa.nombre}"):
+            return etapa.funcion(resultados)
+
+    def _reportar(self, mensaje: str, completado: int, total: int):
+        if self.on_progress:
+            self.on_progress(mensaje, int(completado * 100 / total) if total else 100)
+
+    def run(self) -> dict:
+        """
+        Ejecuta todas las etapas y devuelve {nombre: resultado}. Si una etapa falla,
+        no se lanzan más etapas, se espera a las que ya corrían y se relanza el error.
+        """
+        resultados = {}
+        pendientes = dict(self.etapas)
+        en_curso = {}
+        peso_total = sum(e.peso for e in self.etapas.values())
+        peso_completado = 0
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="Arranque") as pool:
+            while pendientes or en_curso:
+                # 1. Lanzamos todas las etapas cuyas dependencias ya terminaron.
+                listas = [e for e in pendientes.values() if all(d in resultados for d in e.depende_de)]
+                for etapa in listas:
+                    del pendientes[etapa.nombre]
+                    self._reportar(etapa.mensaje, peso_completado, peso_total)
+                    # Copia para que cada etapa vea un diccionario estable.
+                    en_curso[pool.submit(self._ejecutar, etapa, dict(resultados))] = etapa
+
+                if not en_curso:
+                    raise RuntimeError(f"Dependencias imposibles de resolver en el arranque: {list(pendientes)}")
+
+                # 2. Esperamos a que termine al menos una.
+                terminadas, _ = wait(en_curso, return_when=FIRST_COMPLETED)
+                for futuro in terminadas:
+                    etapa = en_curso.pop(futuro)
+                    error = futuro.exception()
+                    if error is not None:
+                        pendientes.clear()
+                        wait(en_curso)
+                        raise error
+                    resultados[etapa.nombre] = futuro.result()
+                    peso_completado += etapa.peso
+
+        self._reportar("Etapas de arranque completadas.", peso_total, peso_total)
+        return resultados
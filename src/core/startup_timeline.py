@@ -0,0 +1,125 @@
+# src/core/startup_timeline.py
+"""
+Línea de tiempo del arranque de Modula.
+
+Cada fase del arranque se mide con 'span(nombre)' (seguro entre hilos, ya que las
+etapas del StartupPipeline corren en paralelo). Al terminar el arranque el perfil
+se guarda en CONFIG_DIR/boot_profiles/ para poder comparar terminales lentas y
+versiones (ver tools/compare_boot_profiles.py).
+
+Los tiempos son relativos a la primera importación de este módulo, que app_main
+hace antes que cualquier otra cosa.
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+
+_ORIGEN = time.perf_counter()
+_spans = []
+_lock = threading.Lock()
+_perfil_guardado = False
+
+# Cuántos perfiles de arranque se conservan en disco.
+MAX_BOOT_PROFILES = 30
+
+def _ms_desde_origen(instante: float) -> float:
+    return round((instante - _ORIGEN) * 1000, 1)
+
+@contextmanager
+def span(nombre: str):
+    """Mide el bloque 'with' y lo registra en la línea de tiempo del arranque."""
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        fin = time.perf_counter()
+        registro = {
+            "nombre": nombre,
+            "inicio_ms": _ms_desde_origen(inicio),
+            "duracion_ms": round((fin - inicio) * 1000, 1),
+            "hilo": threading.current_thread().name,
+        }
+        with _lock:
+            _spans.append(registro)
+
+def cronometrado(nombre: str):
+    """Decorador equivalente a envolver la función completa en span(nombre)."""
+    def decorador(funcion):
+        @wraps(funcion)
+        def envoltura(*args, **kwargs):
+            with span(nombre):
+                return funcion(*args, **kwargs)
+        return envoltura
+    return decorador
+
+def marcar(nombre: str):
+    """Registra un instante (duración cero), p. ej. cuando el login queda visible."""
+    with _lock:
+        _spans.append({
+            "nombre": nombre,
+            "inicio_ms": _ms_desde_origen(time.perf_counter()),
+            "duracion_ms": 0.0,
+            "hilo": threading.current_thread().name,
+        })
+
+def get_spans() -> list:
+    """Devuelve una copia de los spans registrados, ordenados por inicio."""
+    with _lock:
+        return sorted(_spans, key=lambda s: s["inicio_ms"])
+
+def formatear_resumen(spans: list = None) -> str:
+    """Texto con una línea por span: inicio, duración y nombre."""
+    spans = get_spans() if spans is None else spans
+    return "\n".join(
+        f"{s['inicio_ms']:8.1f} ms  +{s['duracion_ms']:7.1f} ms  {s['nombre']}" for s in spans
+    )
+
+def _leer_version_app() -> str | None:
+    from src.core.utils import resource_path
+    try:
+        with open(resource_path("version.txt"), "r") as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+def guardar_perfil_arranque(resultado: str) -> str | None:
+    """
+    Escribe el perfil de este arranque en boot_profiles/ (una sola vez por proceso)
+    y elimina los más antiguos para conservar como máximo MAX_BOOT_PROFILES.
+    Devuelve la ruta del archivo, o None si ya se había guardado o falló.
+    """
+    global _perfil_guardado
+    with _lock:
+        if _perfil_guardado:
+            return None
+        _perfil_guardado = True
+
+    from src.core.local_storage import CONFIG_DIR
+    directorio = CONFIG_DIR / "boot_profiles"
+    spans = get_spans()
+    perfil = {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "version": _leer_version_app(),
+        "resultado": resultado,
+        "total_ms": max((s["inicio_ms"] + s["duracion_ms"] for s in spans), default=0.0),
+        "spans": spans,
+    }
+    try:
+        directorio.mkdir(parents=True, exist_ok=True)
+        ruta = directorio / f"boot_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{os.getpid()}.json"
+        with open(ruta, "w", encoding="utf-8") as f:
+            json.dump(perfil, f, indent=2, ensure_ascii=False)
+
+        perfiles = sorted(directorio.glob("boot_*.json"), key=lambda p: p.stat().st_mtime)
+        for antiguo in perfiles[:-MAX_BOOT_PROFILES]:
+            antiguo.unlink(missing_ok=True)
+
+        print(f"⏱️  Perfil de arranque guardado en {ruta} ({perfil['total_ms']:.0f} ms).")
+        return str(ruta)
+    except OSError as e:
+        print(f"❌ No se pudo guardar el perfil de arranque: {e}")
+        return None
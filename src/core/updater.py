@@ -0,0 +1,578 @@
+# src/core/updater.py
+"""
+Actualizaciones de la instalación de Modula.
+
+Cada versión vive en su propia carpeta, una al lado de la otra:
+
+    <instalación>/versions/1.4.1/
+    <instalación>/versions/1.4.2/
+    <instalación>/current.json      -> {"version": "1.4.2", "previous": ["1.4.1"], "skipped": []}
+
+'current.json' es el puntero a la versión activa y se reescribe de forma atómica
+(archivo temporal + os.replace). Activar una versión o volver a la anterior es
+cambiar ese puntero: tiempo constante, sin mover árboles de archivos. Las
+versiones que salen de la retención se borran después, en segundo plano. El
+launcher de la raíz solo actualiza y mueve el puntero; la app se ejecuta desde
+versions/<versión activa>/Modula.exe. Las versiones de las que se hizo rollback
+quedan en 'skipped' para que ni el launcher ni la app las vuelvan a instalar.
+
+Para construir una versión nueva, el servidor publica un manifiesto con el hash
+SHA-256 y el tamaño de cada archivo (ver tools/build_update_manifest.py):
+
+    {"version": "1.4.2", "files": {"Modula.exe": {"sha256": "...", "size": 123}, ...}}
+
+Los archivos sin cambios se enlazan (o copian) desde la versión activa y solo se
+descargan los que cambiaron. Si el servidor no publica manifiesto, se usa el
+paquete completo.
+
+La descarga y la activación están separadas: una versión se "prepara" (staging)
+y queda marcada en 'staged.json'; activarla es solo mover el puntero. La app
+prepara versiones en segundo plano (src/core/background_updater.py) y el
+launcher las activa al arrancar.
+"""
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+VERSIONS_DIR = "versions"
+POINTER_FILE = "current.json"
+STAGED_INFO = "staged.json"
+PARTIAL_SUFFIX = ".partial"
+# Versiones que se conservan en disco (la activa incluida) para poder volver atrás.
+KEEP_VERSIONS = 3
+
+# Archivos de control que el actualizador guarda dentro de cada carpeta de versión.
+FILE_HASH_CACHE = ".modula_files.json"       # hashes locales, validados por tamaño y mtime
+INSTALLED_MANIFEST = ".modula_manifest.json"  # manifiesto de la versión
+CONTROL_NAMES = {FILE_HASH_CACHE, INSTALLED_MANIFEST, VERSIONS_DIR, POINTER_FILE, STAGED_INFO}
+
+HASH_BLOCK_SIZE = 1024 * 1024
+# Intervalo mínimo entre reportes de progreso: reportar cada bloque satura la UI.
+PROGRESS_INTERVAL = 0.1
+EXTRACT_WORKERS = min(8, (os.cpu_count() or 2))
+
+APP_DIR_NAME = 'Modula POS'
+VERSION_FILE = 'version.txt'
+
+def get_install_path():
+    """Busca la ruta de instalación de Modula en el registro de Windows."""
+    try:
+        import winreg # Biblioteca para interactuar con el registro de Windows
+        reg_key_path = fr"SOFTWARE\Microsoft\Windows\CurrentVersion\Uninstall\{APP_DIR_NAME}"
+        with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, reg_key_path) as key:
+            install_path = winreg.QueryValueEx(key, "InstallLocation")[0]
+            return os.path.normpath(install_path)
+    except Exception:
+        return None
+
+def _leer_json(ruta: Path) -> dict:
+    try:
+        with open(ruta, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+def _escribir_json(ruta: Path, datos: dict):
+    """Escritura atómica: nunca queda un JSON a medias si se corta la luz."""
+    tmp_path = ruta.with_name(ruta.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(datos, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, ruta)
+
+# --- VERSIONES Y PUNTERO ---
+
+def read_pointer(install_path) -> dict:
+    """Contenido de current.json ({} en una instalación antigua sin versiones)."""
+    return _leer_json(Path(install_path) / POINTER_FILE)
+
+def version_dir(install_path, version: str) -> Path:
+    return Path(install_path) / VERSIONS_DIR / version
+
+def active_version_dir(install_path) -> Path:
+    """
+    Carpeta de la versión activa. En una instalación antigua (archivos sueltos en
+    la raíz, sin puntero) es la propia carpeta de instalación.
+    """
+    version = read_pointer(install_path).get("version")
+    if version and version_dir(install_path, version).is_dir():
+        return version_dir(install_path, version)
+    return Path(install_path)
+
+def get_current_version(install_path):
+    """Lee la versión del archivo version.txt de la versión activa."""
+    try:
+        with open(active_version_dir(install_path) / VERSION_FILE, 'r') as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        return "0.0.0"
+
+def switch_version(install_path, version: str, omitir: str = None):
+    """
+    Activa 'version' reescribiendo el puntero de forma atómica. 'omitir' agrega
+    una versión a 'skipped' en la misma escritura (lo usa rollback_version).
+    """
+    if not version_dir(install_path, version).is_dir():
+        raise FileNotFoundError(f"La versión {version} no está instalada.")
+    puntero = read_pointer(install_path)
+    anteriores = [puntero["version"]] if puntero.get("version") else []
+    anteriores += puntero.get("previous", [])
+    anteriores = [v for v in dict.fromkeys(anteriores) if v != version]
+    omitidas = puntero.get("skipped", []) + ([omitir] if omitir else [])
+    omitidas = [v for v in dict.fromkeys(omitidas) if v != version]
+    _escribir_json(Path(install_path) / POINTER_FILE, {"version": version, "previous": anteriores[:KEEP_VERSIONS - 1],
+                                                        "skipped": omitidas})
+    print(f"🔀 Versión activa: {version}")
+
+def rollback_version(install_path) -> str | None:
+    """
+    Vuelve a la versión anterior que siga en disco y marca la que estaba activa
+    como omitida (ver is_version_skipped). Devuelve la versión activada o None.
+    """
+    puntero = read_pointer(install_path)
+    for anterior in puntero.get("previous", []):
+        if version_dir(install_path, anterior).is_dir():
+            switch_version(install_path, anterior, omitir=puntero.get("version"))
+            return anterior
+    print("⚠️  No hay una versión anterior a la cual volver.")
+    return None
+
+def is_version_skipped(install_path, version: str) -> bool:
+    """True si se hizo rollback desde 'version': no se vuelve a preparar ni activar sola."""
+    return version in read_pointer(install_path).get("skipped", [])
+
+def cleanup_old_versions(install_path):
+    """Borra las carpetas de versión fuera de la retención y las preparaciones a medias."""
+    puntero = read_pointer(install_path)
+    conservar = {puntero.get("version"), *puntero.get("previous", [])}
+    staged = _leer_json(Path(install_path) / STAGED_INFO).get("version")
+    conservar.add(staged)
+    carpeta_versiones = Path(install_path) / VERSIONS_DIR
+    if not carpeta_versiones.is_dir():
+        return
+    for carpeta in carpeta_versiones.iterdir():
+        if carpeta.is_dir() and carpeta.name not in conservar:
+            print(f"🗑️ Eliminando versión antigua {carpeta.name}...")
+            shutil.rmtree(carpeta, ignore_errors=True)
+
+def cleanup_old_versions_async(install_path) -> threading.Thread:
+    """Igual que cleanup_old_versions, pero en un hilo para no retrasar el arranque."""
+    hilo = threading.Thread(target=cleanup_old_versions, args=(install_path,), name="VersionCleanup", daemon=True)
+    hilo.start()
+    return hilo
+
+# --- HASHES Y MANIFIESTOS ---
+
+def hash_file(path) -> str:
+    """SHA-256 de un archivo, leído en bloques de 1 MB."""
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as f:
+        for bloque in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            sha256.update(bloque)
+    return sha256.hexdigest()
+
+def _iter_files(root: Path):
+    """Rutas relativas (con '/') de todos los archivos de 'root', sin los de control."""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d not in CONTROL_NAMES]
+        for nombre in filenames:
+            if nombre in CONTROL_NAMES:
+                continue
+            yield (Path(dirpath) / nombre).relative_to(root).as_posix()
+
+def build_file_manifest(root, version: str = None) -> dict:
+    """Construye el manifiesto de archivos (hash y tamaño) de un directorio."""
+    root = Path(root)
+    archivos = {}
+    for relativa in sorted(_iter_files(root)):
+        ruta = root / relativa
+        archivos[relativa] = {"sha256": hash_file(ruta), "size": ruta.stat().st_size}
+    return {"version": version, "files": archivos}
+
+def scan_install(version_path) -> dict:
+    """
+    Devuelve {ruta_relativa: sha256} de una carpeta de versión. Los hashes se
+    guardan en FILE_HASH_CACHE y solo se recalculan para archivos cuyo tamaño o
+    fecha de modificación cambió, así que revisar una versión sin cambios no
+    vuelve a leer cientos de MB.
+    """
+    root = Path(version_path)
+    cache = _leer_json(root / FILE_HASH_CACHE)
+    nuevo_cache = {}
+    for relativa in _iter_files(root):
+        stat = (root / relativa).stat()
+        previo = cache.get(relativa)
+        if previo and previo["size"] == stat.st_size and previo["mtime_ns"] == stat.st_mtime_ns:
+            sha256 = previo["sha256"]
+        else:
+            sha256 = hash_file(root / relativa)
+        nuevo_cache[relativa] = {"sha256": sha256, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    _guardar_cache_hashes(root, nuevo_cache)
+    return {relativa: datos["sha256"] for relativa, datos in nuevo_cache.items()}
+
+def _guardar_cache_hashes(root: Path, cache: dict):
+    try:
+        _escribir_json(root / FILE_HASH_CACHE, cache)
+    except OSError as e:
+        print(f"⚠️  No se pudo guardar la caché de hashes: {e}")
+
+class UpdateCancelled(Exception):
+    """La lanza on_chunk para interrumpir una descarga en curso (p. ej. el usuario la omitió)."""
+
+class UpdatePlan:
+    """Qué archivos descargar y cuáles reutilizar de la versión activa para llegar a un manifiesto."""
+    def __init__(self, descargar: list, conservar: list, bytes_descarga: int):
+        self.descargar = descargar
+        self.conservar = conservar
+        self.bytes_descarga = bytes_descarga
+
+def plan_update(version_path, manifest: dict) -> UpdatePlan:
+    """Compara una carpeta de versión con el manifiesto de la versión destino."""
+    locales = scan_install(version_path)
+    destino = manifest["files"]
+    descargar = [r for r, info in destino.items() if locales.get(r) != info["sha256"]]
+    conservar = [r for r in destino if r not in descargar]
+    bytes_descarga = sum(destino[r]["size"] for r in descargar)
+    return UpdatePlan(descargar, conservar, bytes_descarga)
+
+# --- DESCARGAS ---
+
+class TransferProgress:
+    """
+    Acumula los bytes transferidos y llama a callback(bytes, total, bytes_por_segundo)
+    como máximo una vez cada 'intervalo' segundos (y siempre al terminar).
+    """
+    def __init__(self, total: int, callback=None, intervalo: float = PROGRESS_INTERVAL):
+        self.total = total
+        self.callback = callback
+        self.intervalo = intervalo
+        self.transferidos = 0
+        self._inicio = time.monotonic()
+        self._ultimo_reporte = 0.0
+
+    @property
+    def bytes_por_segundo(self) -> float:
+        transcurrido = time.monotonic() - self._inicio
+        return self.transferidos / transcurrido if transcurrido > 0 else 0.0
+
+    def __call__(self, n_bytes: int):
+        self.transferidos += n_bytes
+        ahora = time.monotonic()
+        if self.callback and ahora - self._ultimo_reporte >= self.intervalo:
+            self._ultimo_reporte = ahora
+            self.callback(self.transferidos, self.total, self.bytes_por_segundo)
+
+    def finish(self):
+        if self.callback:
+            self.callback(self.transferidos, self.total, self.bytes_por_segundo)
+        print(f"📶 {self.transferidos / 1_048_576:.1f} MB en {time.monotonic() - self._inicio:.1f} s "
+              f"({self.bytes_por_segundo / 1_048_576:.1f} MB/s).")
+
+def check_for_update(current_version: str) -> dict | None:
+    """
+    Pregunta al servidor si hay una versión más nueva. Devuelve la información de
+    la actualización (version, url, hash, manifest_url...) o None si no hay.
+    Lanza requests.exceptions.RequestException si falla la red.
+    """
+    import requests
+    from src.config.settings import get_update_check_url
+    response = requests.get(f"{get_update_check_url()}?version={current_version}", timeout=10)
+    response.raise_for_status()
+    if response.status_code == 204:
+        return None
+    return response.json()
+
+def download_file(url: str, destino, expected_sha256: str, on_chunk=None, on_start=None) -> bool:
+    """
+    Descarga 'url' a 'destino' calculando el SHA-256 mientras llega (una sola
+    pasada, sin volver a leer el archivo) y lo compara con el esperado.
+    on_start(total_bytes) se llama al recibir la respuesta con su Content-Length
+    (0 si el servidor no lo informa) y on_chunk(n_bytes) por cada bloque de 1 MB.
+    Si el hash no coincide,
+    el archivo se borra. Si on_chunk lanza UpdateCancelled, el archivo a medias
+    también se borra y la excepción se propaga.
+    """
+    import requests
+
+    destino = Path(destino)
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    sha256 = hashlib.sha256()
+    try:
+        with requests.get(url, stream=True, timeout=30) as response:
+            response.raise_for_status()
+            if on_start:
+                on_start(int(response.headers.get("content-length", 0) or 0))
+            with open(destino, "wb") as f:
+                for chunk in response.iter_content(chunk_size=HASH_BLOCK_SIZE):
+                    sha256.update(chunk)
+                    f.write(chunk)
+                    if on_chunk:
+                        on_chunk(len(chunk))
+    except UpdateCancelled:
+        destino.unlink(missing_ok=True)
+        raise
+    except (requests.exceptions.RequestException, OSError) as e:
+        print(f"❌ Error al descargar {url}: {e}")
+        return False
+    if sha256.hexdigest().lower() != expected_sha256.lower():
+        print(f"❌ Hash incorrecto para {destino.name}.")
+        destino.unlink(missing_ok=True)
+        return False
+    return True
+
+def _ruta_segura(destino: Path, nombre: str) -> Path | None:
+    """Ruta de extracción de un miembro del zip, o None si intenta salir de 'destino'."""
+    partes = [p for p in nombre.replace("\\", "/").split("/") if p not in ("", ".")]
+    if not partes or ".." in partes or ":" in partes[0]:
+        return None
+    return destino.joinpath(*partes)
+
+def extract_zip_parallel(zip_path, destino, max_workers: int = EXTRACT_WORKERS, on_member=None):
+    """
+    Extrae un zip usando varios hilos. Cada hilo abre su propio ZipFile para no
+    competir por un único descriptor, y zlib libera el GIL al descomprimir, así
+    que los miembros grandes se descomprimen realmente en paralelo.
+
+    Las carpetas se crean antes, en un solo hilo: ZipFile.extract crea las
+    carpetas padre sin exist_ok y los hilos chocaban (FileExistsError). Los
+    hilos solo escriben archivos. Se rechazan miembros con '..' o rutas absolutas.
+    on_member() se llama antes de cada archivo; puede lanzar UpdateCancelled
+    para detener la extracción.
+    """
+    destino = Path(destino)
+    with zipfile.ZipFile(zip_path, "r") as zip_ref:
+        miembros = []
+        carpetas = {destino}
+        for miembro in zip_ref.infolist():
+            ruta = _ruta_segura(destino, miembro.filename)
+            if ruta is None:
+                raise OSError(f"Ruta no permitida en el paquete: {miembro.filename}")
+            if miembro.is_dir():
+                carpetas.add(ruta)
+            else:
+                carpetas.add(ruta.parent)
+                miembros.append((miembro, ruta))
+    for carpeta in sorted(carpetas):
+        carpeta.mkdir(parents=True, exist_ok=True)
+    # Los más grandes primero, para que no quede uno enorme al final en un solo hilo.
+    miembros.sort(key=lambda m: m[0].file_size, reverse=True)
+
+    locales = threading.local()
+    abiertos = []
+    lock = threading.Lock()
+
+    def extraer(item):
+        if on_member:
+            on_member()
+        miembro, ruta = item
+        zip_hilo = getattr(locales, "zip", None)
+        if zip_hilo is None:
+            zip_hilo = locales.zip = zipfile.ZipFile(zip_path, "r")
+            with lock:
+                abiertos.append(zip_hilo)
+        with zip_hilo.open(miembro) as origen, open(ruta, "wb") as salida:
+            shutil.copyfileobj(origen, salida, HASH_BLOCK_SIZE)
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="Extraccion") as pool:
+            # list() propaga la primera excepción de cualquier hilo.
+            list(pool.map(extraer, miembros))
+    finally:
+        for zip_hilo in abiertos:
+            zip_hilo.close()
+
+def fetch_update_manifest(manifest_url: str) -> dict | None:
+    """Descarga el manifiesto de archivos de una versión. None si no está disponible."""
+    import requests
+    try:
+        response = requests.get(manifest_url, timeout=15)
+        response.raise_for_status()
+        manifest = response.json()
+        return manifest if isinstance(manifest.get("files"), dict) else None
+    except (requests.exceptions.RequestException, ValueError) as e:
+        print(f"⚠️  No se pudo obtener el manifiesto de archivos: {e}")
+        return None
+
+# --- PREPARACIÓN (STAGING) Y ACTIVACIÓN ---
+
+# Una versión es un solo nombre de carpeta dentro de versions/ (p. ej. "1.4.2").
+_VERSION_SEGURA = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._+-]*$")
+
+def _version_segura(version) -> bool:
+    return isinstance(version, str) and bool(_VERSION_SEGURA.match(version)) and ".." not in version
+
+def _manifiesto_seguro(manifest: dict) -> bool:
+    """
+    True si la versión y todas las rutas del manifiesto quedan dentro de la
+    carpeta de versión. Se revisa completo antes de enlazar o descargar nada:
+    una entrada como '../../Modula_Launcher.exe' rechaza todo el manifiesto.
+    """
+    if not _version_segura(manifest.get("version")):
+        print(f"❌ Versión no permitida en el manifiesto: {manifest.get('version')!r}")
+        return False
+    base = Path(VERSIONS_DIR)
+    for relativa, info in manifest.get("files", {}).items():
+        if _ruta_segura(base, relativa) is None or not isinstance(info, dict):
+            print(f"❌ Ruta no permitida en el manifiesto: {relativa!r}")
+            return False
+    return True
+
+def _carpeta_parcial(install_path, version: str) -> Path:
+    if not _version_segura(version):
+        raise OSError(f"Versión no permitida: {version!r}")
+    parcial = Path(install_path) / VERSIONS_DIR / f"{version}{PARTIAL_SUFFIX}"
+    shutil.rmtree(parcial, ignore_errors=True)
+    parcial.mkdir(parents=True)
+    return parcial
+
+def _enlazar_o_copiar(origen: Path, destino: Path):
+    """Reutiliza un archivo sin cambios: enlace duro si el sistema lo permite, copia si no."""
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        os.link(origen, destino)
+    except OSError:
+        shutil.copy2(origen, destino)
+
+def _publicar_version(install_path, version: str, parcial: Path, manifest: dict | None):
+    """Renombra la carpeta parcial a versions/<version> y la marca como preparada."""
+    if manifest:
+        _escribir_json(parcial / INSTALLED_MANIFEST, manifest)
+    final = version_dir(install_path, version)
+    puntero = read_pointer(install_path)
+    if final.exists():
+        if puntero.get("version") == version:
+            raise OSError(f"La versión {version} ya está activa.")
+        if version in puntero.get("previous", []):
+            # Es una versión anterior completa que se conserva para rollback: no se borra.
+            shutil.rmtree(parcial, ignore_errors=True)
+        else:
+            shutil.rmtree(final)
+    if parcial.exists():
+        os.replace(parcial, final)
+    _escribir_json(Path(install_path) / STAGED_INFO, {"version": version})
+
+def get_staged_update(install_path) -> dict | None:
+    """Devuelve {'version': ...} de la versión preparada y aún no activada, o None."""
+    info = _leer_json(Path(install_path) / STAGED_INFO)
+    if info.get("version") and version_dir(install_path, info["version"]).is_dir():
+        return info
+    return None
+
+def discard_staged_update(install_path):
+    (Path(install_path) / STAGED_INFO).unlink(missing_ok=True)
+
+def stage_differential_update(install_path, manifest: dict, files_base_url: str,
+                              progress_callback=None, on_chunk=None) -> bool:
+    """
+    Construye versions/<versión> sin tocar la versión activa: enlaza los archivos
+    que no cambiaron y descarga y verifica solo los que sí. Al terminar la marca
+    como preparada en STAGED_INFO para activarla con apply_staged_update.
+
+    progress_callback(bytes_descargados, bytes_totales, bytes_por_segundo) reporta
+    el avance (ver TransferProgress) y on_chunk(n_bytes) permite, p. ej., limitar
+    el ancho de banda o cancelar lanzando UpdateCancelled.
+    """
+    version = manifest.get("version")
+    if not version:
+        print("❌ El manifiesto no indica su versión.")
+        return False
+    if not _manifiesto_seguro(manifest):
+        return False
+    activa = active_version_dir(install_path)
+    plan = plan_update(activa, manifest)
+    print(f"📦 Actualización diferencial a {version}: {len(plan.descargar)} archivos a descargar "
+          f"({plan.bytes_descarga / 1_048_576:.1f} MB), {len(plan.conservar)} reutilizados.")
+
+    parcial = _carpeta_parcial(install_path, version)
+    try:
+        # Las rutas ya se validaron (_manifiesto_seguro); _ruta_segura las normaliza.
+        for relativa in plan.conservar:
+            _enlazar_o_copiar(_ruta_segura(activa, relativa), _ruta_segura(parcial, relativa))
+
+        progreso = TransferProgress(plan.bytes_descarga, progress_callback)
+        def _on_chunk(n):
+            if on_chunk:
+                on_chunk(n)
+            progreso(n)
+
+        base_url = files_base_url.rstrip("/")
+        for relativa in plan.descargar:
+            if not download_file(f"{base_url}/{relativa}", _ruta_segura(parcial, relativa),
+                                 manifest["files"][relativa]["sha256"], _on_chunk):
+                shutil.rmtree(parcial, ignore_errors=True)
+                return False
+        progreso.finish()
+
+        # Ya conocemos el hash de cada archivo: dejamos lista la caché de la nueva versión.
+        _guardar_cache_hashes(parcial, {
+            relativa: {"sha256": info["sha256"], "size": ruta.stat().st_size, "mtime_ns": ruta.stat().st_mtime_ns}
+            for relativa, info in manifest["files"].items()
+            for ruta in [_ruta_segura(parcial, relativa)]
+        })
+        _publicar_version(install_path, version, parcial, manifest)
+        return True
+    except UpdateCancelled:
+        shutil.rmtree(parcial, ignore_errors=True)
+        raise
+    except OSError as e:
+        print(f"❌ No se pudo preparar la versión {version}: {e}")
+        shutil.rmtree(parcial, ignore_errors=True)
+        return False
+
+def stage_full_package(install_path, version: str, zip_path, on_member=None) -> bool:
+    """
+    Prepara versions/<versión> a partir del paquete completo (ya descargado y
+    verificado), para servidores que no publican manifiesto de archivos.
+    on_member() se llama antes de extraer cada archivo; si lanza UpdateCancelled,
+    la carpeta a medias se borra y la excepción se propaga.
+    """
+    parcial = None
+    try:
+        parcial = _carpeta_parcial(install_path, version)
+        inicio = time.monotonic()
+        extract_zip_parallel(zip_path, parcial, on_member=on_member)
+        print(f"📂 Paquete extraído en {time.monotonic() - inicio:.1f} s.")
+        _publicar_version(install_path, version, parcial, None)
+        return True
+    except UpdateCancelled:
+        if parcial is not None:
+            shutil.rmtree(parcial, ignore_errors=True)
+        raise
+    except (OSError, zipfile.BadZipFile) as e:
+        print(f"❌ No se pudo preparar el paquete completo: {e}")
+        if parcial is not None:
+            shutil.rmtree(parcial, ignore_errors=True)
+        return False
+
+def apply_staged_update(install_path) -> str | None:
+    """
+    Activa la versión preparada cambiando el puntero (tiempo constante) y borra
+    en segundo plano las versiones que salen de la retención.
+    Devuelve la versión activada, o None si no había nada que activar o falló.
+    """
+    info = get_staged_update(install_path)
+    if not info:
+        return None
+    try:
+        switch_version(install_path, info["version"])
+    except OSError as e:
+        print(f"❌ No se pudo activar la versión {info['version']}: {e}")
+        return None
+    discard_staged_update(install_path)
+    cleanup_old_versions_async(install_path)
+    print(f"✅ Versión {info['version']} aplicada.")
+    return info["version"]
+
+def apply_differential_update(install_path, manifest: dict, files_base_url: str, progress_callback=None) -> bool:
+    """Descarga solo lo que cambió y activa la versión de inmediato (actualización en primer plano)."""
+    if not stage_differential_update(install_path, manifest, files_base_url, progress_callback):
+        return False
+    return apply_staged_update(install_path) is not None
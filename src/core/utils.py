@@ -2,7 +2,16 @@
 import sys
 import subprocess
 import os
-from getmac import get_mac_address
+import time
+import threading
+import uuid
+from functools import lru_cache
+
+# Tiempo (en segundos) durante el cual los identificadores de red se consideran vigentes.
+NETWORK_CACHE_TTL = 300
+
+_network_cache = {"identifiers": None, "timestamp": 0.0}
+_network_lock = threading.Lock()
 
 def resource_path(relative_path):
     """ Obtiene la ruta absoluta al recurso, funciona para desarrollo y para PyInstaller """
@@ -15,8 +24,10 @@ def resource_path(relative_path):
 
     return os.path.join(base_path, relative_path)
 
-def get_network_identifiers():
-    """Obtiene identificadores de la red local (MAC del Gateway y SSID de WiFi)."""
+def _leer_identificadores_de_red():
+    """Consulta al sistema la MAC del gateway y el SSID de WiFi (lento: lanza subprocesos)."""
+    from getmac import get_mac_address
+
     identifiers = {"gateway_mac": None, "ssid": None}
     try:
         # Obtener MAC del Gateway (router) es muy fiable para redes cableadas y WiFi
@@ -35,4 +46,36 @@ def get_network_identifiers():
     except Exception as e:
         print(f"No se pudo obtener el SSID: {e}")
 
-    return identifiers
\ No newline at end of file
+    return identifiers
+
+def get_network_identifiers(max_age: float = NETWORK_CACHE_TTL):
+    """
+    Obtiene identificadores de la red local (MAC del Gateway y SSID de WiFi).
+
+    El resultado se guarda en caché durante 'max_age' segundos. Si otro hilo ya
+    está consultando la red, se espera a su resultado en lugar de lanzar los
+    subprocesos una segunda vez. Con max_age=0 se fuerza una lectura nueva.
+    """
+    with _network_lock:
+        cached = _network_cache["identifiers"]
+        if cached is not None and time.monotonic() - _network_cache["timestamp"] < max_age:
+            return dict(cached)
+
+        identifiers = _leer_identificadores_de_red()
+        _network_cache["identifiers"] = identifiers
+        _network_cache["timestamp"] = time.monotonic()
+        return dict(identifiers)
+
+@lru_cache(maxsize=1)
+def get_hardware_mac() -> str:
+    """
+    Devuelve la primera MAC física de la máquina. No cambia durante la vida
+    del proceso, así que se calcula una sola vez.
+    """
+    import psutil
+
+    for _, interfaces in psutil.net_if_addrs().items():
+        for interface in interfaces:
+            if interface.family == psutil.AF_LINK and interface.address and "00:00:00:00:00:00" not in interface.address:
+                return interface.address
+    return str(uuid.getnode())
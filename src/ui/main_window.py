@@ -2,16 +2,17 @@
 
 from PySide6.QtWidgets import QMainWindow, QStackedWidget, QApplication, QLabel
 from PySide6.QtGui import QScreen, QIcon
-from PySide6.QtCore import Qt
-from src.ui.views.auth_view import AuthView
-from src.ui.views.dashboard_view import DashboardView
+from PySide6.QtCore import Qt, Signal
 from src.ui.views.loading_view import LoadingView
-from src.ui.views.login_view import LoginView
+from src.core.startup_timeline import span
 
 class MainWindow(QMainWindow):
+    # Se emite la primera vez que se construye una vista perezosa: (nombre, vista)
+    vista_creada = Signal(str, object)
+
     def __init__(self, app_controller):
         super().__init__()
-        self.dashboard_view = DashboardView(app_controller)
+        self.app_controller = app_controller
         self.setWindowTitle("Modula POS")
         self.setObjectName("MainWindow")
         icon = QIcon(":/images/logo_modula.ico")
@@ -23,18 +24,48 @@ class MainWindow(QMainWindow):
         self.stacked_widget = QStackedWidget()
         self.setCentralWidget(self.stacked_widget)
 
-        self.loading_view = LoadingView()
-        self.auth_view = AuthView()
-        self.dashboard_view = DashboardView(app_controller)
-        self.login_view = LoginView()
-
+        # Solo la vista de carga se construye antes del primer pintado. El resto
+        # se crea (e importa) la primera vez que se necesita; ver _obtener_vista.
+        with span("vista.loading"):
+            self.loading_view = LoadingView()
         self.stacked_widget.addWidget(self.loading_view)
-        self.stacked_widget.addWidget(self.auth_view)
-        self.stacked_widget.addWidget(self.dashboard_view)
-        self.stacked_widget.addWidget(self.login_view)
+        self._vistas = {}
         
         self.center()
 
+    def _obtener_vista(self, nombre: str):
+        """Devuelve la vista pedida, construyéndola e importándola en el primer uso."""
+        vista = self._vistas.get(nombre)
+        if vista is None:
+            with span(f"vista.{nombre}"):
+                if nombre == "auth":
+                    from src.ui.views.auth_view import AuthView
+                    vista = AuthView()
+                elif nombre == "dashboard":
+                    from src.ui.views.dashboard_view import DashboardView
+                    vista = DashboardView(self.app_controller)
+                elif nombre == "login":
+                    from src.ui.views.login_view import LoginView
+                    vista = LoginView()
+                else:
+                    raise ValueError(f"Vista desconocida: {nombre}")
+            self._vistas[nombre] = vista
+            self.stacked_widget.addWidget(vista)
+            self.vista_creada.emit(nombre, vista)
+        return vista
+
+    @property
+    def auth_view(self):
+        return self._obtener_vista("auth")
+
+    @property
+    def dashboard_view(self):
+        return self._obtener_vista("dashboard")
+
+    @property
+    def login_view(self):
+        return self._obtener_vista("login")
+
     def _create_menu_bar(self):
         self.main_menu_bar = self.menuBar()
         file_menu = self.main_menu_bar.addMenu("Archivo")
@@ -47,7 +78,22 @@ class MainWindow(QMainWindow):
     def _create_status_bar(self):
         self.main_status_bar = self.statusBar()
         user_info_label = QLabel("Juan Gonzalez | Administrador")
+        self.connection_status_label = QLabel()
+        self.connection_status_label.setObjectName("ConnectionStatusLabel")
+        self.main_status_bar.addPermanentWidget(self.connection_status_label)
         self.main_status_bar.addPermanentWidget(user_info_label)
+        self.set_estado_conexion("online")
+
+    def set_estado_conexion(self, estado: str):
+        """Refleja en la barra de estado el estado del ConnectivityMonitor."""
+        textos = {
+            "online": ("● En línea", "#16a34a"),
+            "degraded": ("● Conexión lenta", "#d97706"),
+            "offline": ("● Sin conexión", "#dc2626"),
+        }
+        texto, color = textos.get(estado, textos["offline"])
+        self.connection_status_label.setText(texto)
+        self.connection_status_label.setStyleSheet(f"color: {color};")
 
     def center(self):
         center_point = QScreen.availableGeometry(QApplication.primaryScreen()).center()
@@ -1,11 +1,11 @@
 # src/ui/views/auth_view.py
 from PySide6.QtCore import Signal, Qt, QDate
-from PySide6.QtGui import QPixmap, QColor, QCursor
+from PySide6.QtGui import QColor, QCursor
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, 
                                QPushButton, QFrame, QStackedWidget, QDateEdit, 
                                QCheckBox, QGraphicsDropShadowEffect, QFormLayout)
 from pathlib import Path
-from src.core.utils import resource_path
+from src.core.resources import load_pixmap
 import re
 
 # Se calcula la ruta raíz para poder encontrar los assets de forma fiable
@@ -16,7 +16,7 @@ class IconLineEdit(QFrame):
     Un widget de QFrame personalizado que contiene un ícono y un QLineEdit,
     estilizado para parecer un único campo de texto.
     """
-    def __init__(self, icon_path: str, placeholder_text: str = "", parent=None):
+    def __init__(self, icon_name: str, placeholder_text: str = "", parent=None):
         super().__init__(parent)
         self.setObjectName("IconLineEdit")
         
@@ -25,8 +25,7 @@ class IconLineEdit(QFrame):
         layout.setSpacing(10)
         
         icon_label = QLabel()
-        pixmap = QPixmap(icon_path)
-        icon_label.setPixmap(pixmap.scaled(20, 20, Qt.KeepAspectRatio, Qt.SmoothTransformation))
+        icon_label.setPixmap(load_pixmap(icon_name, 20))
         
         self.line_edit = QLineEdit()
         self.line_edit.setPlaceholderText(placeholder_text)
@@ -53,11 +52,8 @@ class LoginForm(QWidget):
         layout.setSpacing(15)
         layout.setContentsMargins(0, 0, 0, 0)
         
-        icon_email_path = resource_path("assets/images/icon_email.png")
-        icon_lock_path = resource_path("assets/images/icon_lock.png")
-        
-        self.email_input = IconLineEdit(icon_email_path, "tu@empresa.com")
-        self.password_input = IconLineEdit(icon_lock_path, "••••••••••")
+        self.email_input = IconLineEdit("icon_email", "tu@empresa.com")
+        self.password_input = IconLineEdit("icon_lock", "••••••••••")
         self.password_input.setEchoMode(QLineEdit.Password)
         
         # --- CORREGIDO: Layout vertical para las opciones ---
@@ -263,9 +259,6 @@ class AuthView(QWidget):
         main_layout.setContentsMargins(0, 0, 0, 0)
         main_layout.setSpacing(0)
         
-        logo_modula_path = resource_path("assets/images/logo_modula.png")
-        logo_addsy_path = resource_path("assets/images/logo_addsy_powered.png")
-
         # === Panel Izquierdo (Branding) ===
         left_panel = QFrame()
         left_panel.setObjectName("AuthLeftPanel")
@@ -274,7 +267,7 @@ class AuthView(QWidget):
         left_layout.setSpacing(20)
 
         logo_icon_label = QLabel()
-        logo_icon_label.setPixmap(QPixmap(logo_modula_path).scaled(96, 96, Qt.KeepAspectRatio, Qt.SmoothTransformation))
+        logo_icon_label.setPixmap(load_pixmap("logo_modula", 96))
         
         logo_text_label = QLabel("MODULA")
         logo_text_label.setObjectName("AuthBrandText")
@@ -22,7 +22,11 @@ class DashboardView(QWidget):
 
         splitter = QSplitter(Qt.Horizontal)
         self.nav_sidebar = NavigationSidebar()
-        self.workspace = WorkspaceView()
+        # Los widgets de módulos que se cierran vuelven a la reserva del ModuleManager,
+        # y las pestañas hibernadas se reconstruyen con él.
+        module_manager = self.app_controller.module_manager
+        self.workspace = WorkspaceView(liberar_widget=module_manager.release_module_widget,
+                                       cargar_widget=module_manager.load_module_widget)
         splitter.addWidget(self.nav_sidebar)
         splitter.addWidget(self.workspace)
 
@@ -46,17 +50,22 @@ class DashboardView(QWidget):
         Manejador para el clic sencillo. Carga el widget y se lo pasa
         a la función de reemplazo de pestaña del workspace.
         """
+        # Si ya está abierto solo cambiamos de pestaña, sin construir otro widget
+        if self.workspace.enfocar_modulo(manifest['nombre']):
+            return
         # Usamos el ModuleManager (a través del app_controller) para cargar el widget
         widget = self.app_controller.module_manager.load_module_widget(manifest)
         if widget:
-            self.workspace.reemplazar_pestaña_actual(manifest['nombre'], widget)
+            self.workspace.reemplazar_pestaña_actual(manifest['nombre'], widget, manifest)
 
     def _handle_double_click(self, manifest: dict):
         """
         Manejador para el doble clic. Carga el widget y se lo pasa
         a la función de abrir nueva pestaña del workspace.
         """
+        if self.workspace.enfocar_modulo(manifest['nombre']):
+            return
         # Usamos el ModuleManager para cargar el widget
         widget = self.app_controller.module_manager.load_module_widget(manifest)
         if widget:
-            self.workspace.abrir_nuevo_modulo(manifest['nombre'], widget)
\ No newline at end of file
+            self.workspace.abrir_nuevo_modulo(manifest['nombre'], widget, manifest)
\ No newline at end of file
@@ -1,21 +1,21 @@
 # src/ui/views/loading_view.py
+import os
 from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QProgressBar
-from PySide6.QtGui import QPixmap
+from PySide6.QtGui import QFontDatabase
 from PySide6.QtCore import Qt, QPropertyAnimation, QEasingCurve
-from src.core.utils import resource_path
+from src.core.resources import load_pixmap
+from src.core.startup_timeline import formatear_resumen
 
 class LoadingView(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setObjectName("LoadingView")
-        
-        logo_modula_path = resource_path("assets/images/logo_modula.png")
-        logo_addsy_path = resource_path("assets/images/logo_addsy_powered.png")   
+
 
         # Widgets de la Interfaz
+        # Las imágenes vienen pre-escaladas en resources.rcc (ver src/core/resources.py).
         self.logo_label = QLabel()
-        pixmap_modula = QPixmap(logo_modula_path)
-        self.logo_label.setPixmap(pixmap_modula.scaled(96, 96, Qt.KeepAspectRatio, Qt.SmoothTransformation))
+        self.logo_label.setPixmap(load_pixmap("logo_modula", 96))
         self.logo_label.setAlignment(Qt.AlignCenter)
         
         self.title_label = QLabel("<b>MODULA</b> POS")
@@ -49,13 +49,21 @@ class LoadingView(QWidget):
         footer_text_label = QLabel("Powered by:")
         footer_text_label.setObjectName("LoadingFooterText")
         self.footer_logo_label = QLabel()
-        pixmap_addsy = QPixmap(logo_addsy_path)
-        self.footer_logo_label.setPixmap(pixmap_addsy.scaledToHeight(80, Qt.SmoothTransformation))
+        self.footer_logo_label.setPixmap(load_pixmap("logo_addsy_powered", 80))
         footer_layout.addStretch()
         footer_layout.addWidget(footer_text_label)
         footer_layout.addWidget(self.footer_logo_label)
         footer_layout.addStretch()
 
+        # --- Overlay de desarrollo: desglose de la línea de tiempo del arranque ---
+        # Se activa con la variable de entorno MODULA_DEV_OVERLAY=1.
+        self.dev_overlay_enabled = os.getenv("MODULA_DEV_OVERLAY") == "1"
+        self.dev_overlay_label = QLabel()
+        self.dev_overlay_label.setObjectName("LoadingDevOverlay")
+        self.dev_overlay_label.setFont(QFontDatabase.systemFont(QFontDatabase.FixedFont))
+        self.dev_overlay_label.setTextInteractionFlags(Qt.TextSelectableByMouse)
+        self.dev_overlay_label.setVisible(self.dev_overlay_enabled)
+
         # Layout Vertical Principal
         layout = QVBoxLayout(self)
         layout.addStretch()
@@ -65,6 +73,7 @@ class LoadingView(QWidget):
         layout.addWidget(self.status_label)
         layout.addWidget(self.subtitle_label) # <-- AÑADIDO
         layout.addWidget(self.progress_bar)
+        layout.addWidget(self.dev_overlay_label)
         layout.addStretch()
         layout.addWidget(footer_container)
         layout.setContentsMargins(50, 20, 50, 20)
@@ -81,6 +90,12 @@ class LoadingView(QWidget):
         self.progress_animation.setStartValue(self.progress_bar.value())
         self.progress_animation.setEndValue(percentage)
         self.progress_animation.start()
+        self.refresh_dev_overlay()
+
+    def refresh_dev_overlay(self):
+        """Actualiza el desglose de tiempos del arranque (solo con MODULA_DEV_OVERLAY=1)."""
+        if self.dev_overlay_enabled:
+            self.dev_overlay_label.setText(formatear_resumen())
     
     # --- NUEVO: La función que faltaba ---
     def set_message(self, title: str, subtitle: str = "", indeterminate: bool = False):
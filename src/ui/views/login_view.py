@@ -2,8 +2,7 @@
 
 from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton
 from PySide6.QtCore import Qt, Signal
-from PySide6.QtGui import QPixmap
-from src.core.utils import resource_path # Asegúrate de que esta importación sea correcta
+from src.core.resources import load_pixmap
 
 class LoginView(QWidget):
     """
@@ -36,10 +35,8 @@ class LoginView(QWidget):
         # --- Widgets del Formulario ---
 
         # 1. Logo de Modula
-        logo_path = resource_path("assets/images/logo_modula.png")
-        logo_pixmap = QPixmap(logo_path)
         logo_label = QLabel()
-        logo_label.setPixmap(logo_pixmap.scaled(80, 80, Qt.KeepAspectRatio, Qt.SmoothTransformation))
+        logo_label.setPixmap(load_pixmap("logo_modula", 80))
         logo_label.setAlignment(Qt.AlignCenter)
 
         # 2. Títulos
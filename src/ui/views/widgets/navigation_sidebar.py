@@ -2,9 +2,7 @@
 
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QLineEdit, 
                                QTreeWidget, QTreeWidgetItem) # <-- CAMBIO: QTreeWidget
-from PySide6.QtGui import QIcon
 from PySide6.QtCore import Qt, QSize, Signal
-from pathlib import Path
 import collections # <-- NUEVO: Para agrupar fácilmente
 
 class NavigationSidebar(QWidget):
@@ -51,9 +49,11 @@ class NavigationSidebar(QWidget):
         if manifest:
             self.modulo_doble_click.emit(manifest)
         
-    def populate_modules(self, modules_list: list, modules_dir: Path):
+    def populate_modules(self, modules_list: list, icon_provider):
         """
         MODIFICADO: Llena el árbol, agrupando los módulos por categoría.
+        icon_provider(manifest) -> QIcon obtiene el ícono de cada módulo (puede
+        venir de su zip; ver ModuleManager.module_icon).
         """
         self.module_tree.clear()
         
@@ -76,9 +76,9 @@ class NavigationSidebar(QWidget):
                 # Guardamos el manifest completo en el item para usarlo después
                 module_item.setData(0, Qt.UserRole, manifest)
                 
-                icon_path = modules_dir / manifest['id'] / manifest['icono']
-                if icon_path.exists():
-                    module_item.setIcon(0, QIcon(str(icon_path)))
+                icon = icon_provider(manifest)
+                if not icon.isNull():
+                    module_item.setIcon(0, icon)
             
             # Expandimos todas las categorías por defecto
             category_item.setExpanded(True)
@@ -1,18 +1,54 @@
 # src/ui/views/widgets/workspace_view.py
 
-from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
+import time
+from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                                QTabBar, QPushButton, QStackedWidget)
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QTimer
+
+# Una pestaña en segundo plano más de este tiempo se hiberna (si su módulo lo permite).
+HIBERNAR_TRAS_S = 15 * 60
+REVISAR_HIBERNACION_MS = 60 * 1000
+
+class _Pestaña:
+    """Datos de una pestaña, guardados con QTabBar.setTabData (viajan con ella al moverla)."""
+    __slots__ = ("widget", "manifest", "estado", "inactiva_desde")
+
+    def __init__(self, widget, manifest=None):
+        self.widget = widget
+        self.manifest = manifest
+        self.estado = None          # estado guardado mientras la pestaña está hibernada
+        self.inactiva_desde = None  # time.monotonic() desde que dejó de ser la pestaña actual
+
+    @property
+    def hibernada(self) -> bool:
+        return self.estado is not None
 
 class WorkspaceView(QWidget):
     """
     Panel central con una implementación de pestañas personalizada para
     control total sobre la visibilidad y el comportamiento.
+
+    Gestiona el ciclo de vida de los módulos: llama a on_module_loaded al
+    mostrarlos, a on_module_closed al cerrarlos y, para mantener la memoria
+    estable en turnos largos, hiberna las pestañas que llevan tiempo en segundo
+    plano: guarda el estado del módulo (guardar_estado), destruye su widget y lo
+    reconstruye con restaurar_estado cuando la pestaña vuelve a enfocarse.
     """
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, liberar_widget=None, cargar_widget=None,
+                 hibernar_tras_s: int = HIBERNAR_TRAS_S):
+        """
+        liberar_widget(widget) -> bool, opcional: recibe el contenido de una pestaña
+        que se cierra; si devuelve True se queda con él (p. ej. para reutilizarlo)
+        y el workspace no lo destruye.
+        cargar_widget(manifest) -> QWidget, opcional: construye el widget de un
+        módulo; sin él no se hiberna ninguna pestaña.
+        """
         super().__init__(parent)
         self.setObjectName("WorkspaceView")
-        
+        self.liberar_widget = liberar_widget
+        self.cargar_widget = cargar_widget
+        self.hibernar_tras_s = hibernar_tras_s
+
         main_layout = QVBoxLayout(self)
         main_layout.setContentsMargins(20, 10, 20, 20)
         main_layout.setSpacing(0)
@@ -36,7 +72,7 @@ class WorkspaceView(QWidget):
         toolbar_layout.addWidget(self.add_tab_button)
 
         self.content_stack = QStackedWidget()
-        
+
         # El placeholder ahora es un miembro permanente del stack en el índice 0
         self.placeholder_widget = self._crear_placeholder()
         self.content_stack.addWidget(self.placeholder_widget)
@@ -49,6 +85,12 @@ class WorkspaceView(QWidget):
         self.tab_bar.currentChanged.connect(self._sincronizar_vista_con_pestaña) # Conexión a un manejador
         self.add_tab_button.clicked.connect(lambda: self.abrir_nuevo_modulo("Dashboard"))
 
+        self._pestaña_actual = None
+        self.hibernation_timer = QTimer(self)
+        self.hibernation_timer.setInterval(REVISAR_HIBERNACION_MS)
+        self.hibernation_timer.timeout.connect(self.hibernar_inactivas)
+        self.hibernation_timer.start()
+
         # Inicia con la pestaña Dashboard por defecto
         self.abrir_nuevo_modulo("Dashboard")
 
@@ -58,37 +100,64 @@ class WorkspaceView(QWidget):
         widget.setObjectName("WorkspaceContent")
         layout = QVBoxLayout(widget)
         layout.setAlignment(Qt.AlignCenter)
-        
+
         # --- PETICIÓN 1: Cambiamos el texto del panel en blanco ---
         label = QLabel("Bienvenido a Modula. Abre un módulo en el panel izquierdo para visualizar.")
         label.setStyleSheet("font-size: 16px; color: #6b7281;")
         layout.addWidget(label)
         return widget
 
+    def _pestaña(self, index) -> _Pestaña | None:
+        return self.tab_bar.tabData(index) if index >= 0 else None
+
     def _update_view(self):
         """Muestra el placeholder si no hay pestañas."""
         if self.tab_bar.count() == 0:
             self.content_stack.setCurrentWidget(self.placeholder_widget)
-        
+
+    def _notificar(self, widget, evento: str):
+        """Llama a on_module_loaded / on_module_closed si el widget es un módulo."""
+        metodo = getattr(widget, evento, None)
+        if callable(metodo):
+            try:
+                metodo()
+            except Exception as e:
+                print(f"🔥 Error en {evento} de {type(widget).__name__}: {e}")
+
+    def _descargar_widget(self, widget, reutilizable: bool):
+        """Cierra el módulo y libera su widget (a la reserva del ModuleManager o destruyéndolo)."""
+        self._notificar(widget, "on_module_closed")
+        self.content_stack.removeWidget(widget)
+        if not (reutilizable and self.liberar_widget and self.liberar_widget(widget)):
+            widget.deleteLater()
+
     def cerrar_pestaña(self, index):
-        """Cierra la pestaña y su contenido asociado."""
-        widget_a_cerrar = self.content_stack.widget(index + 1)
-        self.content_stack.removeWidget(widget_a_cerrar)
-        widget_a_cerrar.deleteLater()
+        """Cierra la pestaña y su contenido asociado, avisando antes al módulo."""
+        pestaña = self._pestaña(index)
+        # La pestaña guarda su widget: el índice del stack deja de coincidir al mover pestañas.
+        widget_a_cerrar = pestaña.widget if pestaña else self.content_stack.widget(index + 1)
+        if pestaña is self._pestaña_actual:
+            self._pestaña_actual = None
         self.tab_bar.removeTab(index)
+        if pestaña and pestaña.hibernada:
+            # El módulo ya se cerró al hibernar; solo queda el marcador.
+            self.content_stack.removeWidget(widget_a_cerrar)
+            widget_a_cerrar.deleteLater()
+        else:
+            self._descargar_widget(widget_a_cerrar, reutilizable=True)
         self._update_view()
-        
+
     def _crear_modulo_widget(self, nombre_modulo: str):
         """Función auxiliar para crear el widget de contenido de un módulo."""
         nuevo_modulo_widget = QWidget()
         nuevo_modulo_widget.setObjectName("WorkspaceContent")
         layout = QVBoxLayout(nuevo_modulo_widget)
         layout.setAlignment(Qt.AlignCenter)
-        
+
         label_text = f"Contenido del Módulo: {nombre_modulo}"
         if nombre_modulo == "Dashboard":
              label_text = "Bienvenido a Modula"
-        
+
         label = QLabel(label_text)
         label.setStyleSheet("font-size: 24px;")
         layout.addWidget(label)
@@ -96,62 +165,79 @@ class WorkspaceView(QWidget):
 
     def _sincronizar_vista_con_pestaña(self, index):
         """Sincroniza el QStackedWidget con el QTabBar."""
-        if index >= 0:
+        # La pestaña que deja de estar al frente empieza a contar para hibernar.
+        if self._pestaña_actual is not None:
+            self._pestaña_actual.inactiva_desde = time.monotonic()
+
+        pestaña = self._pestaña(index)
+        self._pestaña_actual = pestaña
+        if pestaña is not None:
+            pestaña.inactiva_desde = None
+            if pestaña.hibernada:
+                self._despertar(pestaña)
+            self.content_stack.setCurrentWidget(pestaña.widget)
+        elif index >= 0:
             # El índice del stack es el de la pestaña + 1 (porque el placeholder está en 0)
             self.content_stack.setCurrentIndex(index + 1)
         else:
             # Si no hay pestañas seleccionadas, mostramos el placeholder (índice 0)
             self.content_stack.setCurrentIndex(0)
 
-    def reemplazar_pestaña_actual(self, nombre_modulo: str, widget_modulo: QWidget):
+    def enfocar_modulo(self, nombre_modulo: str) -> bool:
+        """Si el módulo ya tiene una pestaña abierta, la selecciona y devuelve True."""
+        for i in range(self.tab_bar.count()):
+            if self.tab_bar.tabText(i) == nombre_modulo:
+                self.tab_bar.setCurrentIndex(i)
+                return True
+        return False
+
+    def reemplazar_pestaña_actual(self, nombre_modulo: str, widget_modulo: QWidget, manifest: dict = None):
         """
         Maneja el clic sencillo: reemplaza el Dashboard o enfoca una pestaña existente.
         """
         # 1. Buscamos si el módulo ya está abierto en OTRA pestaña.
-        for i in range(self.tab_bar.count()):
-            if self.tab_bar.tabText(i) == nombre_modulo:
-                self.tab_bar.setCurrentIndex(i)
-                return
+        if self.enfocar_modulo(nombre_modulo):
+            return
 
         # 2. Si no está abierto, verificamos la pestaña actual.
         current_index = self.tab_bar.currentIndex()
-        
+
         if current_index == -1:
-            self.abrir_nuevo_modulo(nombre_modulo, widget_modulo)
+            self.abrir_nuevo_modulo(nombre_modulo, widget_modulo, manifest)
             return
-            
+
         # 3. Si la pestaña actual es un "Dashboard", la reemplazamos.
         if self.tab_bar.tabText(current_index) == "Dashboard":
-            # --- LÓGICA CORREGIDA Y MÁS SEGURA ---
-            
-            # El índice del widget en el stack es el de la pestaña + 1
-            widget_index_a_reemplazar = current_index + 1
-
-            # Verificamos que el widget exista en esa posición antes de intentar borrarlo
-            if widget_index_a_reemplazar < self.content_stack.count():
-                widget_a_reemplazar = self.content_stack.widget(widget_index_a_reemplazar)
-                self.content_stack.removeWidget(widget_a_reemplazar)
-                widget_a_reemplazar.deleteLater()
-            
+            pestaña = self._pestaña(current_index)
+            widget_a_reemplazar = pestaña.widget if pestaña else self.content_stack.widget(current_index + 1)
+
             # Insertamos el nuevo widget en la misma posición del stack
-            self.content_stack.insertWidget(widget_index_a_reemplazar, widget_modulo)
-            
-            # Actualizamos el texto de la pestaña y la seleccionamos
+            posicion = self.content_stack.indexOf(widget_a_reemplazar)
+            if posicion == -1:
+                posicion = self.content_stack.count()
+            self.content_stack.insertWidget(posicion, widget_modulo)
+            if widget_a_reemplazar is not None:
+                self._descargar_widget(widget_a_reemplazar, reutilizable=False)
+
+            # Actualizamos el texto y los datos de la pestaña, y la seleccionamos
             self.tab_bar.setTabText(current_index, nombre_modulo)
-            self.tab_bar.setCurrentIndex(current_index) # Esto activará la sincronización
-            
+            nueva = _Pestaña(widget_modulo, manifest)
+            self.tab_bar.setTabData(current_index, nueva)
+            self._pestaña_actual = nueva
             self.content_stack.setCurrentWidget(widget_modulo)
+            self._notificar(widget_modulo, "on_module_loaded")
+        else:
+            # El módulo no se mostró: lo devolvemos en lugar de dejarlo huérfano.
+            self._descargar_widget(widget_modulo, reutilizable=True)
 
-
-    def abrir_nuevo_modulo(self, nombre_modulo: str, widget_modulo: QWidget = None):
+    def abrir_nuevo_modulo(self, nombre_modulo: str, widget_modulo: QWidget = None, manifest: dict = None):
         """
         MODIFICADO: Ahora recibe el widget del módulo. Si no lo recibe, crea un placeholder.
+        Con 'manifest' la pestaña se puede hibernar y reconstruir después.
         """
         if nombre_modulo != "Dashboard":
-            for i in range(self.tab_bar.count()):
-                if self.tab_bar.tabText(i) == nombre_modulo:
-                    self.tab_bar.setCurrentIndex(i)
-                    return
+            if self.enfocar_modulo(nombre_modulo):
+                return
 
         if self.tab_bar.count() == 0:
             if self.content_stack.indexOf(self.placeholder_widget) != -1:
@@ -160,7 +246,71 @@ class WorkspaceView(QWidget):
         # Si no nos pasan un widget, creamos uno de bienvenida (para el Dashboard)
         if not widget_modulo:
              widget_modulo = self._crear_modulo_widget(nombre_modulo)
-        
-        index = self.tab_bar.addTab(nombre_modulo)
+
         self.content_stack.addWidget(widget_modulo)
-        self.tab_bar.setCurrentIndex(index)
\ No newline at end of file
+        index = self.tab_bar.addTab(nombre_modulo)
+        self.tab_bar.setTabData(index, _Pestaña(widget_modulo, manifest))
+        if self.tab_bar.currentIndex() == index:
+            # Era la primera pestaña: addTab ya la seleccionó, antes de tener sus datos.
+            self._sincronizar_vista_con_pestaña(index)
+        else:
+            self.tab_bar.setCurrentIndex(index)
+        self._notificar(widget_modulo, "on_module_loaded")
+
+    # --- HIBERNACIÓN ---
+
+    def _crear_marcador_hibernado(self, nombre_modulo: str):
+        """Widget mínimo que ocupa el lugar de un módulo hibernado."""
+        marcador = QWidget()
+        marcador.setObjectName("WorkspaceContent")
+        layout = QVBoxLayout(marcador)
+        layout.setAlignment(Qt.AlignCenter)
+        label = QLabel(f"Reanudando {nombre_modulo}...")
+        label.setStyleSheet("font-size: 16px; color: #6b7281;")
+        layout.addWidget(label)
+        return marcador
+
+    def hibernar_inactivas(self):
+        """Hiberna las pestañas que llevan más de hibernar_tras_s en segundo plano."""
+        if self.cargar_widget is None:
+            return
+        ahora = time.monotonic()
+        for i in range(self.tab_bar.count()):
+            pestaña = self._pestaña(i)
+            if (pestaña is None or pestaña is self._pestaña_actual or pestaña.hibernada
+                    or pestaña.manifest is None or pestaña.inactiva_desde is None):
+                continue
+            if ahora - pestaña.inactiva_desde >= self.hibernar_tras_s:
+                self._hibernar(i, pestaña)
+
+    def _hibernar(self, index: int, pestaña: _Pestaña):
+        guardar_estado = getattr(pestaña.widget, "guardar_estado", None)
+        estado = guardar_estado() if callable(guardar_estado) else None
+        if estado is None:
+            # El módulo no sabe guardar su estado: hibernarlo perdería trabajo del cajero.
+            return
+        widget = pestaña.widget
+        marcador = self._crear_marcador_hibernado(self.tab_bar.tabText(index))
+        self.content_stack.insertWidget(self.content_stack.indexOf(widget), marcador)
+        # No va a la reserva: el objetivo es liberar su memoria.
+        self._descargar_widget(widget, reutilizable=False)
+        pestaña.widget = marcador
+        pestaña.estado = estado
+        print(f"💤 Pestaña '{self.tab_bar.tabText(index)}' hibernada.")
+
+    def _despertar(self, pestaña: _Pestaña):
+        """Reconstruye el módulo de una pestaña hibernada y le devuelve su estado."""
+        marcador = pestaña.widget
+        widget = self.cargar_widget(pestaña.manifest)
+        restaurar_estado = getattr(widget, "restaurar_estado", None)
+        if callable(restaurar_estado):
+            try:
+                restaurar_estado(pestaña.estado)
+            except Exception as e:
+                print(f"🔥 No se pudo restaurar el estado de '{pestaña.manifest.get('nombre')}': {e}")
+        self.content_stack.insertWidget(self.content_stack.indexOf(marcador), widget)
+        self.content_stack.removeWidget(marcador)
+        marcador.deleteLater()
+        pestaña.widget = widget
+        pestaña.estado = None
+        self._notificar(widget, "on_module_loaded")
@@ -0,0 +1,120 @@
+# tools/build_resources.py
+"""
+Compila los recursos gráficos de Modula a src/resources.rcc.
+
+Pasos:
+  1. Revisa que no haya imágenes duplicadas en src/assets/images (mismo contenido
+     con distinto nombre); si las hay, falla para que se elimine la copia.
+  2. Genera en build/resources/ las variantes pre-escaladas de cada imagen según
+     IMAGE_VARIANTS (src/core/resources.py), a 1x y 2x.
+  3. Escribe build/resources/resources.qrc con esas variantes, el ícono, la hoja de
+     estilos y los íconos SVG.
+  4. Ejecuta `pyside6-rcc --binary` para producir src/resources.rcc, que la app
+     registra con QResource.registerResource.
+
+Uso:
+    python tools/build_resources.py
+"""
+import argparse
+import hashlib
+import shutil
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QImage
+from src.core.resources import IMAGE_VARIANTS, DENSITIES, RESOURCES_RCC, variant_name
+
+ASSETS_DIR = ROOT_DIR / "src" / "assets"
+IMAGES_DIR = ASSETS_DIR / "images"
+BUILD_DIR = ROOT_DIR / "build" / "resources"
+OUTPUT_RCC = ROOT_DIR / "src" / RESOURCES_RCC
+
+# Archivos que se incluyen tal cual: (alias dentro de ':/', ruta en src/assets).
+EXTRA_FILES = [
+    ("images/logo_modula.ico", "images/logo_modula.ico"),
+    ("qss/style.qss", "qss/style.qss"),
+] + [(f"icons/{svg.name}", f"icons/{svg.name}") for svg in sorted((ASSETS_DIR / "icons").glob("*.svg"))]
+
+
+def buscar_duplicados(directorio: Path) -> list[list[Path]]:
+    """Agrupa los archivos de 'directorio' con el mismo contenido (sha256)."""
+    por_hash = defaultdict(list)
+    for archivo in sorted(directorio.iterdir()):
+        if archivo.is_file():
+            por_hash[hashlib.sha256(archivo.read_bytes()).hexdigest()].append(archivo)
+    return [archivos for archivos in por_hash.values() if len(archivos) > 1]
+
+
+def generar_variantes() -> list[tuple[str, Path]]:
+    """Escala cada imagen a sus alturas y densidades. Devuelve [(alias, ruta)]."""
+    generadas = []
+    for nombre, alturas in IMAGE_VARIANTS.items():
+        original = IMAGES_DIR / f"{nombre}.png"
+        imagen = QImage(str(original))
+        if imagen.isNull():
+            raise RuntimeError(f"No se pudo leer {original}")
+        for alto in alturas:
+            for densidad in DENSITIES:
+                alto_px = alto * densidad
+                if alto_px > imagen.height():
+                    print(f"⚠️  {nombre}: {alto_px}px supera el original ({imagen.height()}px); se usa el original.")
+                    variante = imagen
+                else:
+                    variante = imagen.scaledToHeight(alto_px, Qt.SmoothTransformation)
+                destino = BUILD_DIR / "images" / variant_name(nombre, alto, densidad)
+                if not variante.save(str(destino), "PNG"):
+                    raise RuntimeError(f"No se pudo escribir {destino}")
+                generadas.append((f"images/{destino.name}", destino))
+    return generadas
+
+
+def escribir_qrc(entradas: list[tuple[str, Path]]) -> Path:
+    qrc_path = BUILD_DIR / "resources.qrc"
+    lineas = ["<!DOCTYPE RCC>", '<RCC version="1.0">', '<qresource prefix="/">']
+    for alias, ruta in entradas:
+        # Rutas absolutas: el .qrc vive en build/ pero apunta también a src/assets.
+        lineas.append(f'    <file alias="{escape(alias)}">{escape(Path(ruta).resolve().as_posix())}</file>')
+    lineas += ["</qresource>", "</RCC>", ""]
+    qrc_path.write_text("\n".join(lineas), encoding="utf-8")
+    return qrc_path
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rcc", default="pyside6-rcc", help="Ejecutable del compilador de recursos.")
+    args = parser.parse_args(argv)
+
+    duplicados = buscar_duplicados(IMAGES_DIR)
+    for grupo in duplicados:
+        print(f"❌ Imágenes idénticas: {', '.join(p.name for p in grupo)}. Conserva solo una.")
+    if duplicados:
+        return 1
+
+    if BUILD_DIR.exists():
+        shutil.rmtree(BUILD_DIR)
+    (BUILD_DIR / "images").mkdir(parents=True)
+
+    entradas = generar_variantes()
+    entradas += [(alias, ASSETS_DIR / ruta) for alias, ruta in EXTRA_FILES]
+    qrc_path = escribir_qrc(entradas)
+
+    comando = [args.rcc, "--binary", "-o", str(OUTPUT_RCC), str(qrc_path)]
+    print(f"▶️ {' '.join(comando)}")
+    resultado = subprocess.run(comando, cwd=BUILD_DIR)
+    if resultado.returncode != 0:
+        print("❌ Falló la compilación de recursos.")
+        return resultado.returncode
+
+    print(f"✅ {OUTPUT_RCC.relative_to(ROOT_DIR)} generado ({OUTPUT_RCC.stat().st_size / 1024:.0f} KB, {len(entradas)} recursos).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,46 @@
+# tools/build_update_manifest.py
+"""
+Genera el manifiesto de archivos de una versión para las actualizaciones diferenciales.
+
+Se ejecuta sobre la carpeta de distribución (p. ej. dist/Modula) y produce un JSON
+con el hash SHA-256 y el tamaño de cada archivo. El servidor publica ese JSON
+junto a los archivos sueltos de la versión, y el launcher descarga solo los que
+cambiaron respecto a la instalación local (ver src/core/updater.py).
+
+Uso:
+    python tools/build_update_manifest.py dist/Modula --version 1.4.2 -o dist/manifest.json
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from src.core.updater import build_file_manifest
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("carpeta", help="Carpeta con los archivos de la versión.")
+    parser.add_argument("--version", required=True, help="Versión que describe el manifiesto.")
+    parser.add_argument("-o", "--output", default="manifest.json", help="Archivo de salida.")
+    args = parser.parse_args(argv)
+
+    carpeta = Path(args.carpeta)
+    if not carpeta.is_dir():
+        print(f"❌ {carpeta} no es una carpeta.")
+        return 1
+
+    manifest = build_file_manifest(carpeta, args.version)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+    total = sum(info["size"] for info in manifest["files"].values())
+    print(f"✅ {args.output}: {len(manifest['files'])} archivos, {total / 1_048_576:.1f} MB (v{args.version}).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+# tools/check_import_time.py
+"""
+Verifica el presupuesto de tiempo de importación del arranque de Modula.
+
+Ejecuta `python -X importtime -c "import app_main"` en un proceso limpio y falla
+(código de salida 1) si:
+  - el tiempo acumulado de importar app_main supera el presupuesto, o
+  - se importa alguno de los módulos que deben cargarse solo en su primer uso
+    (vistas distintas de LoadingView, diálogos, httpx, bcrypt, psutil...).
+
+Uso:
+    python tools/check_import_time.py --budget-ms 600
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+# Módulos que no deben importarse antes del primer pintado de la LoadingView.
+LAZY_MODULES = (
+    "httpx",
+    "requests",
+    "bcrypt",
+    "psutil",
+    "getmac",
+    "src.core.api_client",
+    "src.core.module_manager",
+    "src.ui.dialogs",
+    "src.ui.windows_dialogs.cambiar_contrasena_dialog",
+    "src.ui.views.auth_view",
+    "src.ui.views.dashboard_view",
+    "src.ui.views.login_view",
+)
+
+LINE_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+def medir_importacion(modulo: str = "app_main") -> tuple[dict, str]:
+    """Devuelve ({modulo: microsegundos_acumulados}, stderr) de importar 'modulo'."""
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+        cwd=ROOT_DIR, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"No se pudo importar {modulo}:\n{proc.stderr[-2000:]}")
+
+    acumulados = {}
+    for line in proc.stderr.splitlines():
+        match = LINE_RE.match(line)
+        if match:
+            acumulados[match.group(4)] = int(match.group(2))
+    return acumulados, proc.stderr
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--budget-ms", type=float, default=600.0, help="Presupuesto para 'import app_main'.")
+    parser.add_argument("--top", type=int, default=10, help="Cuántos módulos más lentos mostrar.")
+    args = parser.parse_args(argv)
+
+    acumulados, _ = medir_importacion()
+    total_ms = acumulados.get("app_main", 0) / 1000.0
+
+    print(f"⏱️  import app_main: {total_ms:.1f} ms (presupuesto {args.budget_ms:.0f} ms)")
+    for nombre, us in sorted(acumulados.items(), key=lambda kv: kv[1], reverse=True)[: args.top]:
+        print(f"   {us / 1000.0:8.1f} ms  {nombre}")
+
+    errores = []
+    if total_ms > args.budget_ms:
+        errores.append(f"El arranque excede el presupuesto: {total_ms:.1f} ms > {args.budget_ms:.0f} ms")
+    for modulo in LAZY_MODULES:
+        if modulo in acumulados:
+            errores.append(f"'{modulo}' se importa al arrancar y debería cargarse en su primer uso")
+
+    for error in errores:
+        print(f"❌ {error}")
+    if not errores:
+        print("✅ Presupuesto de importación respetado.")
+    return 1 if errores else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+# tools/compare_boot_profiles.py
+"""
+Compara perfiles de arranque guardados por src/core/startup_timeline.py.
+
+Agrupa los perfiles por versión (o por carpeta de origen con --por-carpeta) y
+muestra la mediana de cada span, para ver qué fase hace lento un arranque o en
+qué cambió una versión respecto a otra.
+
+Uso:
+    python tools/compare_boot_profiles.py %APPDATA%/Modula/boot_profiles
+    python tools/compare_boot_profiles.py perfiles/sucursal_centro perfiles/sucursal_norte --por-carpeta
+"""
+import argparse
+import json
+import statistics
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+
+def cargar_perfiles(rutas: list[str]) -> list[tuple[Path, dict]]:
+    """Devuelve [(ruta, perfil)] de los archivos boot_*.json en las rutas dadas."""
+    perfiles = []
+    for ruta in map(Path, rutas):
+        archivos = sorted(ruta.glob("boot_*.json")) if ruta.is_dir() else [ruta]
+        for archivo in archivos:
+            try:
+                with open(archivo, "r", encoding="utf-8") as f:
+                    perfiles.append((archivo, json.load(f)))
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"⚠️  Se omite {archivo}: {e}", file=sys.stderr)
+    return perfiles
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("rutas", nargs="+", help="Carpetas boot_profiles o archivos boot_*.json.")
+    parser.add_argument("--por-carpeta", action="store_true", help="Agrupar por carpeta en lugar de por versión.")
+    args = parser.parse_args(argv)
+
+    perfiles = cargar_perfiles(args.rutas)
+    if not perfiles:
+        print("❌ No se encontraron perfiles de arranque.")
+        return 1
+
+    # grupo -> span -> [duraciones]
+    grupos = defaultdict(lambda: defaultdict(list))
+    for archivo, perfil in perfiles:
+        grupo = archivo.parent.name if args.por_carpeta else (perfil.get("version") or "desconocida")
+        grupos[grupo]["(total)"].append(perfil.get("total_ms", 0.0))
+        for s in perfil.get("spans", []):
+            # Los instantes (p. ej. login_local_visible) se comparan por su inicio.
+            valor = s["duracion_ms"] if s["duracion_ms"] else s["inicio_ms"]
+            grupos[grupo][s["nombre"]].append(valor)
+
+    nombres_grupos = sorted(grupos)
+    nombres_spans = sorted({n for g in grupos.values() for n in g})
+    ancho = max(len(n) for n in nombres_spans)
+
+    print(f"{'span'.ljust(ancho)}  " + "  ".join(f"{g[:14]:>14}" for g in nombres_grupos))
+    print(f"{'(perfiles)'.ljust(ancho)}  " + "  ".join(f"{len(grupos[g]['(total)']):>14}" for g in nombres_grupos))
+    for nombre in nombres_spans:
+        celdas = []
+        for g in nombres_grupos:
+            valores = grupos[g].get(nombre)
+            celdas.append(f"{statistics.median(valores):11.1f} ms" if valores else f"{'-':>14}")
+        print(f"{nombre.ljust(ancho)}  " + "  ".join(celdas))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
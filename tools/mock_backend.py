@@ -0,0 +1,485 @@
+# tools/mock_backend.py
+"""
+Servidor local que imita al backend de Modula para pruebas y benchmarks sin conexión.
+
+Implementa los endpoints que usa ApiClient (auth, terminales, sucursales, sync,
+módulos y actualizaciones) con datos sintéticos en memoria. Solo usa la
+biblioteca estándar (bcrypt es opcional, para que el login local funcione).
+
+Uso:
+    python tools/mock_backend.py --port 8765 --records 5000 --latency-ms 80 --error-rate 0.02
+
+y en otra terminal:
+    set MODULA_API_BASE_URL=http://127.0.0.1:8765
+    python app_main.py
+
+Credenciales sintéticas: correo 'demo@modula.local' / contraseña 'demo' para la
+cuenta Addsy, y empleado '1' / contraseña '1234' para el login local.
+"""
+import argparse
+import hashlib
+import io
+import json
+import os
+import random
+import re
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import uuid
+import zipfile
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlparse, parse_qs
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+BUNDLED_MODULES_DIR = ROOT_DIR / "src" / "modules"
+EPOCH_ISO = "1970-01-01T00:00:00+00:00"
+
+# --- ESQUEMA SINTÉTICO ---
+# Mismas tablas que src/config/schema_config.py. Todas llevan las columnas de
+# sincronización (uuid, last_modified, needs_sync).
+TABLE_SCHEMAS = {
+    "usuarios": {
+        "numero_empleado": "TEXT", "nombre_usuario": "TEXT", "contrasena": "TEXT",
+        "rol": "TEXT", "cambio_contrasena_obligatorio": "INTEGER",
+    },
+    "clientes": {"nombre": "TEXT", "telefono": "TEXT", "correo": "TEXT"},
+    "productos": {"nombre": "TEXT", "sku": "TEXT", "precio": "REAL", "existencia": "INTEGER"},
+    "ventas": {"total_venta": "REAL", "metodo_pago": "TEXT", "id_cliente": "TEXT", "id_usuario": "TEXT", "detalles_venta": "TEXT"},
+    "egresos": {"concepto": "TEXT", "monto": "REAL"},
+    "ingresos": {"concepto": "TEXT", "monto": "REAL"},
+}
+TABLAS_GENERALES = {"usuarios", "clientes", "productos"}
+# Tablas en las que se generan registros "de otras terminales" con el tiempo.
+TABLAS_CON_ACTIVIDAD = ("ventas", "egresos", "ingresos")
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _parse_iso(value) -> datetime:
+    try:
+        dt = datetime.fromisoformat(str(value))
+        return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+    except (TypeError, ValueError):
+        return datetime.fromtimestamp(0, tz=timezone.utc)
+
+
+def _hash_password(password: str) -> str:
+    try:
+        import bcrypt
+        return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds=4)).decode("utf-8")
+    except ImportError:
+        print("⚠️  bcrypt no está instalado: el login local con los usuarios sintéticos no funcionará.")
+        return "sin-bcrypt"
+
+
+def _module_zip_bytes(directory: Path) -> bytes:
+    """Empaqueta un módulo con fechas fijas, para que su SHA-256 no cambie entre peticiones."""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zf:
+        for file_path in sorted(directory.iterdir()):
+            if file_path.is_file() and file_path.suffix != ".zip":
+                info = zipfile.ZipInfo(file_path.name, date_time=(1980, 1, 1, 0, 0, 0))
+                info.compress_type = zipfile.ZIP_DEFLATED
+                zf.writestr(info, file_path.read_bytes())
+    return buffer.getvalue()
+
+
+class MockState:
+    """Estado en memoria del backend simulado: registros, contadores y configuración."""
+
+    def __init__(self, args):
+        self.args = args
+        self.id_empresa = args.empresa
+        self.id_sucursal = args.sucursal
+        self.lock = threading.Lock()
+        self.rng = random.Random(args.seed)
+        # {tabla: {uuid: registro}} y {tabla: {uuid: datetime_servidor}}
+        self.records = {t: {} for t in TABLE_SCHEMAS}
+        self.server_ts = {t: {} for t in TABLE_SCHEMAS}
+        self.stats = {"requests": {}, "bytes_out": 0, "errors_injected": 0, "records_pushed": 0, "records_served": 0}
+        self._last_activity = time.monotonic()
+        self._seed_data()
+
+    # --- DATOS SINTÉTICOS ---
+
+    def _fake_row(self, table: str, index: int) -> dict:
+        r = self.rng
+        if table == "usuarios":
+            return {"numero_empleado": str(index + 1), "nombre_usuario": f"usuario{index + 1}",
+                    "contrasena": self._password_hash, "rol": "cajero" if index else "administrador",
+                    "cambio_contrasena_obligatorio": 0}
+        if table == "clientes":
+            return {"nombre": f"Cliente {index}", "telefono": f"55{r.randrange(10**8):08d}", "correo": f"cliente{index}@mail.test"}
+        if table == "productos":
+            return {"nombre": f"Producto {index}", "sku": f"SKU-{index:06d}", "precio": round(r.uniform(5, 900), 2), "existencia": r.randrange(500)}
+        if table == "ventas":
+            items = [{"sku": f"SKU-{r.randrange(10**4):06d}", "cantidad": r.randrange(1, 5)} for _ in range(r.randrange(1, 6))]
+            return {"total_venta": round(r.uniform(10, 3000), 2), "metodo_pago": r.choice(["efectivo", "tarjeta"]),
+                    "id_cliente": None, "id_usuario": None, "detalles_venta": json.dumps(items)}
+        return {"concepto": f"Movimiento {index}", "monto": round(r.uniform(10, 5000), 2)}
+
+    def insert(self, table: str, record: dict, server_dt: datetime):
+        record.setdefault("uuid", str(uuid.uuid4()))
+        record.setdefault("last_modified", server_dt.isoformat())
+        record["needs_sync"] = 0
+        self.records[table][record["uuid"]] = record
+        self.server_ts[table][record["uuid"]] = server_dt
+
+    def _seed_data(self):
+        self._password_hash = _hash_password("1234")
+        base_dt = datetime.fromtimestamp(0, tz=timezone.utc).replace(year=2024)
+        for table in TABLE_SCHEMAS:
+            count = self.args.users if table == "usuarios" else self.args.records
+            for i in range(count):
+                self.insert(table, self._fake_row(table, i), base_dt)
+        print(f"🧪 Datos sintéticos listos: {self.args.records} registros por tabla, {self.args.users} usuarios.")
+
+    def generate_activity(self):
+        """Simula ventas de otras terminales a razón de --delta-rate registros por minuto."""
+        if self.args.delta_rate <= 0:
+            return
+        now = time.monotonic()
+        elapsed = now - self._last_activity
+        nuevos = int(elapsed * self.args.delta_rate / 60.0)
+        if nuevos <= 0:
+            return
+        self._last_activity = now
+        server_dt = datetime.now(timezone.utc)
+        for _ in range(nuevos):
+            table = self.rng.choice(TABLAS_CON_ACTIVIDAD)
+            self.insert(table, self._fake_row(table, len(self.records[table])), server_dt)
+
+    # --- RUTAS Y ARCHIVOS ---
+
+    def db_keys(self) -> list:
+        keys = []
+        for table in TABLE_SCHEMAS:
+            if table in TABLAS_GENERALES:
+                keys.append(f"{self.id_empresa}/databases_generales/{table}.sqlite")
+            else:
+                keys.append(f"{self.id_empresa}/suc_{self.id_sucursal}/{table}.sqlite")
+        return keys
+
+    def build_db_file(self, key: str) -> bytes | None:
+        """Construye en un archivo temporal la base SQLite de una tabla y devuelve sus bytes."""
+        table = Path(key).stem
+        if table not in TABLE_SCHEMAS or key not in self.db_keys():
+            return None
+        columns = {"uuid": "TEXT PRIMARY KEY", **TABLE_SCHEMAS[table], "last_modified": "TEXT", "needs_sync": "INTEGER DEFAULT 0"}
+        fd, tmp_path = tempfile.mkstemp(suffix=".sqlite")
+        os.close(fd)
+        try:
+            conn = sqlite3.connect(tmp_path)
+            conn.execute(f"CREATE TABLE {table} ({', '.join(f'{c} {t}' for c, t in columns.items())})")
+            with self.lock:
+                rows = [dict(r) for r in self.records[table].values()]
+            if rows:
+                cols = list(columns)
+                conn.executemany(
+                    f"INSERT INTO {table} ({', '.join(cols)}) VALUES ({', '.join('?' * len(cols))})",
+                    [tuple(r.get(c) for c in cols) for r in rows],
+                )
+            conn.commit()
+            conn.close()
+            return Path(tmp_path).read_bytes()
+        finally:
+            os.remove(tmp_path)
+
+    def module_packages(self) -> dict:
+        """Devuelve {id: (manifest, directorio)} de los módulos incluidos en el repositorio."""
+        packages = {}
+        if BUNDLED_MODULES_DIR.is_dir():
+            for manifest_path in BUNDLED_MODULES_DIR.glob("*/manifest.json"):
+                manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+                packages[manifest["id"]] = (manifest, manifest_path.parent)
+        return packages
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    """Despacha las peticiones HTTP hacia los métodos del backend simulado."""
+    server_version = "ModulaMock/1.0"
+    state: MockState = None
+
+    # Tabla de rutas: (método, regex) -> nombre del manejador
+    ROUTES = [
+        ("POST", r"/api/v1/auth/login", "auth_login"),
+        ("POST", r"/api/v1/auth/registrar-cuenta", "auth_registrar"),
+        ("POST", r"/api/v1/auth/verificar-terminal", "auth_verificar_terminal"),
+        ("POST", r"/api/v1/auth/solicitar-reseteo", "ok_message"),
+        ("GET", r"/api/v1/auth/check-activation-status/(?P<token>[^/]+)", "auth_activation"),
+        ("POST", r"/api/v1/terminales/buscar-por-hardware", "terminal_buscar"),
+        ("GET", r"/api/v1/terminales/mi-cuenta", "terminal_lista"),
+        ("POST", r"/api/v1/terminales/", "terminal_registrar"),
+        ("POST", r"/api/v1/terminales/asignar-a-sucursal", "ok_message"),
+        ("POST", r"/api/v1/terminales/crear-sucursal-y-asignar", "terminal_crear_sucursal"),
+        ("GET", r"/api/v1/sucursales/mi-cuenta", "sucursal_lista"),
+        ("POST", r"/api/v1/sucursales/", "sucursal_crear"),
+        ("POST", r"/api/v1/sucursales/(?P<id>\d+)/anclar-red", "ok_message"),
+        ("POST", r"/api/v1/sync/initialize", "sync_initialize"),
+        ("POST", r"/api/v1/sync/check", "sync_check"),
+        ("POST", r"/api/v1/sync/push-records", "sync_push"),
+        ("POST", r"/api/v1/sync/get-deltas", "sync_deltas"),
+        ("GET", r"/api/v1/sync/changes", "sync_changes"),
+        ("GET", r"/api/v1/sync/pull-db/(?P<key>.+)", "sync_pull_db"),
+        ("POST", r"/api/v1/sync/upload/(?P<key>.+)", "sync_upload"),
+        ("GET", r"/api/v1/modules/manifest", "modules_manifest"),
+        ("GET", r"/mock/modules/(?P<id>[^/]+)\.zip", "modules_download"),
+        ("GET", r"/api/v1/update/check", "update_check"),
+        ("GET", r"/mock/stats", "mock_stats"),
+    ]
+
+    def log_message(self, fmt, *args):
+        if not self.state.args.quiet:
+            super().log_message(fmt, *args)
+
+    # --- INFRAESTRUCTURA ---
+
+    def _dispatch(self, method: str):
+        parsed = urlparse(self.path)
+        self.query = parse_qs(parsed.query)
+        for route_method, pattern, handler_name in self.ROUTES:
+            match = re.fullmatch(pattern, parsed.path)
+            if route_method == method and match:
+                break
+        else:
+            return self._send_json({"detail": "Not Found"}, 404)
+
+        args = self.state.args
+        with self.state.lock:
+            counts = self.state.stats["requests"]
+            counts[handler_name] = counts.get(handler_name, 0) + 1
+
+        if not handler_name.startswith("mock_"):
+            if args.latency_ms or args.jitter_ms:
+                delay = args.latency_ms + random.uniform(-args.jitter_ms, args.jitter_ms)
+                time.sleep(max(0.0, delay) / 1000.0)
+            if args.error_rate and re.search(args.error_endpoints, parsed.path) and random.random() < args.error_rate:
+                with self.state.lock:
+                    self.state.stats["errors_injected"] += 1
+                return self._send_json({"detail": "Error inyectado por el mock."}, args.error_status)
+
+        try:
+            getattr(self, handler_name)(**match.groupdict())
+        except Exception as e:
+            self._send_json({"detail": f"Error interno del mock: {e}"}, 500)
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def _read_json(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        try:
+            return json.loads(self.rfile.read(length))
+        except json.JSONDecodeError:
+            return {}
+
+    def _send_bytes(self, body: bytes, status: int = 200, content_type: str = "application/octet-stream", headers: dict = None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+        with self.state.lock:
+            self.state.stats["bytes_out"] += len(body)
+
+    def _send_json(self, data, status: int = 200):
+        self._send_bytes(json.dumps(data).encode("utf-8"), status, "application/json")
+
+    def _session(self) -> dict:
+        return {"status": "ok", "access_token": f"mock-{uuid.uuid4().hex}",
+                "id_empresa": self.state.id_empresa, "id_sucursal": self.state.id_sucursal}
+
+    # --- AUTH ---
+
+    def auth_login(self):
+        data = self._read_json()
+        if data.get("correo") == self.state.args.correo and data.get("contrasena") == self.state.args.contrasena:
+            return self._send_json({"access_token": f"mock-{uuid.uuid4().hex}", "token_type": "bearer"})
+        self._send_json({"detail": "Correo o contraseña incorrectos."}, 401)
+
+    def auth_registrar(self):
+        self._send_json({"url_checkout": f"http://{self.headers.get('Host')}/mock/checkout"})
+
+    def auth_verificar_terminal(self):
+        data = self._read_json()
+        if not data.get("id_terminal"):
+            return self._send_json({"status": "error", "detail": "Falta id_terminal."}, 422)
+        self._send_json(self._session())
+
+    def auth_activation(self, token):
+        self._send_json({**self._session(), "status": "complete", "id_terminal": str(uuid.uuid4())})
+
+    def ok_message(self, **_):
+        self._read_json()
+        self._send_json({"status": "ok", "message": "Operación simulada correctamente."})
+
+    # --- TERMINALES Y SUCURSALES ---
+
+    def terminal_buscar(self):
+        self._send_json({"status": "ok", "id_terminal": self._read_json().get("id_terminal")})
+
+    def terminal_lista(self):
+        self._send_json([{"id_terminal": "mock-terminal", "nombre_terminal": "Caja Mock", "id_sucursal": self.state.id_sucursal}])
+
+    def terminal_registrar(self):
+        self._send_json({"status": "ok", **self._read_json()})
+
+    def terminal_crear_sucursal(self):
+        self._read_json()
+        self._send_json(self._session())
+
+    def sucursal_lista(self):
+        self._send_json([{"id": self.state.id_sucursal, "nombre": "Sucursal Mock"}])
+
+    def sucursal_crear(self):
+        self._send_json({"id": self.state.id_sucursal + 1, "nombre": self._read_json().get("nombre")})
+
+    # --- SINCRONIZACIÓN ---
+
+    def sync_initialize(self):
+        self._send_json({"status": "ok", "files_to_pull": self.state.db_keys()})
+
+    def sync_check(self):
+        data = self._read_json()
+        locales = {f.get("key") for f in data.get("archivos_locales", [])}
+        faltantes = [k for k in self.state.db_keys() if k not in locales]
+        self._send_json({"status": "ok", "files_to_pull": faltantes, "files_to_push": []})
+
+    def sync_push(self):
+        data = self._read_json()
+        table = data.get("table_name")
+        if table not in TABLE_SCHEMAS:
+            return self._send_json({"detail": f"Tabla desconocida: {table}"}, 422)
+        records = data.get("records", [])
+        server_dt = datetime.now(timezone.utc)
+        with self.state.lock:
+            for record in records:
+                record.pop("id", None)
+                self.state.insert(table, dict(record), server_dt)
+            self.state.stats["records_pushed"] += len(records)
+        self._send_json({"status": "ok", "merged": len(records)})
+
+    def sync_deltas(self):
+        data = self._read_json()
+        since = _parse_iso(data.get("global", EPOCH_ISO))
+        deltas = {}
+        with self.state.lock:
+            self.state.generate_activity()
+            for table, stamps in self.state.server_ts.items():
+                changed = [dict(self.state.records[table][u]) for u, dt in stamps.items() if dt > since]
+                if changed:
+                    deltas[table] = changed
+            self.state.stats["records_served"] += sum(len(v) for v in deltas.values())
+        self._send_json({"deltas": deltas, "server_sync_timestamp": _now_iso()})
+
+    def sync_changes(self):
+        since = _parse_iso(self.query.get("since", [EPOCH_ISO])[0])
+        with self.state.lock:
+            self.state.generate_activity()
+            versiones = {t: max(stamps.values()).isoformat() if stamps else EPOCH_ISO
+                         for t, stamps in self.state.server_ts.items()}
+            changed = [t for t, stamps in self.state.server_ts.items() if any(dt > since for dt in stamps.values())]
+        etag = '"' + uuid.uuid5(uuid.NAMESPACE_URL, json.dumps([since.isoformat(), versiones], sort_keys=True)).hex + '"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        body = {"changed_tables": changed, "versions": versiones, "server_sync_timestamp": _now_iso()}
+        self._send_bytes(json.dumps(body).encode("utf-8"), content_type="application/json", headers={"ETag": etag})
+
+    def sync_pull_db(self, key):
+        body = self.state.build_db_file(key)
+        if body is None:
+            return self._send_json({"detail": "Archivo no encontrado."}, 404)
+        self._send_bytes(body)
+
+    def sync_upload(self, key):
+        length = int(self.headers.get("Content-Length") or 0)
+        self.rfile.read(length)
+        self._send_json({"status": "ok", "key": key})
+
+    # --- MÓDULOS Y ACTUALIZACIONES ---
+
+    def modules_manifest(self):
+        host = self.headers.get("Host")
+        modules = []
+        for module_id, (manifest, directory) in self.state.module_packages().items():
+            modules.append({
+                "identificador_unico": module_id,
+                "nombre": manifest.get("nombre", module_id),
+                "version": manifest.get("version", "0.0.0"),
+                "sha256": hashlib.sha256(_module_zip_bytes(directory)).hexdigest(),
+                "download_url": f"http://{host}/mock/modules/{module_id}.zip",
+            })
+        self._send_json({"status": "ok", "modules": modules})
+
+    def modules_download(self, id):
+        package = self.state.module_packages().get(id)
+        if not package:
+            return self._send_json({"detail": "Módulo no encontrado."}, 404)
+        self._send_bytes(_module_zip_bytes(package[1]), content_type="application/zip")
+
+    def update_check(self):
+        self.send_response(204)
+        self.end_headers()
+
+    def mock_stats(self):
+        with self.state.lock:
+            stats = json.loads(json.dumps(self.state.stats))
+            stats["records_total"] = {t: len(r) for t, r in self.state.records.items()}
+        self._send_json(stats)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Backend simulado de Modula para pruebas y benchmarks locales.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--empresa", default="MOD_EMP_1001", help="ID de empresa que devuelve la verificación.")
+    parser.add_argument("--sucursal", type=int, default=1, help="ID de sucursal que devuelve la verificación.")
+    parser.add_argument("--records", type=int, default=1000, help="Registros sintéticos por tabla.")
+    parser.add_argument("--users", type=int, default=5, help="Usuarios locales sintéticos (contraseña '1234').")
+    parser.add_argument("--delta-rate", type=float, default=0.0, help="Registros nuevos por minuto de 'otras terminales'.")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Latencia añadida a cada petición.")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Variación aleatoria de la latencia.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Probabilidad (0-1) de devolver un error.")
+    parser.add_argument("--error-status", type=int, default=503, help="Código HTTP de los errores inyectados.")
+    parser.add_argument("--error-endpoints", default=".*", help="Regex de rutas en las que se inyectan errores.")
+    parser.add_argument("--correo", default="demo@modula.local")
+    parser.add_argument("--contrasena", default="demo")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--quiet", action="store_true", help="No imprimir cada petición.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    MockHandler.state = MockState(args)
+    server = ThreadingHTTPServer((args.host, args.port), MockHandler)
+    print(f"🚀 Backend simulado de Modula escuchando en http://{args.host}:{args.port}")
+    print(f"   Exporta MODULA_API_BASE_URL=http://{args.host}:{args.port} para usarlo.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 Backend simulado detenido.")
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())